@@ -2,6 +2,9 @@
 ASGI config for django_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve the project through it (e.g. ``uvicorn django_project.asgi:application``)
+so /api/notifications/stream/ can hold connections open without tying up a
+worker thread each.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -174,4 +174,25 @@ REST_FRAMEWORK = {
 }
 
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+
+# Volunteer matching engine: "python" (default) or "numpy" (needs numpy installed)
+MATCHING_ENGINE = "python"
+# CACHES alias that shares compiled volunteer features between workers; None keeps them per-process
+MATCHING_FEATURE_CACHE = None
+# Rosters at least this big are matched across a process pool when no index is used (None: never)
+MATCHING_PARALLEL_THRESHOLD = 50_000
+MATCHING_WORKERS = None  # pool size; None uses os.cpu_count()
+# Push notifications over SSE (/api/notifications/stream/). Only enable when the
+# site is served through django_project.asgi by an ASGI server (uvicorn, daphne):
+# under WSGI a stream holds a worker thread and delivers nothing, so pages poll.
+NOTIFY_SSE = False
+# CACHES alias holding per-user notification change markers for the SSE stream;
+# must be shared (redis/memcached/db) when running several ASGI processes
+NOTIFY_STREAM_CACHE = "default"
+# manage.py compact_notifications deletes read notifications older than this
+NOTIFY_RETENTION_DAYS = 90
+# background report files (reports.py) are written to default storage under MEDIA_ROOT
+MEDIA_ROOT = BASE_DIR / "media"
+# an identical export requested within this window reuses the finished file
+REPORT_CACHE_SECONDS = 600
 DEFAULT_FROM_EMAIL = "noreply@example.com"
\ No newline at end of file
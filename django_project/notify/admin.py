@@ -1,5 +1,5 @@
 from django.contrib import admin
-from notify.models import Notification
+from notify.models import Notification, OutboxEmail, UnreadCounter
 
 
 @admin.register(Notification)
@@ -10,3 +10,16 @@ class NotificationAdmin(admin.ModelAdmin):
     def user_email(self, obj):
         u = obj.user
         return getattr(u, "email", u.id)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ("id","subject","state","attempts","next_attempt_at","sent_at")
+    list_filter = ("state",)
+    search_fields = ("subject","last_error")
+
+
+@admin.register(UnreadCounter)
+class UnreadCounterAdmin(admin.ModelAdmin):
+    list_display = ("user","unread")
+    search_fields = ("user__email",)
@@ -1,3 +1,7 @@
 from django.apps import AppConfig
 class NotifyConfig(AppConfig):
-    name = "notify"
\ No newline at end of file
+    name = "notify"
+
+    def ready(self):
+        # import signal handlers
+        from . import signals  # noqa: F401
@@ -0,0 +1,96 @@
+"""
+Per-user unread counters (UnreadCounter rows).
+
+Writers adjust the counter with `UPDATE ... SET unread = unread + n` in the
+same transaction as the Notification change, so concurrent writers never
+lose an increment. A user without a row is seeded from COUNT(*) the first
+time anything touches it, with an insert that yields to a concurrent seed;
+a writer seeds the count *before* its own change and then applies its
+delta like everyone else. After that, reading is one primary-key lookup.
+
+Single-row saves and deletes are covered by notify/signals.py. Bulk paths
+call `add_unread` / `mark_all_read` themselves.
+"""
+from django.db.models import Count, F
+
+from .models import Notification, UnreadCounter
+
+
+def _actual(user_ids):
+    rows = (Notification.objects.filter(user_id__in=user_ids, is_read=False)
+            .values("user_id").annotate(n=Count("id")).values_list("user_id", "n"))
+    counts = dict.fromkeys(user_ids, 0)
+    counts.update(rows)
+    return counts
+
+
+def _seed(user_ids, pending=0):
+    # ON CONFLICT DO NOTHING: if another transaction seeded first, its COUNT
+    # can't include our uncommitted rows, so callers still apply their delta.
+    # `pending` is that delta, already in our COUNT and not to be seeded.
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=uid, unread=n - pending) for uid, n in _actual(user_ids).items()],
+        ignore_conflicts=True,
+    )
+
+
+def add_unread(user_ids, delta=1):
+    """Adjust each user's counter by `delta` (once per id; pass ids after the rows are written)."""
+    ids = list(dict.fromkeys(user_ids))
+    if not ids or not delta:
+        return
+    existing = set(UnreadCounter.objects.filter(user_id__in=ids).values_list("user_id", flat=True))
+    missing = [uid for uid in ids if uid not in existing]
+    if missing:
+        _seed(missing, pending=delta)
+    UnreadCounter.objects.filter(user_id__in=ids).update(unread=F("unread") + delta)
+
+
+def mark_all_read(user_id):
+    """Mark every notification read; returns how many changed."""
+    updated = Notification.objects.filter(user_id=user_id, is_read=False).update(is_read=True)
+    UnreadCounter.objects.update_or_create(user_id=user_id, defaults={"unread": 0})
+    return updated
+
+
+def unread(user_id):
+    value = UnreadCounter.objects.filter(user_id=user_id).values_list("unread", flat=True).first()
+    if value is None:
+        _seed([user_id])
+        value = UnreadCounter.objects.filter(user_id=user_id).values_list("unread", flat=True).first()
+    return max(0, value)
+
+
+async def aunread(user_id):
+    value = await UnreadCounter.objects.filter(user_id=user_id).values_list("unread", flat=True).afirst()
+    if value is None:
+        from asgiref.sync import sync_to_async
+        return await sync_to_async(unread)(user_id)
+    return max(0, value)
+
+
+def reconcile(user_ids=None, dry_run=False):
+    """
+    Compare counters with real unread counts and fix the ones that drifted.
+    Returns {user_id: (stored, actual)} for every mismatch (missing rows
+    count as stored None).
+    """
+    if user_ids is None:
+        user_ids = set(UnreadCounter.objects.values_list("user_id", flat=True)) | set(
+            Notification.objects.filter(is_read=False).values_list("user_id", flat=True).distinct()
+        )
+    user_ids = sorted(user_ids)
+    stored = dict(UnreadCounter.objects.filter(user_id__in=user_ids).values_list("user_id", "unread"))
+    drift = {}
+    for start in range(0, len(user_ids), 1000):
+        for uid, n in _actual(user_ids[start:start + 1000]).items():
+            if stored.get(uid) != n:
+                drift[uid] = (stored.get(uid), n)
+    if not dry_run:
+        for uid, (_, n) in drift.items():
+            # relative fix so writes racing with the reconcile aren't lost
+            if uid in stored:
+                UnreadCounter.objects.filter(user_id=uid).update(unread=F("unread") + (n - stored[uid]))
+            else:
+                UnreadCounter.objects.bulk_create([UnreadCounter(user_id=uid, unread=n)], ignore_conflicts=True)
+    return drift
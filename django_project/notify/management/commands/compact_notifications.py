@@ -0,0 +1,37 @@
+"""
+Apply the notification retention policy.
+
+    python manage.py compact_notifications                    # NOTIFY_RETENTION_DAYS
+    python manage.py compact_notifications --days 30 --archive notif.jsonl.gz
+    python manage.py compact_notifications --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from notify.retention import CHUNK_SIZE, collapse_duplicates, purge_read, table_size
+
+
+def _fmt(size):
+    rows, nbytes = size
+    return f"{rows} rows" + (f", {nbytes / 1024 / 1024:.1f} MiB" if nbytes is not None else "")
+
+
+class Command(BaseCommand):
+    help = "Delete old read notifications (optionally archiving them) and collapse duplicates."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Keep read notifications newer than this (default: NOTIFY_RETENTION_DAYS).")
+        parser.add_argument("--archive", help="Append deleted rows as JSON lines to this file (.gz to compress).")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows deleted per transaction.")
+        parser.add_argument("--no-collapse", action="store_true", help="Skip collapsing duplicate notifications.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be removed.")
+
+    def handle(self, *args, days, archive, chunk_size, no_collapse, dry_run, **opts):
+        self.stdout.write(f"before: {_fmt(table_size())}")
+        verb = "would remove" if dry_run else "removed"
+        purged = purge_read(days=days, chunk_size=chunk_size, archive=archive, dry_run=dry_run)
+        self.stdout.write(f"{verb} {purged} old read notification(s)")
+        if not no_collapse:
+            collapsed = collapse_duplicates(chunk_size=chunk_size, dry_run=dry_run)
+            self.stdout.write(f"{verb} {collapsed} duplicate notification(s)")
+        # sqlite/postgres only give the space back to the OS after VACUUM
+        self.stdout.write(f"after: {_fmt(table_size())}")
@@ -0,0 +1,25 @@
+"""
+Repair drift in the per-user unread counters.
+
+    python manage.py reconcile_unread              # fix every counter
+    python manage.py reconcile_unread --dry-run    # only report
+    python manage.py reconcile_unread --user 12 --user 40
+"""
+from django.core.management.base import BaseCommand
+
+from notify.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recompute UnreadCounter rows from Notification and fix the ones that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without fixing it.")
+        parser.add_argument("--user", type=int, action="append", dest="user_ids", help="Only this user id.")
+
+    def handle(self, *args, dry_run, user_ids, **opts):
+        drift = reconcile(user_ids=user_ids, dry_run=dry_run)
+        for uid, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"user {uid}: counter {stored}, actual {actual}")
+        verb = "found" if dry_run else "fixed"
+        self.stdout.write(f"{verb} {len(drift)} drifted counter(s)")
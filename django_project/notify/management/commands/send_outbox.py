@@ -0,0 +1,35 @@
+"""
+Deliver queued OutboxEmail rows.
+
+    python manage.py send_outbox            # poll forever
+    python manage.py send_outbox --once     # send what's due and exit (cron)
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from notify.outbox import send_pending
+
+
+class Command(BaseCommand):
+    help = "Send queued outbox emails over a single SMTP connection per pass."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Send due emails, then exit.")
+        parser.add_argument("--sleep", type=float, default=5.0, help="Seconds between polls when idle.")
+        parser.add_argument("--limit", type=int, default=500, help="Emails claimed per pass.")
+        parser.add_argument("--batch-size", type=int, default=50, help="Sent rows marked per UPDATE.")
+
+    def handle(self, *args, once, sleep, limit, batch_size, **opts):
+        sent = failed = 0
+        try:
+            while True:
+                s, f = send_pending(limit=limit, batch_size=batch_size)
+                sent, failed = sent + s, failed + f
+                if not (s or f):
+                    if once:
+                        break
+                    time.sleep(sleep)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"sent {sent}, failed {failed}")
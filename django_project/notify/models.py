@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 class Notification(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notifications")
@@ -11,6 +12,54 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # feed / recent: WHERE user = ? ORDER BY created_at DESC, id DESC
+            models.Index(fields=["user", "-created_at", "-id"], name="notif_user_feed_idx"),
+            # unread filters and counts
+            models.Index(fields=["user", "is_read", "-created_at"], name="notif_user_unread_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} → {self.user}"
+
+
+class OutboxEmail(models.Model):
+    """
+    Email written in the same transaction as the change that triggers it and
+    delivered later by `manage.py send_outbox` (see notify/outbox.py).
+    """
+    PENDING, SENDING, SENT, FAILED = "pending", "sending", "sent", "failed"
+    STATE_CHOICES = [(PENDING, "Pending"), (SENDING, "Sending"), (SENT, "Sent"), (FAILED, "Failed")]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["state", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)} ({self.state})"
+
+
+class UnreadCounter(models.Model):
+    """
+    Denormalized unread count per user, maintained by notify/counters.py so
+    unread_count is a primary-key lookup. `manage.py reconcile_unread`
+    repairs drift from writes that bypass it.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                                primary_key=True, related_name="unread_counter")
+    unread = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
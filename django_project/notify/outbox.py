@@ -0,0 +1,124 @@
+"""
+Transactional email outbox.
+
+`queue_email()` is a drop-in for `send_mail()` on request paths: it only
+inserts an OutboxEmail row, so it commits or rolls back with the caller's
+transaction and never waits on SMTP. `send_pending()` (run by
+`manage.py send_outbox`) opens one backend connection, delivers due rows
+over it one message at a time, marks them sent in batches, and reschedules
+failures with exponential backoff.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+log = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 60
+# a row still "sending" after this long belongs to a sender that died
+LOCK_TIMEOUT = timedelta(minutes=15)
+
+
+def queue_email(subject, message, recipient_list, from_email=None):
+    """Same arguments as send_mail(); returns the OutboxEmail row."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(recipient_list),
+    )
+
+
+def queue_emails(messages):
+    """Bulk form of queue_email for (subject, message, recipient_list) tuples."""
+    return OutboxEmail.objects.bulk_create([
+        OutboxEmail(subject=s, body=m, from_email=settings.DEFAULT_FROM_EMAIL, to=list(r))
+        for s, m, r in messages
+    ])
+
+
+def _claim(limit):
+    now = timezone.now()
+    OutboxEmail.objects.filter(state=OutboxEmail.SENDING, locked_at__lt=now - LOCK_TIMEOUT) \
+        .update(state=OutboxEmail.PENDING, locked_at=None)
+    ids = list(
+        OutboxEmail.objects.filter(state=OutboxEmail.PENDING, next_attempt_at__lte=now)
+        .order_by("id").values_list("id", flat=True)[:limit]
+    )
+    # conditional update so two senders never pick up the same row; the
+    # rows this sender won are the ones stamped with its `now`
+    OutboxEmail.objects.filter(pk__in=ids, state=OutboxEmail.PENDING) \
+        .update(state=OutboxEmail.SENDING, locked_at=now)
+    return list(OutboxEmail.objects.filter(pk__in=ids, state=OutboxEmail.SENDING, locked_at=now)
+                .order_by("id"))
+
+
+def _message(row, connection):
+    return EmailMessage(row.subject, row.body, row.from_email, row.to, connection=connection)
+
+
+def _mark_sent(rows):
+    OutboxEmail.objects.filter(pk__in=[r.pk for r in rows]).update(
+        state=OutboxEmail.SENT, sent_at=timezone.now(), locked_at=None
+    )
+
+
+def _mark_failed(row, exc):
+    row.attempts += 1
+    row.last_error = f"{type(exc).__name__}: {exc}"
+    row.locked_at = None
+    max_attempts = getattr(settings, "OUTBOX_MAX_ATTEMPTS", MAX_ATTEMPTS)
+    if row.attempts >= max_attempts:
+        row.state = OutboxEmail.FAILED
+        log.error("outbox email %s to %s failed after %d attempts", row.pk, row.to, row.attempts)
+    else:
+        row.state = OutboxEmail.PENDING
+        base = getattr(settings, "OUTBOX_BACKOFF_SECONDS", BACKOFF_BASE_SECONDS)
+        row.next_attempt_at = timezone.now() + timedelta(seconds=base * 2 ** (row.attempts - 1))
+    row.save(update_fields=["attempts", "last_error", "locked_at", "state", "next_attempt_at"])
+
+
+def send_pending(limit=500, batch_size=50, connection=None):
+    """
+    Deliver up to `limit` due emails over one connection. Returns (sent, failed).
+    Each message gets its own send_messages() call, so a failure affects only
+    that row and never resends ones already delivered; delivered rows are
+    marked sent `batch_size` at a time.
+    """
+    rows = _claim(limit)
+    if not rows:
+        return 0, 0
+    sent = failed = 0
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:  # server unreachable: every row backs off
+        for row in rows:
+            _mark_failed(row, exc)
+        return 0, len(rows)
+    delivered = []
+    try:
+        for row in rows:
+            try:
+                connection.send_messages([_message(row, connection)])
+            except Exception as exc:
+                _mark_failed(row, exc)
+                failed += 1
+            else:
+                delivered.append(row)
+                sent += 1
+                if len(delivered) >= batch_size:
+                    _mark_sent(delivered)
+                    delivered = []
+    finally:
+        # before close(), which can fail after every message went out
+        if delivered:
+            _mark_sent(delivered)
+        connection.close()
+    return sent, failed
@@ -0,0 +1,61 @@
+"""
+Per-user change markers for the notification stream.
+
+Every write that changes a user's notifications calls `touch(user_ids)`,
+which bumps a version number in the cache after the transaction commits.
+The SSE view watches that number and only hits the database when it moves.
+Bulk paths (bulk_create / QuerySet.update) don't send model signals, so
+they call `touch()` themselves.
+
+Use a shared cache (NOTIFY_STREAM_CACHE) when running more than one ASGI
+process; with the per-process default, streams still catch up on their
+periodic resync.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+VERSION_KEY = "notify:version:%s"
+CACHED_KEY = "notify:cached:%s:%s:%s"  # user, name, version
+CACHED_SECONDS = 300
+
+
+def _cache():
+    return caches[getattr(settings, "NOTIFY_STREAM_CACHE", "default")]
+
+
+def _bump(user_ids):
+    cache = _cache()
+    for uid in user_ids:
+        key = VERSION_KEY % uid
+        try:
+            cache.incr(key)
+        except ValueError:  # key missing or evicted
+            cache.set(key, 1, None)
+
+
+def touch(user_ids):
+    """Mark these users' notifications as changed (after commit)."""
+    ids = sorted(set(user_ids))
+    if ids:
+        transaction.on_commit(lambda: _bump(ids))
+
+
+def cached(user_id, name, compute, timeout=None):
+    """
+    `compute()` cached per user until their next `touch()`. The key embeds the
+    current version, so a bump makes old entries unreachable (they expire).
+    """
+    cache = _cache()
+    key = CACHED_KEY % (user_id, name, cache.get(VERSION_KEY % user_id, 0))
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        if timeout is None:
+            timeout = getattr(settings, "NOTIFY_CACHED_SECONDS", CACHED_SECONDS)
+        cache.set(key, value, timeout)
+    return value
+
+
+async def aversion(user_id):
+    return await _cache().aget(VERSION_KEY % user_id, 0)
@@ -0,0 +1,107 @@
+"""
+Notification retention: drop old read rows and collapse duplicates.
+
+Both passes delete in id chunks, each in its own short transaction, so a
+run over millions of rows never holds a long lock. Deletes go straight to
+SQL. Going through Model.delete() would load every row just to fire
+post_delete. Unread counters and stream markers are fixed once per
+chunk instead.
+"""
+import gzip
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .counters import reconcile
+from .models import Notification
+from .realtime import touch
+
+RETENTION_DAYS = 90
+CHUNK_SIZE = 5000
+ARCHIVE_FIELDS = ("id", "user_id", "title", "body", "url", "is_read", "created_at")
+
+
+def table_size():
+    """(rows, bytes on disk or None when the backend can't tell)."""
+    rows = Notification.objects.count()
+    table = Notification._meta.db_table
+    try:
+        with connection.cursor() as cur:
+            if connection.vendor == "postgresql":
+                cur.execute("SELECT pg_total_relation_size(%s)", [table])
+            elif connection.vendor == "sqlite":
+                # dbstat is compiled into most sqlite builds, not all
+                cur.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = %s", [table])
+            else:
+                return rows, None
+            size = cur.fetchone()[0]
+    except DatabaseError:
+        return rows, None
+    return rows, size
+
+
+def _open_archive(path):
+    return gzip.open(path, "at", encoding="utf-8") if str(path).endswith(".gz") \
+        else open(path, "a", encoding="utf-8")
+
+
+def _delete(ids):
+    table = connection.ops.quote_name(Notification._meta.db_table)
+    with connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+
+
+def _delete_chunks(qs, chunk_size, archive=None):
+    """Delete every row of `qs` in id order, `chunk_size` rows per transaction."""
+    out = _open_archive(archive) if archive else None
+    removed, after = 0, 0
+    try:
+        while True:
+            rows = list(qs.filter(id__gt=after).order_by("id").values(*ARCHIVE_FIELDS)[:chunk_size])
+            if not rows:
+                break
+            if out:
+                out.writelines(json.dumps(r, cls=DjangoJSONEncoder) + "\n" for r in rows)
+                out.flush()  # on disk before the rows are gone
+            with transaction.atomic():
+                _delete([r["id"] for r in rows])
+                unread = {r["user_id"] for r in rows if not r["is_read"]}
+                if unread:
+                    reconcile(unread)
+                touch(r["user_id"] for r in rows)
+            removed, after = removed + len(rows), rows[-1]["id"]
+    finally:
+        if out:
+            out.close()
+    return removed
+
+
+def purge_read(days=None, chunk_size=CHUNK_SIZE, archive=None, dry_run=False):
+    """
+    Delete read notifications older than `days` (NOTIFY_RETENTION_DAYS),
+    appending them as JSON lines to `archive` first when given.
+    Returns the number of rows removed (or that would be).
+    """
+    days = getattr(settings, "NOTIFY_RETENTION_DAYS", RETENTION_DAYS) if days is None else days
+    qs = Notification.objects.filter(is_read=True, created_at__lt=timezone.now() - timedelta(days=days))
+    return qs.count() if dry_run else _delete_chunks(qs, chunk_size, archive)
+
+
+def collapse_duplicates(chunk_size=CHUNK_SIZE, dry_run=False):
+    """
+    Keep only the newest of each set of identical notifications (same user,
+    title, body and url, e.g. an event fan-out that ran twice). Returns the
+    number of rows removed (or that would be).
+    """
+    newer_copy = Notification.objects.filter(
+        user_id=OuterRef("user_id"), title=OuterRef("title"), body=OuterRef("body"),
+        url=OuterRef("url"), id__gt=OuterRef("id"),
+    )
+    # the newest copy never matches, so deleting earlier chunks can't change later ones
+    qs = Notification.objects.filter(Exists(newer_copy))
+    return qs.count() if dry_run else _delete_chunks(qs, chunk_size)
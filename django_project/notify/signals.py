@@ -0,0 +1,28 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .counters import add_unread
+from .models import Notification
+from .realtime import touch
+
+
+@receiver(post_init, sender=Notification)
+def remember_read_state(sender, instance, **kwargs):
+    # deferred field: unknown, post_save falls back to no delta
+    instance._was_read = instance.__dict__.get("is_read")
+
+
+@receiver(post_save, sender=Notification)
+def on_notification_saved(sender, instance, created, **kwargs):
+    was_read = True if created else instance._was_read
+    if was_read is not None and was_read != instance.is_read:
+        add_unread([instance.user_id], -1 if instance.is_read else 1)
+    instance._was_read = instance.is_read
+    touch([instance.user_id])
+
+
+@receiver(post_delete, sender=Notification)
+def on_notification_deleted(sender, instance, **kwargs):
+    if instance.__dict__.get("is_read") is False:
+        add_unread([instance.user_id], -1)
+    touch([instance.user_id])
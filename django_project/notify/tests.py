@@ -1,3 +1,325 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPRecipientsRefused
 
-# Create your tests here.
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from notify.counters import add_unread, unread
+from notify.models import Notification, OutboxEmail, UnreadCounter
+from notify.realtime import VERSION_KEY
+from notify.outbox import queue_email, queue_emails, send_pending
+
+
+class FlakyBackend(EmailBackend):
+    """locmem backend that rejects one address and counts connections."""
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any("bad@example.com" in m.to for m in messages):
+            raise SMTPRecipientsRefused({"bad@example.com": (550, b"no such user")})
+        return super().send_messages(messages)
+
+
+class ThirdFailsOnceBackend(EmailBackend):
+    """locmem backend that delivers one message at a time and drops the connection once, on the 3rd."""
+    tried = 0
+
+    def send_messages(self, messages):
+        for m in messages:
+            ThirdFailsOnceBackend.tried += 1
+            if ThirdFailsOnceBackend.tried == 3:
+                raise ConnectionResetError("connection reset by peer")
+            super().send_messages([m])
+        return len(messages)
+
+
+class OutboxTests(TestCase):
+    def test_queue_writes_row_without_sending(self):
+        row = queue_email("Hi", "body", ["a@example.com"])
+        assert row.state == OutboxEmail.PENDING and row.from_email
+        assert mail.outbox == []
+
+    def test_send_pending_delivers_in_batches_over_one_connection(self):
+        FlakyBackend.opened = 0
+        queue_emails([(f"s{i}", "b", [f"v{i}@example.com"]) for i in range(5)])
+        assert send_pending(batch_size=2, connection=FlakyBackend()) == (5, 0)
+        assert FlakyBackend.opened == 1 and len(mail.outbox) == 5
+        assert not OutboxEmail.objects.exclude(state=OutboxEmail.SENT).exists()
+        assert send_pending() == (0, 0)
+
+    def test_bad_recipient_backs_off_without_blocking_batch(self):
+        queue_emails([("ok", "b", ["a@example.com"]), ("bad", "b", ["bad@example.com"]),
+                      ("ok2", "b", ["c@example.com"])])
+        assert send_pending(connection=FlakyBackend()) == (2, 1)
+        bad = OutboxEmail.objects.get(subject="bad")
+        assert bad.state == OutboxEmail.PENDING and bad.attempts == 1
+        assert bad.next_attempt_at > timezone.now() and "SMTPRecipientsRefused" in bad.last_error
+        assert send_pending(connection=FlakyBackend()) == (0, 0)  # not due yet
+
+    def test_mid_batch_failure_never_resends_delivered_mail(self):
+        ThirdFailsOnceBackend.tried = 0
+        queue_emails([(f"s{c}", "b", [f"{c}@x"]) for c in "abcd"])
+        assert send_pending(batch_size=4, connection=ThirdFailsOnceBackend()) == (3, 1)
+        assert [m.to[0] for m in mail.outbox] == ["a@x", "b@x", "d@x"]
+        states = dict(OutboxEmail.objects.values_list("subject", "state"))
+        assert states == {"sa": OutboxEmail.SENT, "sb": OutboxEmail.SENT,
+                          "sc": OutboxEmail.PENDING, "sd": OutboxEmail.SENT}
+
+    def test_claim_is_one_update(self):
+        from notify.outbox import _claim
+        queue_emails([(f"s{i}", "b", [f"v{i}@example.com"]) for i in range(5)])
+        # stale reclaim UPDATE, due ids, claim UPDATE, re-select
+        with self.assertNumQueries(4):
+            rows = _claim(3)
+        assert [r.subject for r in rows] == ["s0", "s1", "s2"]
+        assert OutboxEmail.objects.filter(state=OutboxEmail.SENDING).count() == 3
+        assert _claim(10) and _claim(10) == []
+
+    def test_gives_up_after_max_attempts(self):
+        queue_email("bad", "b", ["bad@example.com"])
+        with self.settings(OUTBOX_MAX_ATTEMPTS=2), self.assertLogs("notify.outbox", "ERROR"):
+            for _ in range(2):
+                OutboxEmail.objects.update(next_attempt_at=timezone.now())
+                send_pending(connection=FlakyBackend())
+        assert OutboxEmail.objects.get().state == OutboxEmail.FAILED
+
+    def test_stale_sending_rows_are_reclaimed(self):
+        queue_email("Hi", "body", ["a@example.com"])
+        OutboxEmail.objects.update(state=OutboxEmail.SENDING, locked_at=timezone.now() - timedelta(hours=1))
+        out = StringIO()
+        call_command("send_outbox", "--once", stdout=out)
+        assert "sent 1" in out.getvalue() and len(mail.outbox) == 1
+
+
+def _parse(chunks):
+    """[(event, data)] from raw SSE chunks, skipping retry/keep-alive lines."""
+    out = []
+    for block in "".join(chunks).split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if "event" in fields:
+            out.append((fields["event"], json.loads(fields["data"])))
+    return out
+
+
+@override_settings(NOTIFY_SSE=True, NOTIFY_STREAM_POLL_SECONDS=0.01, NOTIFY_STREAM_MAX_SECONDS=0.3)
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create(email="u@example.com")
+        self.old = Notification.objects.create(user=self.user, title="old")
+
+    async def _read(self, during=None, login=True, **headers):
+        if login:
+            await self.async_client.aforce_login(self.user)
+        r = await self.async_client.get("/api/notifications/stream/", headers=headers)
+        assert r["Content-Type"] == "text/event-stream"
+        chunks = []
+
+        async def consume():
+            async for c in r.streaming_content:
+                chunks.append(c.decode())
+
+        task = asyncio.ensure_future(consume())
+        if during:
+            await asyncio.sleep(0.05)
+            await during()
+        await task
+        return _parse(chunks)
+
+    async def test_fresh_connection_sends_count_then_new_rows(self):
+        def add():
+            with self.captureOnCommitCallbacks(execute=True):
+                Notification.objects.create(user=self.user, title="new")
+        events = await self._read(during=sync_to_async(add))
+        assert events[0] == ("unread", {"count": 1})
+        assert [(e, d["title"]) for e, d in events[1:2]] == [("notification", "new")]
+        assert events[2] == ("unread", {"count": 2})
+
+    async def test_resumes_after_last_event_id(self):
+        events = await self._read(**{"Last-Event-ID": "0"})
+        assert [e for e, _ in events] == ["notification", "unread"]
+
+    def test_no_queries_while_nothing_changes(self):
+        # session, user, max id, then one sync (new rows + count); the other
+        # ~30 polls in the 0.3s window only read the cache marker
+        async_to_sync(self.async_client.aforce_login)(self.user)
+        with self.assertNumQueries(5):
+            events = async_to_sync(self._read)(login=False)
+        assert events == [("unread", {"count": 1})]
+
+    async def test_requires_login(self):
+        r = await self.async_client.get("/api/notifications/stream/")
+        assert r.status_code == 401
+
+    async def test_disabled_without_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        with self.settings(NOTIFY_SSE=False):
+            r = await self.async_client.get("/api/notifications/stream/")
+        assert r.status_code == 204 and not r.streaming
+
+    def test_pages_poll_unless_sse_is_enabled(self):
+        self.client.force_login(self.user)
+        with self.settings(NOTIFY_SSE=False):
+            assert "const USE_SSE = false;" in self.client.get("/volunteers_r_us/").content.decode()
+        assert "const USE_SSE = true;" in self.client.get("/volunteers_r_us/").content.decode()
+
+    def test_saving_a_notification_bumps_the_marker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(user=self.user, title="x")
+        assert cache.get(VERSION_KEY % self.user.pk) == 1
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create(email="c@example.com")
+        self.client.force_login(self.user)
+
+    def _count(self):
+        return UnreadCounter.objects.get(user=self.user).unread
+
+    def test_create_read_and_delete_keep_counter_in_step(self):
+        a = Notification.objects.create(user=self.user, title="a")
+        b = Notification.objects.create(user=self.user, title="b")
+        Notification.objects.create(user=self.user, title="seen", is_read=True)
+        assert self._count() == 2
+        self.client.post(f"/api/notifications/{a.pk}/mark_read/")
+        assert self._count() == 1
+        b.delete()
+        assert self._count() == 0
+
+    def test_unread_count_is_a_single_lookup(self):
+        Notification.objects.create(user=self.user, title="a")
+        self.client.get("/api/notifications/unread_count/")  # warm the session
+        with self.assertNumQueries(3):  # session, user, counter row
+            r = self.client.get("/api/notifications/unread_count/")
+        assert r.json() == {"count": 1}
+
+    def test_mark_all_read_reports_updated_rows_and_zeroes(self):
+        for t in "abc":
+            Notification.objects.create(user=self.user, title=t)
+        r = self.client.post("/api/notifications/mark_all_read/")
+        assert r.json() == {"updated": 3} and self._count() == 0
+
+    def test_missing_counter_is_seeded_from_rows(self):
+        Notification.objects.bulk_create([Notification(user=self.user, title=t) for t in "ab"])
+        assert unread(self.user.pk) == 2
+        add_unread([self.user.pk])  # later bulk write
+        assert self._count() == 3
+
+    def test_concurrent_seed_does_not_swallow_the_increment(self):
+        from notify import counters
+        real_seed = counters._seed
+        Notification.objects.create(user=self.user, title="theirs")
+        UnreadCounter.objects.filter(user=self.user).delete()
+
+        def seed_after_other_writer(user_ids, pending=0):
+            # another transaction seeds first, counting only its own row
+            UnreadCounter.objects.create(user=self.user, unread=1)
+            real_seed(user_ids, pending)
+
+        Notification.objects.bulk_create([Notification(user=self.user, title="ours")])
+        with mock.patch.object(counters, "_seed", seed_after_other_writer):
+            add_unread([self.user.pk])
+        assert self._count() == 2 == Notification.objects.filter(is_read=False).count()
+
+    def test_reconcile_fixes_drift(self):
+        Notification.objects.create(user=self.user, title="a")
+        Notification.objects.filter(user=self.user).update(is_read=True)  # bypasses the counter
+        out = StringIO()
+        call_command("reconcile_unread", "--dry-run", stdout=out)
+        assert "found 1 drifted" in out.getvalue() and self._count() == 1
+        call_command("reconcile_unread", stdout=out)
+        assert self._count() == 0
+        call_command("reconcile_unread", stdout=(out := StringIO()))
+        assert "fixed 0 drifted" in out.getvalue()
+
+
+class NotificationFeedTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create(email="feed@example.com")
+        other = get_user_model().objects.create(email="other@example.com")
+        now = timezone.now()
+        # same timestamp for most rows, like a fan-out batch
+        Notification.objects.bulk_create(
+            [Notification(user=self.user, title=f"n{i}", is_read=i % 2 == 0,
+                          created_at=now if i >= 2 else now - timedelta(hours=1)) for i in range(7)]
+            + [Notification(user=other, title="not mine", created_at=now)]
+        )
+        self.client.force_login(self.user)
+
+    def _walk(self, url):
+        titles, pages = [], 0
+        while url:
+            body = self.client.get(url).json()
+            titles += [n["title"] for n in body["results"]]
+            url, pages = body["next"], pages + 1
+        return titles, pages
+
+    def test_pages_cover_everything_once_newest_first(self):
+        titles, pages = self._walk("/api/notifications/?page_size=3")
+        assert titles == ["n6", "n5", "n4", "n3", "n2", "n1", "n0"] and pages == 3
+
+    def test_unread_filter(self):
+        titles, _ = self._walk("/api/notifications/?unread=1&page_size=2")
+        assert titles == ["n5", "n3", "n1"]
+
+    def test_bad_cursor_is_404(self):
+        assert self.client.get("/api/notifications/?cursor=nope").status_code == 404
+
+    def test_feed_query_uses_the_composite_index(self):
+        qs = Notification.objects.filter(user=self.user, created_at__lte=timezone.now()) \
+            .order_by("-created_at", "-id")[:50]
+        assert "notif_user_feed_idx" in qs.explain()
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create(email="old@example.com")
+        old = timezone.now() - timedelta(days=120)
+        rows = Notification.objects.bulk_create(
+            [Notification(user=self.user, title=f"old{i}", is_read=True) for i in range(5)]
+            + [Notification(user=self.user, title="old unread"), Notification(user=self.user, title="recent", is_read=True)]
+        )
+        Notification.objects.filter(pk__in=[n.pk for n in rows[:6]]).update(created_at=old)
+
+    def test_purges_old_read_rows_in_chunks_and_archives_them(self):
+        path = os.path.join(tempfile.mkdtemp(), "archive.jsonl.gz")
+        out = StringIO()
+        call_command("compact_notifications", "--chunk-size", "2", "--archive", path, stdout=out)
+        assert sorted(Notification.objects.values_list("title", flat=True)) == ["old unread", "recent"]
+        with gzip.open(path, "rt") as f:
+            assert sorted(json.loads(line)["title"] for line in f) == [f"old{i}" for i in range(5)]
+        text = out.getvalue()
+        assert "before: 7 rows" in text and "removed 5 old read" in text and "after: 2 rows" in text
+
+    def test_dry_run_changes_nothing(self):
+        out = StringIO()
+        call_command("compact_notifications", "--dry-run", stdout=out)
+        assert "would remove 5 old read" in out.getvalue() and Notification.objects.count() == 7
+
+    def test_collapses_duplicates_keeping_newest_and_fixes_counter(self):
+        dupes = [Notification.objects.create(user=self.user, title="New event: Clinic", body="x") for _ in range(3)]
+        assert UnreadCounter.objects.get(user=self.user).unread == 4
+        out = StringIO()
+        call_command("compact_notifications", "--days", "1000", stdout=out)
+        assert "removed 2 duplicate" in out.getvalue()
+        assert list(Notification.objects.filter(title="New event: Clinic").values_list("pk", flat=True)) == [dupes[-1].pk]
+        assert UnreadCounter.objects.get(user=self.user).unread == 2
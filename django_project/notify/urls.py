@@ -1,8 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import NotificationViewSet
+from .views import NotificationViewSet, notification_stream
 
 router = DefaultRouter()
 router.register(r"notifications", NotificationViewSet, basename="notification")
 
-urlpatterns = [path("", include(router.urls))]
\ No newline at end of file
+urlpatterns = [
+    # before the router, whose detail route would otherwise claim "stream"
+    path("notifications/stream/", notification_stream, name="notification-stream"),
+    path("", include(router.urls)),
+]
\ No newline at end of file
@@ -1,6 +1,16 @@
+import asyncio
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework import viewsets, permissions, mixins, decorators, response, status
 from notify.models import Notification
 from .serializers import NotificationSerializer
+from .pagination import NotificationFeedPagination
+from .counters import aunread, mark_all_read, unread
+from .realtime import aversion, touch
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework import status
@@ -11,10 +21,17 @@ class NotificationViewSet(mixins.ListModelMixin,
                           viewsets.GenericViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = NotificationSerializer
+    pagination_class = NotificationFeedPagination  # list: ?cursor=&page_size=&unread=1
 
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)
 
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == "list" and self.request.query_params.get("unread") in ("1", "true"):
+            queryset = queryset.filter(is_read=False)
+        return queryset
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
@@ -28,17 +45,94 @@ class NotificationViewSet(mixins.ListModelMixin,
 
     @decorators.action(detail=False, methods=["post"])
     def mark_all_read(self, request):
-        qs = self.get_queryset().filter(is_read=False)
-        qs.update(is_read=True)
-        return response.Response({"updated": qs.count()}, status=status.HTTP_200_OK)
+        updated = mark_all_read(request.user.pk)
+        touch([request.user.pk])  # QuerySet.update sends no signals
+        return response.Response({"updated": updated}, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["get"])
     def unread_count(self, request):
-        c = self.get_queryset().filter(is_read=False).count()
-        return Response({"count": c})
+        return Response({"count": unread(request.user.pk)})
 
     @action(detail=False, methods=["get"])
     def recent(self, request):
-        qs = self.get_queryset().order_by("-created_at")[:10]
+        qs = self.get_queryset().order_by("-created_at", "-id")[:10]
         data = self.get_serializer(qs, many=True).data
-        return Response({"items": data})
\ No newline at end of file
+        return Response({"items": data})
+
+
+# ---------- server-sent events ----------
+# How often a stream checks its user's change marker (a cache read, no SQL),
+# re-reads the DB regardless, sends a keep-alive, and gives up so the
+# browser's EventSource reconnects (resuming from Last-Event-ID).
+STREAM_POLL_SECONDS = 1.0
+STREAM_RESYNC_SECONDS = 30.0
+STREAM_HEARTBEAT_SECONDS = 15.0
+STREAM_MAX_SECONDS = 300.0
+STREAM_BATCH = 50
+
+
+def _sse(event, data, id=None):
+    head = f"id: {id}\n" if id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def _stream(user_id, last_id):
+    conf = lambda name, default: getattr(settings, name, default)
+    poll = conf("NOTIFY_STREAM_POLL_SECONDS", STREAM_POLL_SECONDS)
+    resync = conf("NOTIFY_STREAM_RESYNC_SECONDS", STREAM_RESYNC_SECONDS)
+    heartbeat = conf("NOTIFY_STREAM_HEARTBEAT_SECONDS", STREAM_HEARTBEAT_SECONDS)
+    max_seconds = conf("NOTIFY_STREAM_MAX_SECONDS", STREAM_MAX_SECONDS)
+
+    loop = asyncio.get_running_loop()
+    started = last_sync = last_sent = loop.time()
+    version, count, dirty = None, None, True
+    yield "retry: 5000\n\n"
+    while loop.time() - started < max_seconds:
+        now = loop.time()
+        current = await aversion(user_id)
+        if dirty or current != version or now - last_sync >= resync:
+            version, last_sync, dirty = current, now, False
+            qs = Notification.objects.filter(user_id=user_id, id__gt=last_id).order_by("id")
+            sent = 0
+            async for n in qs[:STREAM_BATCH]:
+                last_id, sent = n.id, sent + 1
+                yield _sse("notification", NotificationSerializer(n).data, id=n.id)
+            dirty = sent == STREAM_BATCH  # more waiting: go again next tick
+            c = await aunread(user_id)
+            if c != count:
+                count, sent = c, sent + 1
+                yield _sse("unread", {"count": c}, id=last_id)
+            if sent:
+                last_sent = now
+        if now - last_sent >= heartbeat:
+            yield ": keep-alive\n\n"
+            last_sent = now
+        await asyncio.sleep(poll)
+
+
+async def notification_stream(request):
+    """
+    GET /api/notifications/stream/ as text/event-stream. Sends `unread`
+    ({"count": n}) whenever the unread count changes and one `notification`
+    event per new row; nothing is queried unless the user's change marker
+    moved (or the periodic resync is due). Serve it under ASGI.
+
+    With settings.NOTIFY_SSE off (WSGI deployments) it answers 204, which
+    tells EventSource clients to stop reconnecting.
+    """
+    if not getattr(settings, "NOTIFY_SSE", False):
+        return HttpResponse(status=204)
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+    raw = request.headers.get("Last-Event-ID") or request.GET.get("last_id")
+    try:
+        last_id = int(raw)
+    except (TypeError, ValueError):
+        # fresh connection: only push what arrives from now on
+        agg = await Notification.objects.filter(user=user).aaggregate(m=Max("id"))
+        last_id = agg["m"] or 0
+    resp = StreamingHttpResponse(_stream(user.pk, last_id), content_type="text/event-stream")
+    resp["Cache-Control"] = "no-cache"
+    resp["X-Accel-Buffering"] = "no"  # don't let a proxy buffer the stream
+    return resp
@@ -30,7 +30,10 @@ function renderMatches(payload){
     const skills = Array.from(v.skills || []);
     return `<li><b>${v.name}</b> | score=${m.score} | skills=[${skills.join(', ')}]</li>`;
   }).join('');
-  box.innerHTML = rows ? `<ul>${rows}</ul>` : '<i>No matches</i>';
+  const shown = (payload.matches || []).length;
+  const total = payload.total ?? shown;
+  const summary = total > shown ? `<small>Top ${shown} of ${total} eligible volunteers</small>` : '';
+  box.innerHTML = rows ? `${summary}<ul>${rows}</ul>` : '<i>No matches</i>';
 }
 
 // Match existing event by id
@@ -2,7 +2,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import (
-    User, Skill, Event, VolunteerProfile, Match, Assignment, VolunteerParticipation, Profile
+    User, Skill, Event, VolunteerProfile, Match, Assignment, VolunteerParticipation, Profile, Job, Report
 )
 
 # ----- USER ADMIN -----
@@ -81,3 +81,16 @@ class VolunteerParticipationAdmin(admin.ModelAdmin):
         "languages", "required_skills"
     )
 
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "key", "state", "attempts", "run_after", "updated_at")
+    list_filter = ("state", "kind")
+    search_fields = ("key", "last_error")
+
+
+@admin.register(Report)
+class ReportAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "format", "state", "rows", "requested_by", "created_at", "finished_at")
+    list_filter = ("state", "kind", "format")
+    search_fields = ("key", "filename", "error")
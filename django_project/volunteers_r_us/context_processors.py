@@ -1,17 +1,31 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from notify.counters import unread
 from notify.models import Notification
+from notify.realtime import cached
 
 
 def notifications(request):
+    """
+    `notif_items` (latest 10) and `notif_unread_count`, evaluated only if the
+    template uses them and cached per user until their notifications change.
+    `notif_sse` tells base.html to use the SSE stream instead of polling.
+    """
     if not getattr(request, "user", None) or not request.user.is_authenticated:
         return {
             "notif_items": [],
             "notif_unread_count": 0,
+            "notif_sse": False,
         }
 
-    qs = Notification.objects.filter(user=request.user).order_by("-created_at")
-    items = list(qs[:10])  # slice first; don't chain filters after this
-    # Since there's no 'unread' field in the model, use total count for now
+    uid = request.user.pk
+
+    def items():
+        return list(Notification.objects.filter(user_id=uid).order_by("-created_at", "-id")[:10])
+
     return {
-        "notif_items": items,
-        "notif_unread_count": qs.count(),
+        "notif_items": SimpleLazyObject(lambda: cached(uid, "recent", items)),
+        "notif_unread_count": SimpleLazyObject(lambda: cached(uid, "unread", lambda: unread(uid))),
+        "notif_sse": getattr(settings, "NOTIFY_SSE", False),
     }
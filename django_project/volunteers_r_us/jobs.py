@@ -0,0 +1,230 @@
+"""
+Small database-backed job queue.
+
+Request code calls `enqueue_on_commit(kind, key, **payload)`. Within one
+transaction, repeated calls for the same key collapse into a single
+insert once it commits; across transactions, a Job row is
+only inserted if none with that key is still pending. Either way a burst of
+changes to one event becomes a single job. `manage.py run_jobs` claims due
+jobs and runs the handler registered for their kind, retrying failures with
+exponential backoff.
+"""
+import logging
+import threading
+import traceback
+from collections import Counter
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Event, Job
+
+log = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 30
+# a job still "running" after this long belongs to a worker that died
+LOCK_TIMEOUT = timedelta(minutes=15)
+
+HANDLERS = {}
+# kinds whose handler runs outside the job transaction (see handler())
+NON_ATOMIC = set()
+
+
+def handler(kind, atomic=True):
+    """
+    Register `fn(**payload)` as the handler for jobs of `kind`. Handlers run
+    in one transaction unless `atomic=False`, for work that commits its own
+    progress or holds the handler open for long (SMTP, file rendering).
+    """
+    def register(fn):
+        HANDLERS[kind] = fn
+        if atomic:
+            NON_ATOMIC.discard(kind)
+        else:
+            NON_ATOMIC.add(kind)
+        return fn
+    return register
+
+
+# ---------- producer side ----------
+# requested: enqueue_on_commit calls; coalesced: calls folded into an
+# earlier one in the same transaction; deduped: flushes that found a pending
+# job already queued; enqueued: Job rows actually inserted
+_stats = Counter()
+_stats_lock = threading.Lock()
+_local = threading.local()
+
+
+def _count(name, n=1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def coalesce_stats(reset=False):
+    """
+    Snapshot of the enqueue counters; `saved` is how many recomputes were
+    avoided (coalesced in-transaction + deduped against pending jobs).
+    """
+    with _stats_lock:
+        snap = dict(_stats)
+        if reset:
+            _stats.clear()
+    snap.setdefault("requested", 0)
+    snap["saved"] = snap.get("coalesced", 0) + snap.get("deduped", 0)
+    return snap
+
+
+def enqueue(kind, key, **payload):
+    """Insert a pending job for `key` unless one is already waiting. Returns True if inserted."""
+    try:
+        with transaction.atomic():
+            Job.objects.create(kind=kind, key=key, payload=payload)
+    except IntegrityError:
+        _count("deduped")  # folded into the pending job (uq_job_pending_key)
+        return False
+    _count("enqueued")
+    return True
+
+
+class _Request:
+    """
+    One enqueue_on_commit call, queued with transaction.on_commit so Django
+    drops it if its transaction or savepoint rolls back. Requests of one
+    transaction share `flushed`: the first to run for a key enqueues it and
+    the rest are folded into it.
+    """
+    __slots__ = ("kind", "key", "payload", "flushed")
+
+    def __init__(self, kind, key, payload, flushed):
+        self.kind, self.key, self.payload, self.flushed = kind, key, payload, flushed
+
+    def __call__(self):
+        if self.key in self.flushed:
+            _count("coalesced")
+            return
+        self.flushed.add(self.key)
+        enqueue(self.kind, self.key, **self.payload)
+
+
+def _flushed_keys(using):
+    """
+    The set shared by this thread's requests in the current transaction. A
+    set is only filled while a commit runs its callbacks, so a non-empty one
+    belongs to a transaction that already committed and a new one starts.
+    """
+    sets = getattr(_local, "flushed", None)
+    if sets is None:
+        sets = _local.flushed = {}
+    flushed = sets.get(using)
+    if flushed is None or flushed:
+        flushed = sets[using] = set()
+    return flushed
+
+
+def enqueue_on_commit(kind, key, using=DEFAULT_DB_ALIAS, **payload):
+    """
+    Queue `kind` for `key` once the current transaction commits (right away
+    in autocommit). However many times a key is requested before the commit,
+    one job is enqueued for it; a request made inside a savepoint that rolls
+    back is dropped with it.
+    """
+    _count("requested")
+    if not transaction.get_connection(using).in_atomic_block:
+        enqueue(kind, key, **payload)
+        return
+    # robust: one failing callback mustn't cost the rest of the commit its jobs
+    transaction.on_commit(_Request(kind, key, payload, _flushed_keys(using)), using=using, robust=True)
+
+
+# ---------- worker side ----------
+def _claim(job):
+    """Atomically move one pending job to running; False if another worker got it."""
+    return Job.objects.filter(pk=job.pk, state=Job.PENDING).update(
+        state=Job.RUNNING, locked_at=timezone.now(), attempts=F("attempts") + 1,
+    ) == 1
+
+
+def _backoff(attempts):
+    base = getattr(settings, "JOB_BACKOFF_SECONDS", BACKOFF_BASE_SECONDS)
+    return timedelta(seconds=base * 2 ** (attempts - 1))
+
+
+def run_job(job):
+    fn = HANDLERS.get(job.kind)
+    try:
+        if fn is None:
+            raise LookupError(f"no handler for job kind {job.kind!r}")
+        with nullcontext() if job.kind in NON_ATOMIC else transaction.atomic():
+            fn(**job.payload)
+    except Exception:
+        job.refresh_from_db(fields=["attempts"])
+        max_attempts = getattr(settings, "JOB_MAX_ATTEMPTS", MAX_ATTEMPTS)
+        job.last_error = traceback.format_exc()
+        if job.attempts >= max_attempts:
+            job.state = Job.FAILED
+            log.error("job %s (%s) failed after %d attempts", job.pk, job.key, job.attempts)
+        else:
+            job.state = Job.PENDING
+            job.run_after = timezone.now() + _backoff(job.attempts)
+        try:
+            with transaction.atomic():
+                job.save(update_fields=["state", "run_after", "last_error", "updated_at"])
+        except IntegrityError:
+            # a newer pending job for the same key already covers the retry
+            Job.objects.filter(pk=job.pk).update(state=Job.DONE, last_error=job.last_error)
+        return False
+    Job.objects.filter(pk=job.pk).update(state=Job.DONE, updated_at=timezone.now())
+    return True
+
+
+def requeue_stale(now=None):
+    """Put jobs abandoned by a crashed worker back in the queue."""
+    cutoff = (now or timezone.now()) - LOCK_TIMEOUT
+    for job in Job.objects.filter(state=Job.RUNNING, locked_at__lt=cutoff):
+        try:
+            with transaction.atomic():
+                Job.objects.filter(pk=job.pk).update(state=Job.PENDING, locked_at=None)
+        except IntegrityError:
+            # a newer pending job for the key will do the same work
+            Job.objects.filter(pk=job.pk).update(state=Job.DONE)
+
+
+def run_pending(limit=100):
+    """Run up to `limit` due jobs in id order; returns how many were claimed."""
+    requeue_stale()
+    due = Job.objects.filter(state=Job.PENDING, run_after__lte=timezone.now()).order_by("id")[:limit]
+    ran = 0
+    for job in due:
+        if _claim(job):
+            run_job(job)
+            ran += 1
+    return ran
+
+
+# ---------- handlers ----------
+@handler("notify_event")
+def _notify_event(event_id):
+    from .matching.notifications import notify_candidates_for_event
+
+    event = Event.objects.filter(pk=event_id).first()
+    if event is not None:  # deleted since it was queued
+        notify_candidates_for_event(event)
+
+
+@handler("send_outbox", atomic=False)
+def _send_outbox():
+    # one pass over the outbox, sharing one SMTP connection; each claim and
+    # mark_sent commits on its own, so a later failure can't resend a batch
+    from notify.outbox import send_pending
+    send_pending()
+
+
+@handler("render_report", atomic=False)
+def _render_report(report_id):
+    from .reports import render_report
+    render_report(report_id)
@@ -0,0 +1,65 @@
+"""
+Benchmark notify_candidates_for_event against a synthetic roster.
+
+    python manage.py bench_notify_fanout --volunteers 20000
+
+Seeds users + VolunteerProfiles with one shared skill, fans out a new event
+to all of them and reports Notification rows inserted per second. Everything
+runs in a transaction that is rolled back, so the database is left as-is.
+"""
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from notify.models import Notification
+from volunteers_r_us.matching.notifications import notify_candidates_for_event, NOTIFY_BATCH_SIZE
+from volunteers_r_us.models import Event, Skill, VolunteerProfile
+
+
+class Command(BaseCommand):
+    help = "Measure Notification fan-out throughput (rows/s) on a throwaway roster."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--volunteers", type=int, default=20000)
+        parser.add_argument("--batch-size", type=int, default=NOTIFY_BATCH_SIZE)
+
+    def handle(self, *args, volunteers, batch_size, **opts):
+        User = get_user_model()
+        with transaction.atomic():
+            skill = Skill.objects.create(name="bench-fanout-skill")
+            users = User.objects.bulk_create(
+                [User(email=f"bench{i}@fanout.invalid") for i in range(volunteers)], batch_size=1000
+            )
+            profiles = VolunteerProfile.objects.bulk_create(
+                [VolunteerProfile(user=u) for u in users], batch_size=1000
+            )
+            through = VolunteerProfile.skills.through
+            through.objects.bulk_create(
+                [through(volunteerprofile_id=p.pk, skill_id=skill.pk) for p in profiles], batch_size=1000
+            )
+            event = Event.objects.create(name="Bench fan-out", description="-", location="-",
+                                         urgency="low", event_date=date.today())
+            event.required_skills.through.objects.create(event_id=event.pk, skill_id=skill.pk)
+
+            t0 = time.perf_counter()
+            created = notify_candidates_for_event(event, batch_size=batch_size)
+            elapsed = time.perf_counter() - t0
+            stored = Notification.objects.filter(title=f"New event: {event.name}").count()
+            if stored != created:
+                # raising also rolls the seeded rows back
+                raise CommandError(f"fan-out reported {created} notifications but {stored} were stored")
+
+            # second run only dedups; nothing should be inserted
+            t1 = time.perf_counter()
+            again = notify_candidates_for_event(event, batch_size=batch_size)
+            dedup = time.perf_counter() - t1
+            transaction.set_rollback(True)
+
+        rate = created / elapsed if elapsed else float("inf")
+        self.stdout.write(
+            f"fan-out: {created} rows in {elapsed:.3f}s ({rate:,.0f} rows/s, batch {batch_size}); "
+            f"re-run: {again} rows in {dedup:.3f}s"
+        )
@@ -0,0 +1,34 @@
+"""
+Background job worker.
+
+    python manage.py run_jobs            # poll forever
+    python manage.py run_jobs --once     # drain what's due and exit (cron)
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from volunteers_r_us.jobs import run_pending
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (notification fan-out, ...)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run due jobs, then exit.")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Seconds between polls when idle.")
+        parser.add_argument("--batch", type=int, default=100, help="Jobs claimed per poll.")
+
+    def handle(self, *args, once, sleep, batch, **opts):
+        total = 0
+        try:
+            while True:
+                ran = run_pending(limit=batch)
+                total += ran
+                if once and not ran:
+                    break
+                if not ran:
+                    time.sleep(sleep)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"ran {total} job(s)")
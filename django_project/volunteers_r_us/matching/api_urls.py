@@ -7,4 +7,6 @@ urlpatterns = [
     path("validate/volunteer/", views.validate_volunteer),
     path("validate/event/", views.validate_event),
     path("match/", views.match_api),
-]
\ No newline at end of file
+    path("match/batch/", views.match_batch_api),
+    path("assign/bulk/", views.assign_bulk_api),
+]
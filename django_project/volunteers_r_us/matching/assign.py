@@ -0,0 +1,83 @@
+"""
+Assign many volunteers to one event in a fixed number of queries.
+
+One upsert for the Assignment rows (bulk_create with update_conflicts on
+uq_assignment_volunteer_event), one bulk insert for the in-app
+notifications (plus the unread-counter update), one for the outbox
+emails, and a single send_outbox job queued for after the commit.
+"""
+from django.db import transaction
+
+from notify.counters import add_unread
+from notify.models import Notification
+from notify.outbox import queue_emails
+from notify.realtime import touch
+
+from ..jobs import enqueue_on_commit
+from ..models import Assignment, Profile
+
+# upper bound on volunteer ids per request
+MAX_BULK_ASSIGN = 1000
+
+
+def load_profiles(profile_ids):
+    """({id: Profile with user}, [unknown ids in request order])."""
+    ids = list(dict.fromkeys(profile_ids))
+    found = {
+        p.id: p for p in Profile.objects.filter(pk__in=ids).select_related("user")
+        .only("id", "full_name", "user__id", "user__email")
+    }
+    return found, [pid for pid in ids if pid not in found]
+
+
+def bulk_assign(event, profiles, created_by=None, notify=True):
+    """
+    Assign `profiles` to `event` (re-activating any existing row for the same
+    volunteer) and, with `notify`, queue one notification and one email each.
+    Returns the number of volunteers assigned.
+    """
+    profiles = list(profiles)
+    if not profiles:
+        return 0
+    with transaction.atomic():
+        Assignment.objects.bulk_create(
+            [
+                Assignment(
+                    volunteer=p.user, event=event, status=Assignment.ASSIGNED,
+                    volunteer_name=p.full_name or p.user.email, event_title=event.name,
+                    notify=notify, created_by=created_by,
+                )
+                for p in profiles
+            ],
+            update_conflicts=True,
+            unique_fields=["volunteer", "event"],
+            update_fields=["status", "notify", "updated_at"],
+        )
+        if notify:
+            notify_assigned(event, profiles)
+    return len(profiles)
+
+
+def notify_assigned(event, profiles):
+    """
+    One "Matched" notification and one outbox email per profile in
+    `profiles` (Profiles with user loaded), plus the unread counters, stream
+    touch and a send_outbox job for after the commit.
+    """
+    msg = f"You’ve been matched to '{event.name}' on {event.event_date} at {event.location}."
+    user_ids = [p.user.pk for p in profiles]
+    Notification.objects.bulk_create([
+        Notification(user=p.user, title=f"Matched: {event.name}", body=msg, url="")
+        for p in profiles
+    ])
+    add_unread(user_ids)
+    touch(user_ids)
+    queue_emails([
+        (
+            f"[Volunteer Match] {event.name}",
+            f"Hi {p.full_name or p.user.email},\n\n{msg}\n\nThank you for volunteering!",
+            [p.user.email],
+        )
+        for p in profiles
+    ])
+    enqueue_on_commit("send_outbox", "send_outbox")
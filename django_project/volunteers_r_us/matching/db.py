@@ -0,0 +1,110 @@
+"""
+Bulk loaders that turn Profile / Event rows into the plain dicts the
+matching logic works on. Query count is fixed: two queries for the whole
+roster (profiles + VolunteerProfile skills), two (events + prefetched
+skills) for any number of events.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import Prefetch
+
+from ..choices import SKILL_CHOICES
+from ..models import Event, Profile, Skill, VolunteerProfile
+
+_LABEL_TO_CODE = {label: code for code, label in SKILL_CHOICES}
+
+# Profile.availability and Event.event_date are whole days
+_DAY = timedelta(days=1)
+
+PROFILE_FIELDS = ("id", "full_name", "skills", "availability", "city", "state", "user__email", "user_id")
+
+
+def skill_code(name):
+    """Skill rows are named by label ("First Aid / CPR"); profiles store codes."""
+    return _LABEL_TO_CODE.get(name, name)
+
+
+def day_block(d):
+    start = datetime.combine(d, time.min)
+    return {"start": start, "end": start + _DAY}
+
+
+def _day_blocks(values):
+    blocks = []
+    for raw in values or ():
+        try:
+            blocks.append(day_block(raw if isinstance(raw, date) else date.fromisoformat(raw)))
+        except (TypeError, ValueError):
+            continue  # ignore junk entries rather than fail the whole roster
+    return blocks
+
+
+def volunteer_from_row(row, extra_skills=()):
+    pid, full_name, skills, availability, city, state, email, user_id = row
+    return {
+        "id": pid,
+        "user_id": user_id,
+        "full_name": full_name or email,
+        "email": email,
+        "city": city,
+        "state": state,
+        "skills": set(skills or ()) | set(extra_skills),
+        "languages": set(),
+        "availability": _day_blocks(availability),
+    }
+
+
+def _volunteer_profile_skills(profiles):
+    """{user_id: {skill code}} from VolunteerProfile.skills for `profiles`' users."""
+    through = VolunteerProfile.skills.through
+    rows = through.objects.filter(
+        volunteerprofile__user_id__in=profiles.values("user_id")
+    ).values_list("volunteerprofile__user_id", "skill__name")
+    out = defaultdict(set)
+    for user_id, name in rows:
+        out[user_id].add(skill_code(name))
+    return out
+
+
+def load_volunteers(qs=None):
+    """
+    Every Profile as a matching dict. Skills are the profile's own codes plus
+    the user's VolunteerProfile skills; two queries regardless of roster size.
+    """
+    qs = Profile.objects.all() if qs is None else qs
+    extra = _volunteer_profile_skills(qs)
+    rows = qs.order_by("id").values_list(*PROFILE_FIELDS)
+    return [volunteer_from_row(r, extra.get(r[-1], ())) for r in rows]
+
+
+def event_from_model(event):
+    """Uses the prefetched `required_skills` when present."""
+    return {
+        "id": event.id,
+        "title": event.name,
+        "required_skills": {skill_code(s.name) for s in event.required_skills.all()},
+        "languages": set(),
+        "slots": 1,
+        "time_blocks": [day_block(event.event_date)] if event.event_date else [],
+        "max_radius_miles": None,
+        "location_name": event.location,
+        "event_date": event.event_date,
+    }
+
+
+def event_queryset(qs=None):
+    qs = Event.objects.all() if qs is None else qs
+    return qs.prefetch_related(
+        Prefetch("required_skills", queryset=Skill.objects.only("id", "name"))
+    )
+
+
+def load_events(qs=None):
+    """Events as matching dicts: one query for events, one for their skills."""
+    return [event_from_model(e) for e in event_queryset(qs).order_by("event_date", "name", "id")]
+
+
+def events_by_id(ids):
+    """{id: matching dict} for the given Event ids; unknown ids are absent."""
+    return {e.id: event_from_model(e) for e in event_queryset(Event.objects.filter(pk__in=ids))}
@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+from math import isfinite
+
+from .logic import _val, _to_dt, parse_windows
+from .geo import haversine_miles
+
+_ORIGIN = {"lat": 0.0, "lng": 0.0}
+
+
+@dataclass(frozen=True)
+class VolunteerFeatures:
+    """Pre-built sets and parsed windows for one volunteer."""
+    skills: frozenset
+    languages: frozenset
+    lat: float
+    lng: float
+    windows: object          # intervals.Availability
+
+
+@dataclass(frozen=True)
+class EventFeatures:
+    """Pre-built sets and parsed blocks for one event."""
+    required_skills: frozenset
+    languages: frozenset
+    slots: int
+    max_radius_miles: object  # None means no radius check
+    lat: float
+    lng: float
+    blocks: tuple            # ((start, end), ...) as datetimes
+
+
+def _coord(value):
+    # only real finite numbers: strings would diverge from matches_event and
+    # NaN/inf would break the grid index; such records aren't compiled
+    if isinstance(value, (int, float)) and isfinite(value):
+        return float(value)
+    raise ValueError(f"bad coordinate {value!r}")
+
+
+def _windows(items):
+    return tuple((_to_dt(a["start"]), _to_dt(a["end"])) for a in items)
+
+
+def compile_volunteer(v):
+    """
+    Build VolunteerFeatures for `v`, or None if the record can't be compiled
+    (e.g. free-form availability labels, or a location that isn't a finite
+    number); callers then fall back to matches_event/score for that volunteer.
+    """
+    try:
+        loc = _val(v, "location", _ORIGIN)
+        return VolunteerFeatures(
+            skills=frozenset(_val(v, "skills", [])),
+            languages=frozenset(_val(v, "languages", [])),
+            lat=_coord(loc["lat"]),
+            lng=_coord(loc["lng"]),
+            windows=parse_windows(_val(v, "availability", [])),
+        )
+    except (TypeError, KeyError, ValueError):
+        return None
+
+
+def compile_event(e):
+    """Build EventFeatures for `e`, or None if it can't be compiled."""
+    try:
+        loc = _val(e, "location", _ORIGIN)
+        return EventFeatures(
+            required_skills=frozenset(_val(e, "required_skills", [])),
+            languages=frozenset(_val(e, "languages", [])),
+            slots=_val(e, "slots", 1),
+            max_radius_miles=_val(e, "max_radius_miles", None),
+            lat=_coord(loc["lat"]),
+            lng=_coord(loc["lng"]),
+            blocks=_windows(_val(e, "time_blocks", [])),
+        )
+    except (TypeError, KeyError, ValueError):
+        return None
+
+
+def eligible(vf, ef):
+    """Same rules as logic.matches_event, over compiled features."""
+    if not ef.required_skills <= vf.skills:
+        return False
+    if ef.languages and not (ef.languages & vf.languages):
+        return False
+    if ef.slots <= 0:
+        return False
+    r = ef.max_radius_miles
+    if r is not None and haversine_miles(vf.lat, vf.lng, ef.lat, ef.lng) >= r:
+        return False
+    if ef.blocks:
+        if not any(vf.windows.overlaps(b0, b1) for b0, b1 in ef.blocks):
+            return False
+    return True
+
+
+def score_features(vf, ef):
+    """Same value as logic.score, over compiled features."""
+    return float(len(ef.required_skills & vf.skills) + len(ef.languages & vf.languages))
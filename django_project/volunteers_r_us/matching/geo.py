@@ -0,0 +1,92 @@
+from collections import defaultdict
+from math import asin, cos, degrees, floor, radians, sin, sqrt, pi
+
+EARTH_RADIUS_MILES = 3958.8
+
+# ~17 miles per cell north-south; a city-wide radius touches a handful of cells
+DEFAULT_CELL_DEG = 0.25
+
+# slack (degrees) so float rounding never drops a point right at the edge
+_EPS = 1e-9
+
+
+def haversine_miles(lat1, lng1, lat2, lng2):
+    """Great-circle distance in miles between two lat/lng points (degrees)."""
+    p1, p2 = radians(lat1), radians(lat2)
+    dp, dl = p2 - p1, radians(lng2 - lng1)
+    h = sin(dp / 2) ** 2 + cos(p1) * cos(p2) * sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * asin(min(1.0, sqrt(h)))
+
+
+def bounding_box(lat, lng, radius_miles):
+    """
+    (lat_min, lat_max, dlng) enclosing every point closer than `radius_miles`.
+    dlng is None when the circle reaches a pole and every longitude qualifies.
+    """
+    ang = radius_miles / EARTH_RADIUS_MILES
+    dlat = degrees(ang) + _EPS
+    lat_min, lat_max = lat - dlat, lat + dlat
+    if ang >= pi / 2 or lat_max >= 90 or lat_min <= -90:
+        return max(lat_min, -90.0), min(lat_max, 90.0), None
+    dlng = degrees(asin(min(1.0, sin(ang) / cos(radians(lat))))) + _EPS
+    return lat_min, lat_max, dlng
+
+
+class GridIndex:
+    """
+    Uniform lat/lng grid over point locations, built once per roster.
+
+    `within()` only visits the cells overlapping the query's bounding box and
+    then applies the exact haversine test, so it returns the same positions
+    as checking every point.
+
+    `cell_deg` is rounded to the nearest value that divides 360 evenly, so
+    the columns wrap cleanly across the antimeridian.
+    """
+
+    def __init__(self, points, cell_deg=DEFAULT_CELL_DEG):
+        # points: iterable of (key, lat, lng)
+        if not cell_deg > 0:
+            raise ValueError("cell_deg must be positive")
+        self.ncols = max(1, round(360 / cell_deg))
+        self.cell_deg = 360 / self.ncols
+        self.cells = defaultdict(list)
+        self.size = 0
+        for key, lat, lng in points:
+            self.cells[self._cell(lat, lng)].append((key, lat, lng))
+            self.size += 1
+
+    def _row(self, lat):
+        return floor(lat / self.cell_deg)
+
+    def _col(self, lng):
+        return floor((lng + 180.0) / self.cell_deg) % self.ncols
+
+    def _cell(self, lat, lng):
+        return self._row(lat), self._col(lng)
+
+    def __len__(self):
+        return self.size
+
+    def _cells_for(self, lat, lng, radius_miles):
+        lat_min, lat_max, dlng = bounding_box(lat, lng, radius_miles)
+        rows = range(self._row(lat_min), self._row(lat_max) + 1)
+        if dlng is None or 2 * dlng >= 360:
+            cols = None
+        else:
+            c0 = floor((lng - dlng + 180.0) / self.cell_deg)
+            c1 = floor((lng + dlng + 180.0) / self.cell_deg)
+            cols = {c % self.ncols for c in range(c0, c1 + 1)}
+        if cols is not None and len(rows) * len(cols) < len(self.cells):
+            return [(r, c) for r in rows for c in cols]
+        # query box is bigger than the occupied grid: walk occupied cells
+        return [rc for rc in self.cells if rc[0] in rows and (cols is None or rc[1] in cols)]
+
+    def within(self, lat, lng, radius_miles):
+        """Keys of points strictly closer than `radius_miles` to (lat, lng)."""
+        found = set()
+        for rc in self._cells_for(lat, lng, radius_miles):
+            for key, plat, plng in self.cells.get(rc, ()):
+                if haversine_miles(plat, plng, lat, lng) < radius_miles:
+                    found.add(key)
+        return found
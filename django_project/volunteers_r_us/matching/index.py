@@ -0,0 +1,170 @@
+import logging
+from collections import defaultdict
+
+from .logic import _val, _to_dt, matches_event, score
+from .features import compile_volunteer, compile_event, eligible, score_features, _ORIGIN
+from .geo import GridIndex
+from .intervals import IntervalTree
+
+log = logging.getLogger(__name__)
+
+ENGINES = ("python", "numpy")
+
+
+def _aware(dt):
+    return dt.tzinfo is not None
+
+
+class VolunteerIndex:
+    """
+    Inverted index over a volunteer roster, built once and reused per event.
+
+    Holds skill -> volunteers and language -> volunteers posting sets, an
+    interval tree of availability windows and a lat/lng grid for the radius
+    check. `candidates()` narrows the roster with set intersections; the
+    surviving volunteers still go through `matches_event`, so results are
+    identical to a full scan.
+
+    Each volunteer is also compiled once into VolunteerFeatures, which
+    `match()` reuses across events instead of rebuilding sets per call.
+    """
+
+    def __init__(self, volunteers, features=None):
+        # `features` lets a caller hand in already-compiled VolunteerFeatures
+        self.volunteers = list(volunteers)
+        if features is None:
+            features = [compile_volunteer(v) for v in self.volunteers]
+        self.features = list(features)
+        self.geo = GridIndex(
+            (i, f.lat, f.lng) for i, f in enumerate(self.features) if f is not None
+        )
+        # no usable location: always a radius candidate, matches_event decides
+        self.uncompiled = {i for i, f in enumerate(self.features) if f is None}
+        self.by_skill = defaultdict(set)
+        self.by_language = defaultdict(set)
+        # availability we could not parse (free-form labels, bad values)
+        self.unparsed = set()
+
+        by_tz = {False: [], True: []}
+        for i, v in enumerate(self.volunteers):
+            for s in _val(v, "skills", None) or ():
+                self.by_skill[s].add(i)
+            for lang in _val(v, "languages", None) or ():
+                self.by_language[lang].add(i)
+            f = self.features[i]
+            if f is None:
+                if _val(v, "availability", None):
+                    self.unparsed.add(i)
+                continue
+            for a0, a1 in f.windows:
+                by_tz[_aware(a0)].append((a0, a1, i))
+        # naive and aware datetimes don't compare, so each gets its own tree
+        self.free = {tz: IntervalTree(items) for tz, items in by_tz.items()}
+        self._owners = {tz: {o for _, _, o in items} for tz, items in by_tz.items()}
+
+    def __len__(self):
+        return len(self.volunteers)
+
+    def free_during(self, start, end):
+        """Positions of volunteers with a window overlapping [start, end)."""
+        return self.free[_aware(start)].overlapping(start, end)
+
+    def _time_candidates(self, tbs):
+        found = set(self.unparsed)
+        for tb in tbs:
+            try:
+                b0, b1 = _to_dt(tb["start"]), _to_dt(tb["end"])
+                if _aware(b0) != _aware(b1):
+                    return None
+                found |= self.free_during(b0, b1)
+            except (TypeError, KeyError, ValueError):
+                return None  # can't prune on this block; leave it to matches_event
+            # windows on the other tz axis can't be compared here; keep them
+            # so matches_event reports the mismatch exactly as before
+            found |= self._owners[not _aware(b0)]
+        return found
+
+    def candidate_ids(self, event):
+        """Roster positions that can possibly match `event`, or None for all."""
+        postings = []
+
+        required = set(_val(event, "required_skills", []))
+        for s in required:
+            postings.append(self.by_skill.get(s, set()))
+
+        langs = _val(event, "languages", [])
+        if langs:
+            found = set()
+            for lang in langs:
+                found |= self.by_language.get(lang, set())
+            postings.append(found)
+
+        r = _val(event, "max_radius_miles", None)
+        if r is not None:
+            loc = _val(event, "location", _ORIGIN)
+            try:
+                postings.append(self.geo.within(loc["lat"], loc["lng"], r) | self.uncompiled)
+            except (TypeError, KeyError):
+                pass
+
+        tbs = _val(event, "time_blocks", [])
+        if tbs:
+            found = self._time_candidates(tbs)
+            if found is not None:
+                postings.append(found)
+
+        if not postings:
+            return None
+        postings.sort(key=len)
+        ids = set(postings[0])
+        for p in postings[1:]:
+            if not ids:
+                break
+            ids &= p
+        return ids
+
+    def candidates(self, event):
+        """Volunteers surviving the index filters, in roster order."""
+        ids = self.candidate_ids(event)
+        if ids is None:
+            return self.volunteers
+        return [self.volunteers[i] for i in sorted(ids)]
+
+    def eligible(self, event):
+        """Unranked [(volunteer, score)] for `event`, in roster order."""
+        ef = compile_event(event)
+        if ef is None:
+            return [(v, score(v, event)) for v in self.candidates(event)
+                    if matches_event(v, event)]
+        ids = self.candidate_ids(event)
+        ids = range(len(self.volunteers)) if ids is None else sorted(ids)
+
+        elig = []
+        for i in ids:
+            v, vf = self.volunteers[i], self.features[i]
+            if vf is None:
+                if matches_event(v, event):
+                    elig.append((v, score(v, event)))
+            elif eligible(vf, ef):
+                elig.append((v, score_features(vf, ef)))
+        return elig
+
+    def match(self, event):
+        """Ranked [(volunteer, score)] for `event`, same order as match_volunteers."""
+        return sorted(self.eligible(event), key=lambda t: t[1], reverse=True)
+
+
+def build_index(volunteers, engine="python", features=None):
+    """
+    Build the roster index for `engine`: "python" (VolunteerIndex) or
+    "numpy" (vectorized.VectorIndex). Falls back to "python" when NumPy
+    isn't installed.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown matching engine: {engine!r}")
+    if engine == "numpy":
+        from .vectorized import HAS_NUMPY, VectorIndex
+        if HAS_NUMPY:
+            return VectorIndex(volunteers, features)
+        log.warning("MATCHING_ENGINE='numpy' but numpy is not installed; using 'python'")
+    return VolunteerIndex(volunteers, features)
@@ -0,0 +1,130 @@
+"""
+Availability as pre-parsed, sorted interval arrays.
+
+Intervals are half-open [start, end) pairs of datetimes; two intervals
+overlap when a0 < b1 and b0 < a1, the same rule as logic.time_overlap.
+"""
+from bisect import bisect_left
+
+# below this many intervals a node just scans its list
+_LEAF_SIZE = 16
+
+
+class Availability:
+    """
+    One volunteer's windows, sorted and with overlapping windows merged.
+
+    Merging keeps the ends non-decreasing, so "does anything overlap
+    [b0, b1)?" is one bisect on the starts plus one comparison.
+    """
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, pairs=()):
+        starts, ends = [], []
+        for a0, a1 in sorted(pairs):
+            if starts and a0 < ends[-1]:
+                if a1 > ends[-1]:
+                    ends[-1] = a1
+            else:
+                starts.append(a0)
+                ends.append(a1)
+        self.starts = tuple(starts)
+        self.ends = tuple(ends)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __bool__(self):
+        return bool(self.starts)
+
+    def __eq__(self, other):
+        return isinstance(other, Availability) and \
+            (self.starts, self.ends) == (other.starts, other.ends)
+
+    def __hash__(self):
+        return hash((self.starts, self.ends))
+
+    def __repr__(self):
+        return f"Availability({list(self)!r})"
+
+    def overlaps(self, b0, b1):
+        i = bisect_left(self.starts, b1)   # windows [0, i) start before b1
+        return i > 0 and self.ends[i - 1] > b0
+
+
+class _Node:
+    __slots__ = ("center", "by_start", "by_end", "left", "right", "items")
+
+    def __init__(self, items):
+        self.items = self.left = self.right = None
+        self.by_start = self.by_end = ()
+        if len(items) <= _LEAF_SIZE:
+            self.items = items
+            return
+        points = sorted(p for a0, a1, _ in items for p in (a0, a1))
+        self.center = c = points[len(points) // 2]
+        here, left, right = [], [], []
+        for it in items:
+            if it[1] <= c:
+                left.append(it)
+            elif it[0] > c:
+                right.append(it)
+            else:
+                here.append(it)
+        if len(left) == len(items) or len(right) == len(items):
+            self.items = items  # degenerate split (e.g. all identical points)
+            return
+        self.by_start = sorted(here, key=lambda t: t[0])
+        self.by_end = sorted(here, key=lambda t: t[1], reverse=True)
+        self.left = _Node(left) if left else None
+        self.right = _Node(right) if right else None
+
+
+class IntervalTree:
+    """
+    Static centered interval tree over (start, end, owner) triples.
+
+    `overlapping(start, end)` returns the owners with at least one interval
+    overlapping [start, end) in O(log n + k).
+    """
+
+    def __init__(self, triples):
+        items = list(triples)
+        self.size = len(items)
+        self.root = _Node(items) if items else None
+
+    def __len__(self):
+        return self.size
+
+    def overlapping(self, s, e):
+        found = set()
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            if node.items is not None:
+                found.update(o for a0, a1, o in node.items if a0 < e and s < a1)
+                continue
+            c = node.center
+            # every interval stored here satisfies a0 <= c < a1
+            if e <= c:
+                for a0, a1, o in node.by_start:
+                    if not a0 < e:
+                        break
+                    if s < a1:
+                        found.add(o)
+            elif s >= c:
+                for a0, a1, o in node.by_end:
+                    if not s < a1:
+                        break
+                    if a0 < e:
+                        found.add(o)
+            else:
+                found.update(o for _, _, o in node.by_start)
+            if node.left is not None and s < c:
+                stack.append(node.left)
+            if node.right is not None and e > c:
+                stack.append(node.right)
+        return found
@@ -1,5 +1,7 @@
-from math import hypot
+import heapq
 from datetime import datetime
+from .geo import haversine_miles
+from .intervals import Availability
 
 def _val(obj, key, default=None):
     if isinstance(obj, dict):
@@ -9,6 +11,15 @@ def _val(obj, key, default=None):
 def _to_dt(x):
     return x if isinstance(x, datetime) else datetime.fromisoformat(x)
 
+def parse_windows(items):
+    """
+    [{"start", "end"}, ...] -> Availability (parsed once, sorted, merged).
+    Inverted windows (end before start) cover no time and are dropped; the
+    merge relies on every window ending after it starts.
+    """
+    pairs = ((_to_dt(a["start"]), _to_dt(a["end"])) for a in items)
+    return Availability((a0, a1) for a0, a1 in pairs if a0 <= a1)
+
 def time_overlap(a, b):
     a0, a1 = _to_dt(a["start"]), _to_dt(a["end"])
     b0, b1 = _to_dt(b["start"]), _to_dt(b["end"])
@@ -27,12 +38,15 @@ def matches_event(v, e):
     if r is not None:
         V = _val(v, "location", {"lat": 0.0, "lng": 0.0})
         E = _val(e, "location", {"lat": 0.0, "lng": 0.0})
-        if hypot(V["lat"] - E["lat"], V["lng"] - E["lng"]) >= r:
+        if haversine_miles(V["lat"], V["lng"], E["lat"], E["lng"]) >= r:
             return False
     tbs = _val(e, "time_blocks", [])
     if tbs:
         av = _val(v, "availability", [])
-        if not any(time_overlap(tb, a) for tb in tbs for a in av):
+        if not av:
+            return False
+        windows = parse_windows(av)
+        if not any(windows.overlaps(_to_dt(tb["start"]), _to_dt(tb["end"])) for tb in tbs):
             return False
     return True
 
@@ -42,10 +56,66 @@ def score(v, e):
     s += len(set(_val(e, "languages", [])) & set(_val(v, "languages", [])))
     return float(s)
 
-def match_volunteers(volunteers, event):
-    elig = [(v, score(v, event)) for v in volunteers if matches_event(v, event)]
+def _sharded(volunteers, index):
+    """parallel module when this call should fan out over the process pool."""
+    if index is not None:
+        return None
+    from . import parallel
+    return parallel if parallel.should_shard(volunteers) else None
+
+def match_volunteers(volunteers, event, index=None, version=None):
+    # `index` is an optional VolunteerIndex built over the same `volunteers`;
+    # it only prunes the pool, the checks below still decide eligibility.
+    # Without one, rosters over MATCHING_PARALLEL_THRESHOLD are sharded
+    # (`version` lets parallel reuse the roster's spill file).
+    par = _sharded(volunteers, index)
+    if par is not None:
+        top, _ = par.sharded_top(volunteers, event, version=version)
+        return [(volunteers[i], s) for i, s in top]
+    pool = volunteers if index is None else index.candidates(event)
+    elig = [(v, score(v, event)) for v in pool if matches_event(v, event)]
     return sorted(elig, key=lambda t: t[1], reverse=True)
 
+def rank_top(elig, limit=None, offset=0):
+    """
+    Rows [offset, offset + limit) of the ranking without sorting the rest;
+    same rows as sorted(elig, key=score, reverse=True)[offset:offset + limit]
+    (heapq.nlargest keeps that ordering, ties included).
+    """
+    by_score = lambda t: t[1]
+    if limit is None:
+        return sorted(elig, key=by_score, reverse=True)[offset:]
+    return heapq.nlargest(offset + limit, elig, key=by_score)[offset:]
+
+def top_matches(volunteers, event, limit=None, offset=0, index=None, version=None):
+    """(page, total): one page of match_volunteers' ranking plus the eligible count."""
+    par = _sharded(volunteers, index)
+    if par is not None:
+        # each shard only ranks its local top (offset + limit)
+        k = None if limit is None else offset + limit
+        top, total = par.sharded_top(volunteers, event, k, version)
+        return [(volunteers[i], s) for i, s in top[offset:]], total
+    if index is None:
+        elig = [(v, score(v, event)) for v in volunteers if matches_event(v, event)]
+    else:
+        elig = index.eligible(event)
+    return rank_top(elig, limit, offset), len(elig)
+
+def iter_match_many(volunteers, events, index=None, engine="python"):
+    """
+    Yield (event, ranked) for every event, sharing one roster index
+    (and its compiled volunteer features) across the whole batch.
+    """
+    if index is None:
+        from .index import build_index
+        index = build_index(volunteers, engine)
+    for e in events:
+        yield e, index.match(e)
+
+def match_many(volunteers, events, index=None, engine="python"):
+    return {_val(e, "id"): ranked
+            for e, ranked in iter_match_many(volunteers, events, index=index, engine=engine)}
+
 def volunteer_to_dict(v):
     return {
         "id": _val(v, "id"),
@@ -1,25 +1,41 @@
 from django.apps import apps
+from django.conf import settings
 from django.utils import timezone
 from django.db.models import Count
 from django.contrib.auth import get_user_model
 from django.urls import reverse, NoReverseMatch
+from notify.counters import add_unread
+from notify.realtime import touch
+
+# rows per INSERT when fanning out; keeps each statement well under
+# SQLite's bound-parameter limit and bounds memory for huge rosters
+NOTIFY_BATCH_SIZE = 1000
 
 def N():
     return apps.get_model("notify", "Notification")
 
-def notify_candidates_for_event(event):
-    req = list(event.required_skills.values_list("id", flat=True))
-    if not req:
-        return 0
-
+def candidate_user_ids(event, req=None):
+    """Ids of users whose VolunteerProfile has every skill the event requires."""
+    req = list(event.required_skills.values_list("id", flat=True)) if req is None else req
     U = get_user_model()
-    qs = (
+    return (
         U.objects.filter(vol_profile__skills__in=req)
         .annotate(match_count=Count("vol_profile__skills", distinct=True))
         .filter(match_count=len(req))
-        .distinct()
+        .values_list("id", flat=True)
     )
 
+def notify_candidates_for_event(event, batch_size=None):
+    """
+    One Notification per matching volunteer, skipping users who already have
+    this exact notification. Set-based: one candidate query, then per batch
+    of candidates one dedup query and one bulk_create. Returns the number of
+    rows created.
+    """
+    req = list(event.required_skills.values_list("id", flat=True))
+    if not req:
+        return 0
+
     try:
         url = reverse("event_form")
     except NoReverseMatch:
@@ -28,24 +44,28 @@ def notify_candidates_for_event(event):
     title = f"New event: {event.name}"
     body  = f"{event.location} on {event.event_date}"
 
-    # materialize user ids and de-dupe on (user, title, url, body)
-    ids = list(qs.values_list("id", flat=True))
-    existing_user_ids = set(
-        N().objects.filter(user_id__in=ids, title=title, url=url, body=body)
-        .values_list("user_id", flat=True)
-    )
-
-    created = 0
-    for u in qs:
-        if u.id in existing_user_ids:
+    batch_size = batch_size or getattr(settings, "NOTIFY_BATCH_SIZE", NOTIFY_BATCH_SIZE)
+    now = timezone.now()
+    Notification = N()
+    candidates = list(candidate_user_ids(event, req))
+    new_ids = []
+    for i in range(0, len(candidates), batch_size):
+        chunk = candidates[i:i + batch_size]
+        # de-dupe on (user, title, url, body) within the batch so the lookup
+        # rides the per-user notification index instead of scanning by title
+        existing = set(
+            Notification.objects.filter(user_id__in=chunk, title=title, url=url, body=body)
+            .order_by().values_list("user_id", flat=True)
+        )
+        chunk = [uid for uid in chunk if uid not in existing]
+        if not chunk:
             continue
-        N().objects.create(
-            user=u,
-            title=title,
-            body=body,
-            url=url,
-            created_at=timezone.now(),
+        Notification.objects.bulk_create(
+            [Notification(user_id=uid, title=title, body=body, url=url, created_at=now)
+             for uid in chunk],
+            batch_size=batch_size,
         )
-        created += 1
-
-    return created
\ No newline at end of file
+        add_unread(chunk)
+        new_ids += chunk
+    touch(new_ids)  # bulk_create skips post_save; wake these users' streams
+    return len(new_ids)
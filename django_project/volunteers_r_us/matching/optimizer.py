@@ -0,0 +1,381 @@
+"""
+Global slot-constrained assignment.
+
+Instead of ranking one event at a time, solve all events together as a
+min-cost max-flow problem:
+
+    source -> (volunteer, clique) -> event -> sink
+              cap 1            cap 1, cost -score    cap slots
+
+so every event gets as many volunteers as it has slots, and among those
+fillings the total match score is as high as possible. Events are covered
+by cliques of mutually overlapping ones (one per sweep-line time point),
+so the single (volunteer, clique) node keeps a volunteer to one event per
+clique; a double booking across cliques is branched away in
+solve_assignment, so events that merely chain together (A overlaps B,
+B overlaps C) can still share a volunteer between A and C.
+"""
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Assignment, Event
+from .assign import load_profiles, notify_assigned
+from .db import load_events
+from .index import build_index
+from .logic import _val, _to_dt
+from .store import get_store
+
+_INF = float("inf")
+
+
+@dataclass(frozen=True)
+class Proposal:
+    volunteer: dict
+    event: dict
+    score: float
+
+
+# ---------- conflicts ----------
+def _blocks_by_kind(events):
+    """{aware?: [(start, end, event position)]}; naive and aware never compare."""
+    sweeps = defaultdict(list)
+    for pos, e in enumerate(events):
+        for tb in _val(e, "time_blocks", []) or ():
+            s, t = _to_dt(tb["start"]), _to_dt(tb["end"])
+            sweeps[s.tzinfo is not None].append((s, t, pos))
+    return sweeps
+
+
+def overlapping_events(events):
+    """[set of positions of the other events sharing time with each event]."""
+    out = [set() for _ in events]
+    for items in _blocks_by_kind(events).values():
+        items.sort(key=lambda x: (x[0], x[1]))
+        active = []
+        for s, t, pos in items:
+            active = [a for a in active if a[1] > s]
+            for a0, a1, other in active:
+                # same test as time_overlap; zero-length blocks included
+                if other != pos and a0 < t and s < a1:
+                    out[pos].add(other)
+                    out[other].add(pos)
+            active.append((s, t, pos))
+    return out
+
+
+def conflict_cliques(events):
+    """
+    [clique id per event]: a cover of the events by cliques of mutually
+    overlapping ones, from a sweep over block ends. Each end time is one
+    point, and every event not yet covered with a block running up to it
+    joins that point's clique. Events with no positive-length block get a
+    clique of their own.
+    """
+    clique = [None] * len(events)
+    for items in _blocks_by_kind(events).values():
+        blocks = [(s, t, pos) for s, t, pos in items if s < t]
+        for point in sorted({t for _, t, _ in blocks}):
+            members = [pos for s, t, pos in blocks if clique[pos] is None and s < point <= t]
+            for pos in members:
+                clique[pos] = members[0]
+    return [pos if c is None else c for pos, c in enumerate(clique)]
+
+
+# ---------- min-cost flow ----------
+class _Flow:
+    """Successive shortest paths with Johnson potentials (Dijkstra per path)."""
+
+    def __init__(self, n=0):
+        self.n = n
+        self.adj = [[] for _ in range(n)]
+        self.to, self.cap, self.cost = [], [], []
+
+    def node(self):
+        self.adj.append([])
+        self.n += 1
+        return self.n - 1
+
+    def add(self, u, v, cap, cost):
+        """Edge id of u->v; its residual twin is id ^ 1."""
+        eid = len(self.to)
+        for a, b, c, w in ((u, v, cap, cost), (v, u, 0, -cost)):
+            self.adj[a].append(len(self.to))
+            self.to.append(b)
+            self.cap.append(c)
+            self.cost.append(w)
+        return eid
+
+    def _initial_potentials(self, s):
+        # Bellman-Ford: the graph is a DAG but has negative costs
+        h = [_INF] * self.n
+        h[s] = 0.0
+        for _ in range(self.n):
+            changed = False
+            for u in range(self.n):
+                if h[u] == _INF:
+                    continue
+                for eid in self.adj[u]:
+                    if self.cap[eid] > 0 and h[u] + self.cost[eid] < h[self.to[eid]]:
+                        h[self.to[eid]] = h[u] + self.cost[eid]
+                        changed = True
+            if not changed:
+                break
+        return [0.0 if x == _INF else x for x in h]
+
+    def run(self, s, t):
+        h = self._initial_potentials(s)
+        adj, to, cap, cost = self.adj, self.to, self.cap, self.cost
+        push_heap, pop_heap = heapq.heappush, heapq.heappop
+        dist = [_INF] * self.n
+        prev = [-1] * self.n
+        while True:
+            dist[s] = 0.0
+            reached = [s]
+            heap = [(0.0, s)]
+            while heap:
+                d, u = pop_heap(heap)
+                if u == t:
+                    break  # nothing settled later can shorten this path
+                if d > dist[u]:
+                    continue
+                hu = h[u]
+                for eid in adj[u]:
+                    if cap[eid] <= 0:
+                        continue
+                    v = to[eid]
+                    # reduced costs are >= 0; clamp float noise
+                    w = cost[eid] + hu - h[v]
+                    nd = d + w if w > 0.0 else d
+                    if nd < dist[v]:
+                        if dist[v] == _INF:
+                            reached.append(v)
+                        dist[v], prev[v] = nd, eid
+                        push_heap(heap, (nd, v))
+            found = dist[t]
+            if found == _INF:
+                return
+            # h += min(dist, dist[t]), less the constant dist[t] that only
+            # the nodes closer than t need; reduced costs use differences
+            for v in reached:
+                if dist[v] < found:
+                    h[v] += dist[v] - found
+            push, v = _INF, t
+            while v != s:
+                eid = prev[v]
+                push = min(push, cap[eid])
+                v = to[eid ^ 1]
+            v = t
+            while v != s:
+                eid = prev[v]
+                cap[eid] -= push
+                cap[eid ^ 1] += push
+                v = to[eid ^ 1]
+            for v in reached:
+                dist[v] = _INF
+
+
+# ---------- solver ----------
+# flow relaxations solved per solve_assignment call before settling for the
+# best plan found so far
+MAX_BRANCH_NODES = 200
+
+
+def _value(plan):
+    return len(plan), sum(p.score for p in plan)
+
+
+def _better(a, b):
+    return a[0] > b[0] or (a[0] == b[0] and a[1] > b[1] + 1e-9)
+
+
+def _clash(plan, overlaps, pos_of):
+    """(volunteer id, proposal, proposal) for one double booking in `plan`, or None."""
+    seen = defaultdict(list)
+    for p in plan:
+        vid, pos = _val(p.volunteer, "id"), pos_of[_val(p.event, "id")]
+        for q in seen[vid]:
+            if pos_of[_val(q.event, "id")] in overlaps[pos]:
+                return vid, q, p
+        seen[vid].append(p)
+    return None
+
+
+def _repair(plan, overlaps, pos_of):
+    """(kept, dropped pairs): the lower-scoring side of every double booking goes."""
+    kept, dropped, booked = [], set(), defaultdict(set)
+    for p in sorted(plan, key=lambda p: -p.score):
+        vid, pos = _val(p.volunteer, "id"), pos_of[_val(p.event, "id")]
+        if booked[vid] & (overlaps[pos] | {pos}):
+            dropped.add((vid, _val(p.event, "id")))
+        else:
+            booked[vid].add(pos)
+            kept.append(p)
+    return kept, dropped
+
+
+def _relax(events, eligible, cliques, seats, skip):
+    """
+    Min-cost flow where a volunteer takes at most one event per clique of
+    conflict_cliques(). Every real plan is a flow here, but two overlapping
+    events in different cliques can still share a volunteer.
+    """
+    S, T = 0, 1
+    nodes = {}  # (volunteer id, clique) -> node
+    pairs = []  # (edge id, volunteer, event, score)
+    flow = _Flow(2 + len(events))
+    for pos, e in enumerate(events):
+        eid, c = _val(e, "id"), cliques[pos]
+        free = _val(e, "slots", 1) - seats[eid]
+        if free <= 0:
+            continue
+        enode = 2 + pos
+        added = False
+        for v, sc in eligible[pos]:
+            vid = _val(v, "id")
+            if (vid, eid) in skip:
+                continue
+            key = (vid, c)
+            if key not in nodes:
+                nodes[key] = flow.node()
+                flow.add(S, nodes[key], 1, 0.0)
+            pairs.append((flow.add(nodes[key], enode, 1, -sc), v, e, sc))
+            added = True
+        if added:
+            flow.add(enode, T, free, 0.0)
+    flow.run(S, T)
+    return [Proposal(v, e, sc) for edge, v, e, sc in pairs if flow.cap[edge] == 0]
+
+
+def solve_assignment(volunteers, events, index=None, held=(), skip=()):
+    """
+    Best joint assignment of `volunteers` to `events` as [Proposal, ...]:
+    most seats filled, then highest total score, with nobody booked into two
+    events whose time blocks overlap.
+
+    `held` is (volunteer id, event id) pairs that already occupy a seat: they
+    use up the event's slots and keep the volunteer off overlapping events.
+    `skip` is pairs never to propose (e.g. cancelled assignments). `index`
+    is an optional roster index over `volunteers`; eligibility and score are
+    the usual matches_event / score rules either way.
+
+    Overlap chains make this interval scheduling with eligibility, which is
+    NP-hard in general. The flow relaxation (_relax) is re-solved without
+    the double bookings it allows until a plan has none, then branched on
+    them while a better plan may remain. Past MAX_BRANCH_NODES relaxations
+    the best plan found so far is returned; it never double-books.
+    """
+    if index is None:
+        index = build_index(volunteers)
+    held, skip = set(held), set(skip) | set(held)
+
+    cliques, overlaps = conflict_cliques(events), overlapping_events(events)
+    pos_of = {_val(e, "id"): pos for pos, e in enumerate(events)}
+    seats = defaultdict(int)
+    for vid, eid in held:
+        seats[eid] += 1
+        if eid in pos_of:
+            skip.update((vid, _val(events[q], "id")) for q in overlaps[pos_of[eid]])
+    eligible = [index.eligible(e) for e in events]
+
+    def relax(more):
+        nonlocal budget
+        budget -= 1
+        return _relax(events, eligible, cliques, seats, skip | more)
+
+    budget = MAX_BRANCH_NODES
+    root = relax(frozenset())
+    # first plan: re-solve without the double bookings until there are none
+    plan, best, dropped = root, [], frozenset()
+    while True:
+        kept, lost = _repair(plan, overlaps, pos_of)
+        if _better(_value(kept), _value(best)):
+            best = kept
+        if not lost or budget <= 0:
+            break
+        dropped |= lost
+        plan = relax(dropped)
+
+    # then branch for anything better
+    stack = [(root, frozenset())]
+    while stack:
+        plan, extra = stack.pop()
+        if not _better(_value(plan), _value(best)):
+            continue  # no plan below this one beats the best so far
+        clash = _clash(plan, overlaps, pos_of)
+        if clash is None:
+            best = plan
+            continue
+        vid, p, q = clash
+        # a real plan drops at least one of the two bookings
+        for drop in sorted((p, q), key=lambda x: -x.score):
+            if budget <= 0:
+                break
+            more = extra | {(vid, _val(drop.event, "id"))}
+            stack.append((relax(more), more))
+    return best
+
+
+# ---------- DB ----------
+def plan_upcoming(today=None, index=None):
+    """Proposals for every event on or after `today`, given current Assignments."""
+    today = today or timezone.localdate()
+    events = load_events(Event.objects.filter(event_date__gte=today))
+    index = index or get_store().index()
+    user_to_profile = {v["user_id"]: v["id"] for v in index.volunteers}
+    rows = Assignment.objects.filter(event_id__in=[e["id"] for e in events]) \
+        .values_list("volunteer_id", "event_id", "status")
+    held, skip = set(), set()
+    for user_id, event_id, status in rows:
+        pair = (user_to_profile.get(user_id), event_id)
+        if status in (Assignment.ASSIGNED, Assignment.ATTENDED):
+            held.add(pair)
+        else:
+            skip.add(pair)
+    return solve_assignment(index.volunteers, events, index=index, held=held, skip=skip)
+
+
+def assign_upcoming(created_by=None, today=None, notify=True):
+    """
+    Solve and write the resulting Assignment rows in one transaction.
+    A pair a coordinator assigned meanwhile keeps its row and is left out
+    of the returned plan. With `notify`, every assigned volunteer gets the
+    same notification and email as a bulk assignment, sent per event.
+    """
+    with transaction.atomic():
+        plan = plan_upcoming(today)
+        taken = set(Assignment.objects.filter(event_id__in={p.event["id"] for p in plan})
+                    .values_list("volunteer_id", "event_id"))
+        plan = [p for p in plan if (p.volunteer["user_id"], p.event["id"]) not in taken]
+        # ignore_conflicts covers a row committed between that read and the insert
+        Assignment.objects.bulk_create([
+            Assignment(
+                volunteer_id=p.volunteer["user_id"],
+                event_id=p.event["id"],
+                volunteer_name=p.volunteer["full_name"] or "",
+                event_title=p.event["title"],
+                status=Assignment.ASSIGNED,
+                match_score=p.score,
+                match_reason="auto-assigned",
+                notify=notify,
+                created_by=created_by,
+            )
+            for p in plan
+        ], ignore_conflicts=True)
+        if notify and plan:
+            _notify_plan(plan)
+    return plan
+
+
+def _notify_plan(plan):
+    profiles, _ = load_profiles([p.volunteer["id"] for p in plan])
+    events = Event.objects.in_bulk({p.event["id"] for p in plan})
+    by_event = defaultdict(list)
+    for p in plan:
+        if p.volunteer["id"] in profiles:
+            by_event[p.event["id"]].append(profiles[p.volunteer["id"]])
+    for event_id, assigned in by_event.items():
+        notify_assigned(events[event_id], assigned)
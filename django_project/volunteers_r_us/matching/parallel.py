@@ -0,0 +1,155 @@
+"""
+Sharded matching across a process pool for very large rosters.
+
+The roster is pickled once, shard by shard, into a temp file; workers mmap
+that file and unpickle only the shards they are handed, caching them until
+the roster changes. Each task then ships just (shard, event, k) and returns
+the shard's local top-k as (roster position, score) pairs, which the parent
+merges in the same order as the serial stable sort.
+
+Used by logic.match_volunteers / top_matches when no index is given and the
+roster has at least MATCHING_PARALLEL_THRESHOLD volunteers; the match views
+get there through FeatureStore.top_matches.
+"""
+import atexit
+import heapq
+import mmap
+import multiprocessing
+import os
+import pickle
+import tempfile
+import threading
+from itertools import count, islice
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+
+from .logic import matches_event, score
+
+# rosters smaller than this are matched in-process; None disables sharding
+DEFAULT_PARALLEL_THRESHOLD = 50_000
+
+
+def parallel_threshold():
+    return getattr(settings, "MATCHING_PARALLEL_THRESHOLD", DEFAULT_PARALLEL_THRESHOLD)
+
+
+def worker_count():
+    return getattr(settings, "MATCHING_WORKERS", None) or os.cpu_count() or 1
+
+
+def should_shard(volunteers):
+    threshold = parallel_threshold()
+    return threshold is not None and len(volunteers) >= threshold and worker_count() > 1
+
+
+# ---------- worker side ----------
+_shards = {}   # (roster token, shard no) -> volunteer list, for the current roster
+
+
+def _load_shard(token, path, no, lo, hi):
+    key = (token, no)
+    if key not in _shards:
+        for stale in [k for k in _shards if k[0] != token]:
+            del _shards[stale]  # roster was replaced
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            _shards[key] = pickle.loads(mm[lo:hi])
+    return _shards[key]
+
+
+def _top_shard(token, path, no, lo, hi, base, event, k):
+    """(eligible count, [(roster position, score), ...] best-first) for one shard."""
+    elig = []
+    for i, v in enumerate(_load_shard(token, path, no, lo, hi), base):
+        if matches_event(v, event):
+            elig.append((i, score(v, event)))
+    by_score = lambda t: t[1]
+    top = sorted(elig, key=by_score, reverse=True) if k is None else heapq.nlargest(k, elig, key=by_score)
+    return len(elig), top
+
+
+# ---------- parent side ----------
+_tokens = count(1)
+
+
+class ShardedRoster:
+    """One roster written to a memory-mapped spill file, split into shards."""
+
+    def __init__(self, volunteers, shards, version=None):
+        # token is "<pid>:<n>" so worker caches never confuse two rosters
+        self.token = "%d:%d" % (os.getpid(), next(_tokens))
+        self.version = version
+        self.size = len(volunteers)
+        step = -(-self.size // shards) if self.size else 1
+        fd, self.path = tempfile.mkstemp(prefix="matching-roster-", suffix=".pkl")
+        self.shards = []  # (shard no, byte lo, byte hi, first roster position)
+        with os.fdopen(fd, "wb") as f:
+            for no, base in enumerate(range(0, self.size, step)):
+                lo = f.tell()
+                pickle.dump(volunteers[base:base + step], f, pickle.HIGHEST_PROTOCOL)
+                self.shards.append((no, lo, f.tell(), base))
+
+    def is_for(self, volunteers, version):
+        return version is not None and version == self.version and len(volunteers) == self.size
+
+    def close(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+_lock = threading.Lock()
+_pool = None
+_roster = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # spawn: forking a threaded server process is unsafe
+        _pool = ProcessPoolExecutor(worker_count(), mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def _roster_for(volunteers, version):
+    """Reuse the spill file while callers keep passing the same roster version."""
+    global _roster
+    if _roster is None or not _roster.is_for(volunteers, version):
+        if _roster is not None:
+            _roster.close()
+        _roster = ShardedRoster(volunteers, worker_count(), version)
+    return _roster
+
+
+def sharded_top(volunteers, event, k=None, version=None):
+    """
+    (top, total): the k best (roster position, score) pairs — all of them when
+    k is None — in serial ranking order, and the number of eligible volunteers.
+    """
+    # one sharded job at a time: each already uses every worker, and the
+    # spill file must outlive its tasks
+    with _lock:
+        roster = _roster_for(volunteers, version)
+        pool = _get_pool()
+        futures = [pool.submit(_top_shard, roster.token, roster.path, no, lo, hi, base, event, k)
+                   for no, lo, hi, base in roster.shards]
+        results = [f.result() for f in futures]
+    total = sum(n for n, _ in results)
+    # ties keep roster order, exactly like the serial stable sort
+    merged = heapq.merge(*(top for _, top in results), key=lambda t: (-t[1], t[0]))
+    return list(merged if k is None else islice(merged, k)), total
+
+
+def shutdown():
+    global _pool, _roster
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+        if _roster is not None:
+            _roster.close()
+            _roster = None
+
+
+atexit.register(shutdown)
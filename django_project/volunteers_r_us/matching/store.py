@@ -0,0 +1,276 @@
+"""
+Compiled volunteer feature store.
+
+Keeps every Profile as a matching dict plus its compiled VolunteerFeatures
+(frozen skill/language sets, parsed availability) so match requests don't
+recompute them from the raw JSON and M2M rows. Loaded lazily on first use;
+signals.py invalidates single volunteers on Profile save/delete and
+VolunteerProfile.skills changes, again once the transaction commits, and
+once more if it rolls back (see `invalidate_on_commit` and `settle`).
+
+Set MATCHING_FEATURE_CACHE to a CACHES alias to share one warm copy between
+worker processes: entries live in that cache and a generation counter tells
+every worker when someone invalidated something. Writes that bypass signals
+(QuerySet.update, raw SQL) need an explicit `invalidate()` / `clear()`.
+"""
+import threading
+from functools import partial
+from itertools import count
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from ..models import Profile
+from .db import load_volunteers
+from .features import compile_volunteer
+from .index import build_index
+from .logic import top_matches
+
+GEN_KEY = "matching:features:gen"
+ROSTER_KEY = "matching:features:roster"
+VOL_KEY = "matching:features:vol:%s"
+
+_versions = count(1)
+
+
+def _scope(conn):
+    """The open savepoints on `conn`, outermost first (savepoint=False blocks skipped)."""
+    return tuple(sid for sid in conn.savepoint_ids if sid is not None)
+
+
+class _Pending:
+    """An action waiting for its transaction to commit; `done` once it has."""
+    __slots__ = ("action", "using", "scope", "done")
+
+    def __init__(self, action, using, scope):
+        self.action, self.using, self.scope, self.done = action, using, scope, False
+
+    def committed(self):
+        self.done = True
+        self.action()
+
+
+class FeatureStore:
+    def __init__(self, cache_alias=None):
+        self.cache_alias = cache_alias
+        self._lock = threading.RLock()
+        self._entries = None     # {profile id: (volunteer dict, VolunteerFeatures)}
+        self._dirty = set()
+        self._gen = None
+        self._indexes = {}       # engine -> index over the current entries
+        self._local = threading.local()  # .pending: this thread's [_Pending]
+        # changes whenever the loaded roster does; unique across stores
+        self.version = next(_versions)
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias] if self.cache_alias else None
+
+    # ---------- loading ----------
+    def _load(self, ids=None):
+        qs = None if ids is None else Profile.objects.filter(pk__in=ids)
+        return {v["id"]: (v, compile_volunteer(v)) for v in load_volunteers(qs)}
+
+    def _fetch_all(self):
+        cache = self.cache
+        if cache is None:
+            return self._load()
+        ids = cache.get(ROSTER_KEY)
+        if ids is None:
+            entries = self._load()
+            cache.set_many({VOL_KEY % pid: e for pid, e in entries.items()}, None)
+            cache.set(ROSTER_KEY, list(entries), None)
+            return entries
+        got = cache.get_many([VOL_KEY % pid for pid in ids])
+        entries = {pid: got[VOL_KEY % pid] for pid in ids if VOL_KEY % pid in got}
+        missing = [pid for pid in ids if pid not in entries]
+        if missing:
+            fresh = self._load(missing)
+            cache.set_many({VOL_KEY % pid: e for pid, e in fresh.items()}, None)
+            entries.update(fresh)
+        return dict(sorted(entries.items()))
+
+    def _refresh_dirty(self):
+        fresh = self._load(self._dirty)
+        if self.cache is not None and fresh:
+            self.cache.set_many({VOL_KEY % pid: e for pid, e in fresh.items()}, None)
+        for pid in self._dirty:
+            if pid in fresh:
+                self._entries[pid] = fresh[pid]
+            else:
+                self._entries.pop(pid, None)
+        self._entries = dict(sorted(self._entries.items()))
+        self._dirty.clear()
+
+    def _reap(self):
+        # A rollback drops the on_commit callback without telling anyone, so
+        # an entry whose transaction (or savepoint) ended while it still isn't
+        # done redoes its action: rolled-back rows must not linger. When only a
+        # savepoint ended it may have been released rather than rolled back,
+        # so keep watching at the level that is still open.
+        pending = getattr(self._local, "pending", None)
+        if not pending:
+            return
+        keep = []
+        for p in pending:
+            if p.done:
+                continue
+            conn = transaction.get_connection(p.using)
+            if not conn.in_atomic_block:
+                p.action()
+                continue
+            scope = _scope(conn)
+            if scope[:len(p.scope)] != p.scope:
+                p.action()
+                n = 0
+                while n < min(len(scope), len(p.scope)) and scope[n] == p.scope[n]:
+                    n += 1
+                p.scope = scope[:n]
+            keep.append(p)
+        self._local.pending = keep
+
+    def settle(self):
+        """
+        Apply what the calling thread's finished transactions left pending.
+        Runs on every access from that thread and at the end of each request.
+        A transaction started straight after a rollback can't tell the two
+        apart, and other threads can't see this thread's transactions at all,
+        so until then they may still read the rolled-back rows.
+        """
+        with self._lock:
+            self._reap()
+
+    def _sync(self):
+        self._reap()
+        cache = self.cache
+        if cache is not None:
+            gen = cache.get(GEN_KEY, 0)
+            if gen != self._gen:
+                # another worker invalidated something; re-read the shared copy
+                self._entries, self._gen = None, gen
+        if self._entries is None:
+            self._entries = self._fetch_all()
+            self._dirty.clear()
+            self._indexes.clear()
+            self.version = next(_versions)
+        elif self._dirty:
+            self._refresh_dirty()
+            self._indexes.clear()
+            self.version = next(_versions)
+
+    # ---------- public API ----------
+    def roster(self):
+        """Volunteer dicts in Profile id order."""
+        with self._lock:
+            self._sync()
+            return [v for v, _ in self._entries.values()]
+
+    def index(self, engine=None):
+        """Roster index built from the cached compiled features."""
+        engine = engine or getattr(settings, "MATCHING_ENGINE", "python")
+        with self._lock:
+            self._sync()
+            if engine not in self._indexes:
+                entries = list(self._entries.values())
+                self._indexes[engine] = build_index(
+                    [v for v, _ in entries], engine, features=[f for _, f in entries]
+                )
+            return self._indexes[engine]
+
+    def top_matches(self, event, limit=None, offset=0, engine=None):
+        """
+        (page, total) for `event` over the current roster. Rosters of at least
+        MATCHING_PARALLEL_THRESHOLD volunteers are sharded across the process
+        pool, which reuses its spill file until `version` changes; smaller
+        ones are ranked through the cached index.
+        """
+        from . import parallel
+        with self._lock:
+            self._sync()
+            volunteers, version = [v for v, _ in self._entries.values()], self.version
+        if parallel.should_shard(volunteers):
+            return top_matches(volunteers, event, limit, offset, version=version)
+        index = self.index(engine)
+        return top_matches(index.volunteers, event, limit, offset, index=index)
+
+    def invalidate(self, profile_id, membership=False):
+        """
+        Recompile one volunteer on next access. `membership=True` when the
+        profile was created or deleted, so the shared roster list is rebuilt.
+        """
+        with self._lock:
+            self._dirty.add(profile_id)
+            cache = self.cache
+            if cache is None:
+                return
+            cache.delete(VOL_KEY % profile_id)
+            if membership:
+                # rebuild the shared roster list from the DB on next access
+                cache.delete(ROSTER_KEY)
+                self._entries = None
+            self._bump()
+
+    def clear(self):
+        """Drop everything (e.g. after a skill rename or bulk import)."""
+        with self._lock:
+            self._entries = None
+            self._dirty.clear()
+            self._indexes.clear()
+            cache = self.cache
+            if cache is not None:
+                cache.delete(ROSTER_KEY)
+                self._bump()
+
+    def invalidate_on_commit(self, profile_ids, membership=False, using=None):
+        """
+        `invalidate()` each id now, so the writing transaction reads its own
+        change, and again after it commits, since another reader may have
+        cached the old row meanwhile. On rollback the next access invalidates
+        once more, so nothing uncommitted stays cached.
+        """
+        self._after_transaction(partial(self._invalidate_many, tuple(profile_ids), membership), using)
+
+    def clear_on_commit(self, using=None):
+        """`clear()` now and again when the current transaction ends."""
+        self._after_transaction(self.clear, using)
+
+    def _invalidate_many(self, profile_ids, membership):
+        for pid in profile_ids:
+            self.invalidate(pid, membership=membership)
+
+    def _after_transaction(self, action, using):
+        action()
+        conn = transaction.get_connection(using)
+        if not conn.in_atomic_block:
+            return
+        p = _Pending(action, using, _scope(conn))
+        if not hasattr(self._local, "pending"):
+            self._local.pending = []
+        self._local.pending.append(p)
+        # robust: a failing callback registered before ours mustn't skip it
+        transaction.on_commit(p.committed, using=using, robust=True)
+
+    def _bump(self):
+        cache = self.cache
+        try:
+            gen = cache.incr(GEN_KEY)
+        except ValueError:  # key missing
+            cache.add(GEN_KEY, 1, None)
+            gen = cache.get(GEN_KEY, 1)
+        if self._gen is not None and gen == self._gen + 1:
+            # only our own bump since we last synced: local state is current
+            self._gen = gen
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Process-wide FeatureStore, configured from settings on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FeatureStore(getattr(settings, "MATCHING_FEATURE_CACHE", None))
+        return _store
@@ -0,0 +1,165 @@
+"""
+Optional NumPy scoring engine.
+
+The roster is encoded once as boolean matrices over a fixed skill/language
+vocabulary plus flat arrays of availability windows, so eligibility and
+score for every volunteer against one event are a few column selections,
+`all`/`any`/`sum` reductions and comparisons. Rules and ordering mirror
+logic.matches_event / logic.score exactly.
+"""
+from datetime import datetime, timedelta, timezone
+
+from .logic import matches_event, score
+from .features import compile_volunteer, compile_event
+from .geo import EARTH_RADIUS_MILES
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+HAS_NUMPY = np is not None
+
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+
+
+def _micros(dt):
+    # aware -> UTC wall clock; naive stays naive. Mixed inputs are rejected
+    # before we get here, so both map onto one comparable integer axis.
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // _US
+
+
+def _haversine(lat, lng, lat0, lng0):
+    # vectorized twin of geo.haversine_miles (volunteer arrays first, event second)
+    p1, p2 = np.radians(lat), np.radians(lat0)
+    dp, dl = p2 - p1, np.radians(lng0 - lng)
+    h = np.sin(dp / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.minimum(1.0, np.sqrt(h)))
+
+
+def _vocab(feature_sets):
+    vocab = {}
+    for fs in feature_sets:
+        for x in fs:
+            vocab.setdefault(x, len(vocab))
+    return vocab
+
+
+def _matrix(rows, vocab, n):
+    m = np.zeros((n, len(vocab)), dtype=bool)
+    for i, fs in rows:
+        for x in fs:
+            m[i, vocab[x]] = True
+    return m
+
+
+class VectorIndex:
+    """Roster encoded for vectorized matching; same interface as VolunteerIndex."""
+
+    def __init__(self, volunteers, features=None):
+        if not HAS_NUMPY:
+            raise ImportError("numpy is required for the vectorized matching engine")
+        self.volunteers = list(volunteers)
+        n = len(self.volunteers)
+        if features is None:
+            features = [compile_volunteer(v) for v in self.volunteers]
+        feats = list(features)
+
+        # volunteers we can't encode are scored one by one with logic.*
+        self.fallback = [i for i, f in enumerate(feats) if f is None]
+        ok = [(i, f) for i, f in enumerate(feats) if f is not None]
+        self.encoded = np.zeros(n, dtype=bool)
+        self.encoded[[i for i, _ in ok]] = True
+
+        self.skill_vocab = _vocab(f.skills for _, f in ok)
+        self.lang_vocab = _vocab(f.languages for _, f in ok)
+        self.skills = _matrix(((i, f.skills) for i, f in ok), self.skill_vocab, n)
+        self.languages = _matrix(((i, f.languages) for i, f in ok), self.lang_vocab, n)
+
+        self.lat = np.zeros(n)
+        self.lng = np.zeros(n)
+        starts, ends, owners = [], [], []
+        self._aware = set()
+        for i, f in ok:
+            self.lat[i], self.lng[i] = f.lat, f.lng
+            for a0, a1 in f.windows:
+                self._aware.update((a0.tzinfo is not None, a1.tzinfo is not None))
+                starts.append(_micros(a0))
+                ends.append(_micros(a1))
+                owners.append(i)
+        self.win_start = np.array(starts, dtype=np.int64)
+        self.win_end = np.array(ends, dtype=np.int64)
+        self.win_owner = np.array(owners, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.volunteers)
+
+    def _columns(self, vocab, values):
+        cols = [vocab.get(x) for x in values]
+        return None if None in cols else cols
+
+    def _vector_match(self, ef):
+        """(mask, scores) over the encoded volunteers, or None to defer to logic.*."""
+        n = len(self.volunteers)
+        if ef.slots <= 0:
+            return np.zeros(n, dtype=bool), np.zeros(n)
+        mask = self.encoded.copy()
+        total = np.zeros(n)
+
+        if ef.required_skills:
+            cols = self._columns(self.skill_vocab, ef.required_skills)
+            if cols is None:  # some required skill nobody has
+                return np.zeros(n, dtype=bool), total
+            sub = self.skills[:, cols]
+            mask &= sub.all(axis=1)
+            total += sub.sum(axis=1)
+
+        if ef.languages:
+            cols = [c for c in (self.lang_vocab.get(x) for x in ef.languages) if c is not None]
+            sub = self.languages[:, cols]
+            mask &= sub.any(axis=1)
+            total += sub.sum(axis=1)
+
+        r = ef.max_radius_miles
+        if r is not None:
+            mask &= _haversine(self.lat, self.lng, ef.lat, ef.lng) < r
+
+        if ef.blocks:
+            aware = {b.tzinfo is not None for blk in ef.blocks for b in blk}
+            if len(aware | self._aware) > 1:
+                return None  # naive/aware mix: let logic.* raise like it always has
+            free = np.zeros(n, dtype=bool)
+            for b0, b1 in ef.blocks:
+                hit = (self.win_start < _micros(b1)) & (_micros(b0) < self.win_end)
+                free[self.win_owner[hit]] = True
+            mask &= free
+
+        return mask, total
+
+    def _eligible(self, event):
+        """[(roster position, score)] in roster order."""
+        ef = compile_event(event)
+        res = None if ef is None else self._vector_match(ef)
+        if res is None:
+            return [(i, score(v, event)) for i, v in enumerate(self.volunteers)
+                    if matches_event(v, event)]
+
+        mask, total = res
+        out = [(int(i), float(total[i])) for i in np.flatnonzero(mask)]
+        if self.fallback:
+            out += [(i, score(self.volunteers[i], event)) for i in self.fallback
+                    if matches_event(self.volunteers[i], event)]
+            out.sort(key=lambda t: t[0])
+        return out
+
+    def candidates(self, event):
+        return [self.volunteers[i] for i, _ in self._eligible(event)]
+
+    def eligible(self, event):
+        return [(self.volunteers[i], s) for i, s in self._eligible(event)]
+
+    def match(self, event):
+        return sorted(self.eligible(event), key=lambda t: t[1], reverse=True)
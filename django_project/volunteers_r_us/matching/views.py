@@ -2,22 +2,71 @@ from django.shortcuts import render
 
 # Create your views here.
 import json
-from django.http import JsonResponse, HttpResponseBadRequest
+from django.http import JsonResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.conf import settings
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 
-from .data import VOLUNTEERS, EVENTS
+from .db import load_events, events_by_id
 from .logic import matches_event, match_volunteers, volunteer_to_dict, event_to_dict
+from .store import get_store
+from .assign import MAX_BULK_ASSIGN, bulk_assign, load_profiles
+from ..models import Event as EventModel
 from .forms import VolunteerForm, EventForm
 from .domain import Event  # if you really need this class; otherwise keep events as dicts
 
+def _rank(ev, limit, offset):
+    # compiled roster kept warm by the feature store; signals invalidate it.
+    # Large rosters are sharded across the process pool (matching.parallel).
+    return get_store().top_matches(ev, limit, offset, getattr(settings, "MATCHING_ENGINE", "python"))
+
+def _find_event(event_id):
+    try:
+        return events_by_id([event_id]).get(int(event_id))
+    except (TypeError, ValueError):
+        return None
+
+# page size for match results when the caller doesn't pass `limit`
+DEFAULT_MATCH_LIMIT = 50
+MAX_MATCH_LIMIT = 500
+
+def _json_object(request):
+    """The request body as a dict, or None if it isn't a JSON object."""
+    try:
+        data = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def _page_params(request, data):
+    """(limit, offset) from the JSON body or query string; ValueError if invalid."""
+    def pick(key, default):
+        raw = data.get(key, request.GET.get(key))
+        return default if raw in (None, "") else int(raw)
+    limit, offset = pick("limit", DEFAULT_MATCH_LIMIT), pick("offset", 0)
+    if not (1 <= limit <= MAX_MATCH_LIMIT) or offset < 0:
+        raise ValueError("limit must be 1-%d and offset >= 0" % MAX_MATCH_LIMIT)
+    return limit, offset
+
+def _match_payload(ev_dict, page, total, limit, offset):
+    nxt = offset + limit
+    return {
+        "event": event_to_dict(ev_dict),
+        "matches": [{"volunteer": volunteer_to_dict(v), "score": s} for v, s in page],
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "next_offset": nxt if nxt < total else None,
+    }
+
 @require_http_methods(["GET"])
 def volunteers_api(_request):
-    return JsonResponse({"volunteers": [volunteer_to_dict(v) for v in VOLUNTEERS]})
+    return JsonResponse({"volunteers": [volunteer_to_dict(v) for v in get_store().roster()]})
 
 @require_http_methods(["GET"])
 def events_api(_request):
-    return JsonResponse({"events": [event_to_dict(e) for e in EVENTS]})
+    return JsonResponse({"events": [event_to_dict(e) for e in load_events()]})
 
 @csrf_exempt
 @require_http_methods(["POST"])
@@ -40,37 +89,99 @@ def validate_event(request):
 @csrf_exempt
 @require_http_methods(["POST"])
 def match_api(request):
+    data = _json_object(request)
+    if data is None:
+        return HttpResponseBadRequest("Body must be a JSON object")
+
     try:
-        data = json.loads(request.body or "{}")
-    except json.JSONDecodeError:
-        return HttpResponseBadRequest("Invalid JSON")
+        limit, offset = _page_params(request, data)
+    except (TypeError, ValueError) as exc:
+        return HttpResponseBadRequest(str(exc))
 
     # Resolve event payload -> dict
     if "event_id" in data:
-        # EVENTS may contain objects or dicts
-        ev = next(
-            (
-                e for e in EVENTS
-                if (getattr(e, "id", None) == data["event_id"])
-                or (isinstance(e, dict) and e.get("id") == data["event_id"])
-            ),
-            None,
-        )
+        ev = _find_event(data["event_id"])
         if ev is None:
             return HttpResponseBadRequest("Unknown event_id")
-        ev_dict = event_to_dict(ev)  # normalize for matching + response
+        ev_dict = ev
     else:
         f = EventForm(data)
         if not f.is_valid():
             return JsonResponse({"ok": False, "errors": f.errors}, status=400)
         ev_dict = f.cleaned_data
 
-    ranked = match_volunteers(VOLUNTEERS, ev_dict)
-    return JsonResponse(
-        {
-            "event": event_to_dict(ev_dict),
-            "matches": [
-                {"volunteer": volunteer_to_dict(v), "score": s} for v, s in ranked
-            ],
-        }
-    )
+    # only the requested page is ranked and serialized
+    page, total = _rank(ev_dict, limit, offset)
+    return JsonResponse(_match_payload(ev_dict, page, total, limit, offset))
+
+def _stream_batch(events, limit, offset):
+    """Emit {"results": {"<event id>": {"event": ..., "matches": [...]}, ...}} piecewise."""
+    enc = DjangoJSONEncoder()
+    yield '{"results": {'
+    for n, ev in enumerate(events):
+        page, total = _rank(ev, limit, offset)
+        body = _match_payload(ev, page, total, limit, offset)
+        yield ("," if n else "") + enc.encode(str(body["event"]["id"])) + ":" + enc.encode(body)
+    yield "}}"
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def match_batch_api(request):
+    """
+    Match many events in one request. Body: {"event_ids": [...]}; omit it to
+    match every known event. Volunteer features are compiled once and shared.
+    `limit`/`offset` page each event's matches like match_api.
+    """
+    data = _json_object(request)
+    if data is None:
+        return HttpResponseBadRequest("Body must be a JSON object")
+    try:
+        limit, offset = _page_params(request, data)
+    except (TypeError, ValueError) as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    ids = data.get("event_ids")
+    if ids is None:
+        events = load_events()
+    else:
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return HttpResponseBadRequest("event_ids must be a list of integers")
+        found = events_by_id(ids)
+        unknown = [eid for eid in dict.fromkeys(ids) if eid not in found]
+        if unknown:
+            return JsonResponse({"ok": False, "unknown_event_ids": unknown}, status=400)
+        events = [found[eid] for eid in dict.fromkeys(ids)]
+
+    return StreamingHttpResponse(_stream_batch(events, limit, offset), content_type="application/json")
+
+@require_http_methods(["POST"])
+def assign_bulk_api(request):
+    """
+    Assign many volunteers to one event. Body:
+    {"event_id": 1, "volunteer_ids": [profile ids], "notify": true}
+
+    Staff only. Unlike the read-only match endpoints this one writes, so it
+    keeps CSRF protection: send the csrftoken cookie back as X-CSRFToken.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"ok": False, "error": "authentication required"}, status=401)
+    if not request.user.is_staff:
+        return JsonResponse({"ok": False, "error": "staff only"}, status=403)
+    data = _json_object(request)
+    if data is None:
+        return HttpResponseBadRequest("Body must be a JSON object")
+    ids = data.get("volunteer_ids")
+    if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+        return HttpResponseBadRequest("volunteer_ids must be a list of integers")
+    if len(ids) > MAX_BULK_ASSIGN:
+        return HttpResponseBadRequest("at most %d volunteer_ids per request" % MAX_BULK_ASSIGN)
+    event = EventModel.objects.filter(pk=data.get("event_id")).first() \
+        if isinstance(data.get("event_id"), int) else None
+    if event is None:
+        return JsonResponse({"ok": False, "error": "event not found"}, status=404)
+
+    profiles, unknown = load_profiles(ids)
+    if unknown:
+        return JsonResponse({"ok": False, "unknown_volunteer_ids": unknown}, status=400)
+    n = bulk_assign(event, profiles.values(), created_by=request.user, notify=bool(data.get("notify", True)))
+    return JsonResponse({"ok": True, "event_id": event.id, "assigned": n})
@@ -74,6 +74,11 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["event_date"]),  # history date filter / sort
+        ]
+
     def __str__(self): return self.name
 
 
@@ -211,3 +216,102 @@ class Profile(models.Model):
 
     def __str__(self):
         return f"Profile<{self.user}>"
+
+
+# ---------------------------
+# Background jobs (see jobs.py / manage.py run_jobs)
+# ---------------------------
+class Job(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE    = "done"
+    FAILED  = "failed"
+    STATE_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE,    "Done"),
+        (FAILED,  "Failed"),
+    ]
+
+    kind    = models.CharField(max_length=50)
+    # coalescing key: at most one pending job per key (e.g. "notify_event:42")
+    key     = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict, blank=True)
+
+    state      = models.CharField(max_length=10, choices=STATE_CHOICES, default=PENDING)
+    attempts   = models.PositiveIntegerField(default=0)
+    run_after  = models.DateTimeField(default=timezone.now)
+    locked_at  = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["key"], condition=models.Q(state="pending"), name="uq_job_pending_key"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["state", "run_after"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} [{self.key}] ({self.state})"
+
+
+# ---------------------------
+# Background report exports (see reports.py)
+# ---------------------------
+class Report(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    READY   = "ready"
+    FAILED  = "failed"
+    STATE_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (READY,   "Ready"),
+        (FAILED,  "Failed"),
+    ]
+    ACTIVE = (PENDING, RUNNING)
+    HISTORY = "history"
+    EVENTS  = "events"
+    KIND_CHOICES = [
+        (HISTORY, "Volunteer history"),
+        (EVENTS,  "Events"),
+    ]
+    FORMAT_CHOICES = [("csv", "CSV"), ("xlsx", "Excel"), ("pdf", "PDF")]
+
+    kind    = models.CharField(max_length=20, choices=KIND_CHOICES)
+    format  = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    filters = models.JSONField(default=dict, blank=True)
+    # hash of (kind, format, normalized filters): identical requests share a file
+    key     = models.CharField(max_length=64, db_index=True)
+
+    state    = models.CharField(max_length=10, choices=STATE_CHOICES, default=PENDING)
+    file     = models.FileField(upload_to="reports/", blank=True)
+    filename = models.CharField(max_length=255, blank=True)
+    rows     = models.PositiveIntegerField(default=0)
+    error    = models.TextField(blank=True)
+
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL,
+                                     related_name="requested_reports")
+    # everyone to notify when the file is ready
+    subscribers  = models.ManyToManyField(settings.AUTH_USER_MODEL, blank=True, related_name="reports")
+
+    created_at  = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # at most one render in flight per export
+            models.UniqueConstraint(
+                fields=["key"], condition=models.Q(state__in=["pending", "running"]),
+                name="uq_report_active_key",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.kind}.{self.format} #{self.pk} ({self.state})"
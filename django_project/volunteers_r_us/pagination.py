@@ -0,0 +1,121 @@
+"""
+Keyset pagination for HTML list views.
+
+`keyset_page(qs, ordering, after=..., before=...)` returns one page plus
+opaque cursors for the neighbouring pages. Each page is a range condition
+on the ordering columns followed by LIMIT, never an OFFSET, so page 500
+costs the same as page 1. The ordering must end in a unique column
+(normally "id") and its columns must not be NULL.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+# cap for count_up_to(): past this the view shows "1,000+"
+COUNT_CAP = 1000
+
+
+@dataclass(frozen=True)
+class KeysetPage:
+    rows: list
+    next_cursor: str | None
+    prev_cursor: str | None
+
+
+def _value(obj, field):
+    for part in field.split("__"):
+        obj = getattr(obj, part)
+    return obj
+
+
+def encode_cursor(obj, ordering):
+    values = [_value(obj, f.lstrip("-")) for f in ordering]
+    raw = json.dumps(values, cls=DjangoJSONEncoder)
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _field(model, path):
+    *hops, name = path.split("__")
+    for hop in hops:
+        model = model._meta.get_field(hop).related_model
+    return model._meta.get_field(name)
+
+
+def decode_cursor(token, ordering, model=None):
+    """
+    Cursor values, or None for a missing / malformed / foreign cursor. With
+    `model`, each value is also converted by its ordering field, so a
+    tampered cursor is rejected here instead of failing in the query.
+    """
+    if not token:
+        return None
+    try:
+        values = json.loads(urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(values, list) or len(values) != len(ordering):
+        return None
+    if model is not None:
+        try:
+            values = [_field(model, f.lstrip("-")).to_python(v) for f, v in zip(ordering, values)]
+        except (ValidationError, FieldDoesNotExist, TypeError, ValueError):
+            return None
+        if any(v is None for v in values):  # ordering columns are never NULL
+            return None
+    return values
+
+
+def _after(ordering, values):
+    """Q for rows strictly after `values` in `ordering`."""
+    q, equal = Q(), Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        op = "lt" if field.startswith("-") else "gt"
+        q |= equal & Q(**{f"{name}__{op}": value})
+        equal &= Q(**{name: value})
+    # redundant, but a plain bound on the first column lets the DB range-scan
+    first = ordering[0]
+    bound = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": values[0]})
+    return bound & q
+
+
+def _flip(ordering):
+    return [f[1:] if f.startswith("-") else f"-{f}" for f in ordering]
+
+
+def keyset_page(qs, ordering, after=None, before=None, size=50):
+    """
+    One page of `qs` in `ordering`, starting after the `after` cursor or
+    ending before the `before` cursor (neither: the first page).
+    """
+    after_values = decode_cursor(after, ordering, qs.model)
+    before_values = None if after_values else decode_cursor(before, ordering, qs.model)
+    if before_values:
+        # walk backwards from the cursor, then put the page back in order
+        rows = list(qs.filter(_after(_flip(ordering), before_values))
+                    .order_by(*_flip(ordering))[:size + 1])
+        has_more = len(rows) > size
+        rows = rows[:size][::-1]
+        has_prev, has_next = has_more, True
+    else:
+        if after_values:
+            qs = qs.filter(_after(ordering, after_values))
+        rows = list(qs.order_by(*ordering)[:size + 1])
+        has_next = len(rows) > size
+        rows = rows[:size]
+        has_prev = bool(after_values)
+    return KeysetPage(
+        rows=rows,
+        next_cursor=encode_cursor(rows[-1], ordering) if rows and has_next else None,
+        prev_cursor=encode_cursor(rows[0], ordering) if rows and has_prev else None,
+    )
+
+
+def count_up_to(qs, cap=COUNT_CAP):
+    """(count, capped): counts at most `cap` + 1 rows instead of the whole table."""
+    n = qs.order_by()[:cap + 1].count()
+    return min(n, cap), n > cap
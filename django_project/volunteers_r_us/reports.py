@@ -0,0 +1,454 @@
+"""
+Export rendering for volunteer history and events, plus background reports.
+
+The synchronous exports in views.py and the "render_report" job both build
+rows and files with the helpers here. A Report is keyed by a hash of its
+kind, format and normalized filters. Asking again for the same export
+while a fresh copy exists (REPORT_CACHE_SECONDS) returns that file instead
+of rendering it again; at most one render per key is in flight
+(uq_report_active_key).
+"""
+import csv
+import hashlib
+import json
+import tempfile
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from notify.counters import add_unread
+from notify.models import Notification
+from notify.realtime import touch
+
+from .models import Assignment, Event, Report
+
+HISTORY_HEADERS = [
+    "Volunteer", "Event Name", "Description", "Location",
+    "Required Skills", "Urgency", "Event Date",
+    "Capacity (current / total)", "Languages", "Status",
+]
+EVENT_HEADERS = [
+    "Event Name",
+    "Description",
+    "Location",
+    "Required Skills",
+    "Urgency",
+    "Event Date",
+]
+# rows fetched per round trip when iterating an export
+EXPORT_CHUNK_SIZE = 2000
+REPORT_CACHE_SECONDS = 600
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+
+
+# ---------- rows ----------
+def _parse_date(s: str):
+    if not s:
+        return None
+    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%Y/%m/%d"):
+        try:
+            return datetime.strptime(s, fmt).date()
+        except ValueError:
+            pass
+    return None
+
+
+def _skills_list(event):
+    """Return list of skill names from Event.required_skills (ManyToManyField)."""
+    if not event:
+        return []
+    return [str(skill).strip() for skill in event.required_skills.all()]
+
+
+def _csv_from_list(values):
+    return ", ".join(v for v in values if v)
+
+
+def history_filters(volunteer="", status="", from_date=""):
+    """Normalized volunteer_history filters (empty ones dropped)."""
+    d_from = _parse_date((from_date or "").strip())
+    filters = {
+        "volunteer": (volunteer or "").strip(),
+        "status": (status or "").strip(),
+        "from_date": d_from.isoformat() if d_from else "",
+    }
+    return {k: v for k, v in filters.items() if v}
+
+
+def history_queryset(filters):
+    # volunteer, profile and event joined, skills prefetched (one extra
+    # query), so a whole export is a fixed number of queries
+    qs = (
+        Assignment.objects
+        .select_related("volunteer__profile", "event")
+        .prefetch_related("event__required_skills")
+    )
+    if filters.get("volunteer"):
+        qs = qs.filter(volunteer__email=filters["volunteer"])
+    if filters.get("status"):
+        qs = qs.filter(status=filters["status"])
+    d_from = _parse_date(filters.get("from_date", ""))
+    if d_from:
+        qs = qs.filter(event__event_date=d_from)
+    return qs.order_by("event__event_date", "volunteer__email")
+
+
+def events_queryset():
+    # All events, ordered by date then name
+    return Event.objects.prefetch_related("required_skills").order_by("event_date", "name")
+
+
+def history_row(rec):
+    """One volunteer_history export row (XLSX / CSV) for an Assignment."""
+    evt = rec.event
+    user = rec.volunteer
+
+    # Full name if available, otherwise email
+    if hasattr(user, "profile") and getattr(user.profile, "full_name", "").strip():
+        volunteer_name = user.profile.full_name.strip()
+    else:
+        volunteer_name = getattr(user, "email", str(user))
+
+    skills_csv = _csv_from_list(_skills_list(evt))
+
+    # No capacity/languages fields in Event yet: use placeholders
+    cap_current = 0
+    cap_total   = 0
+    languages_csv = ""
+
+    # Use display label for status if choices are defined
+    if hasattr(rec, "get_status_display"):
+        status_display = rec.get_status_display()
+    else:
+        status_display = rec.status or ""
+
+    return [
+        volunteer_name,
+        getattr(evt, "name", "") if evt else "",
+        getattr(evt, "description", "") if evt else "",
+        getattr(evt, "location", "") if evt else "",
+        skills_csv,
+        getattr(evt, "urgency", "") if evt else "",
+        evt.event_date.strftime("%Y-%m-%d") if (evt and evt.event_date) else "",
+        f"{cap_current} / {cap_total}",
+        languages_csv,
+        status_display,
+    ]
+
+
+def history_pdf_row(rec):
+    """The PDF variant lists the volunteer's email and the raw status."""
+    row = history_row(rec)
+    row[0] = getattr(rec.volunteer, "email", str(rec.volunteer))
+    row[-1] = rec.status
+    return row
+
+
+def event_row(evt):
+    return [
+        getattr(evt, "name", "") or "",
+        getattr(evt, "description", "") or "",
+        getattr(evt, "location", "") or "",
+        _csv_from_list(_skills_list(evt)),
+        getattr(evt, "urgency", "") or "",
+        evt.event_date.strftime("%Y-%m-%d") if getattr(evt, "event_date", None) else "",
+    ]
+
+
+def export_rows(kind, fmt, filters):
+    """(headers, lazy rows) for a report."""
+    if kind == Report.EVENTS:
+        rows = (event_row(e) for e in events_queryset().iterator(chunk_size=EXPORT_CHUNK_SIZE))
+        return EVENT_HEADERS, rows
+    row = history_pdf_row if fmt == "pdf" else history_row
+    qs = history_queryset(filters)
+    return HISTORY_HEADERS, (row(rec) for rec in qs.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+
+
+# ---------- writers (all take a binary file object) ----------
+def write_csv(out, headers, rows):
+    """Returns the number of data rows written."""
+    import io
+
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(headers)
+    n = 0
+    for row in rows:
+        writer.writerow(row)
+        n += 1
+    text.flush()
+    text.detach()  # leave `out` open for the caller
+    return n
+
+
+def write_xlsx(out, headers, rows, sheet_title):
+    """
+    Write a write_only openpyxl workbook. Column widths are measured during
+    the single pass over `rows`; a write-only sheet needs them before the
+    first row, so rows are spooled to a temp CSV and replayed. Raises
+    ImportError without openpyxl. Returns the number of data rows written.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, Alignment
+    from openpyxl.utils import get_column_letter
+
+    widths = [len(h) for h in headers]
+    n = 0
+    with tempfile.TemporaryFile("w+", newline="", encoding="utf-8") as spool:
+        writer = csv.writer(spool)
+        for row in rows:
+            writer.writerow(row)
+            widths = [max(w, len(str(v or ""))) for w, v in zip(widths, row)]
+            n += 1
+        spool.seek(0)
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(sheet_title)
+        # rough autofit
+        for col_idx, width in enumerate(widths, start=1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = min(50, max(12, width + 2))
+
+        # header style
+        header = []
+        for h in headers:
+            cell = WriteOnlyCell(ws, value=h)
+            cell.font = Font(bold=True)
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+            header.append(cell)
+        ws.append(header)
+        for row in csv.reader(spool):
+            ws.append(row)
+    wb.save(out)
+    return n
+
+
+def write_pdf_table(out, columns, rows):
+    """
+    Generic PDF table used by the volunteer_history (10 columns) and events
+    (6 columns) exports.
+
+    It:
+      * Fits the table to the page width
+      * Gives more room to text-heavy columns (Description, Required Skills, Capacity)
+      * Wraps long text inside cells so headers/values stay inside their cells
+    """
+    rows = list(rows)
+    from reportlab.lib.pagesizes import landscape, letter
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    page_size = landscape(letter)
+    page_width, page_height = page_size
+
+    # Margins and usable width
+    left_margin = right_margin = 30
+    top_margin = bottom_margin = 30
+    usable_width = page_width - (left_margin + right_margin)
+
+    # Build raw data: header row + data rows
+    data = [columns] + rows
+    num_cols = len(columns)
+
+    # --------- Column width weights (relative, not pixels) ----------
+    if num_cols == 10:
+        # volunteer_history: [Volunteer, Event, Description, Location, Required Skills,
+        #                     Urgency, Event Date, Capacity, Languages, Status]
+        weights = [
+            1.1,  # Volunteer
+            1.0,  # Event Name
+            1.5,  # Description
+            0.8,  # Location
+            2.3,  # Required Skills  (wide)
+            0.7,  # Urgency
+            1.0,  # Event Date
+            2.0,  # Capacity (current / total)
+            0.8,  # Languages
+            0.6,  # Status
+        ]
+    elif num_cols == 6:
+        # events: [Event Name, Description, Location, Required Skills, Urgency, Event Date]
+        weights = [
+            1.3,  # Event Name
+            1.7,  # Description
+            1.0,  # Location
+            2.4,  # Required Skills (wide)
+            0.7,  # Urgency
+            0.9,  # Event Date
+        ]
+    else:
+        # Fallback: equal widths
+        weights = [1.0] * num_cols
+
+    total_weight = sum(weights)
+    col_widths = [usable_width * (w / total_weight) for w in weights]
+
+    # --------- Convert all cells to Paragraphs so they wrap ---------
+    styles = getSampleStyleSheet()
+    body_style = styles["BodyText"]
+    body_style.fontSize = 8
+    body_style.leading = 10
+    body_style.wordWrap = "CJK"
+
+    header_style = styles["BodyText"]
+    header_style.fontSize = 8
+    header_style.leading = 10
+    header_style.wordWrap = "CJK"
+    header_style.fontName = "Helvetica-Bold"
+
+    para_data = []
+    for row_idx, row in enumerate(data):
+        new_row = []
+        for cell in row:
+            text = "" if cell is None else str(cell)
+            if row_idx == 0:
+                new_row.append(Paragraph(text, header_style))
+            else:
+                new_row.append(Paragraph(text, body_style))
+        para_data.append(new_row)
+
+    # --------- Create document & table ----------
+    doc = SimpleDocTemplate(
+        out,
+        pagesize=page_size,
+        leftMargin=left_margin,
+        rightMargin=right_margin,
+        topMargin=top_margin,
+        bottomMargin=bottom_margin,
+    )
+
+    table = Table(para_data, colWidths=col_widths, repeatRows=1)
+
+    # --------- Styling (grid, alignment, etc.) ----------
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
+        ("TOPPADDING", (0, 0), (-1, 0), 4),
+        ("TOPPADDING", (0, 1), (-1, -1), 3),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ]))
+
+    doc.build([table])
+    return len(rows)
+
+
+# ---------- background reports ----------
+def report_key(kind, fmt, filters):
+    raw = json.dumps([kind, fmt, filters], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def request_report(kind, fmt, filters, user):
+    """
+    Return (report, cached) for this export. A fresh ready report or one
+    still rendering is reused (and `user` subscribed to it); otherwise a new
+    Report is created and a render_report job queued after commit.
+    """
+    from .jobs import enqueue_on_commit
+
+    key = report_key(kind, fmt, filters)
+    ttl = getattr(settings, "REPORT_CACHE_SECONDS", REPORT_CACHE_SECONDS)
+    fresh = Q(state=Report.READY, finished_at__gte=timezone.now() - timedelta(seconds=ttl))
+    reusable = Report.objects.filter(Q(state__in=Report.ACTIVE) | fresh, key=key).order_by("-created_at")
+    with transaction.atomic():
+        report = reusable.first()
+        if report is None:
+            try:
+                with transaction.atomic():
+                    report = Report.objects.create(kind=kind, format=fmt, filters=filters, key=key,
+                                                   requested_by=user)
+            except IntegrityError:
+                # a concurrent request created it first (uq_report_active_key)
+                report = reusable.first() or Report.objects.filter(key=key).latest("created_at")
+            else:
+                report.subscribers.add(user)
+                enqueue_on_commit("render_report", f"render_report:{report.pk}", report_id=report.pk)
+                return report, False
+        report.subscribers.add(user)
+    return report, report.state == Report.READY
+
+
+def _prune(report):
+    """
+    Older renders of the same export are superseded by `report`. Their
+    "Report ready" notifications are pointed at the new file, which is the
+    same export rendered later, so those links keep working.
+    """
+    old = list(Report.objects.filter(key=report.key).exclude(pk=report.pk).exclude(state__in=Report.ACTIVE))
+    if not old:
+        return
+    pks = [r.pk for r in old]
+    Notification.objects.filter(
+        user_id__in=Report.subscribers.through.objects.filter(report_id__in=pks).values("user_id"),
+        url__in=[reverse("report_download", args=[pk]) for pk in pks],
+    ).update(url=reverse("report_download", args=[report.pk]))
+    for r in old:
+        if r.file:
+            r.file.delete(save=False)
+    Report.objects.filter(pk__in=pks).delete()
+
+
+def render_report(report_id):
+    """
+    Job handler: render the file, store it and notify the subscribers. Runs
+    outside the job transaction so a long export doesn't hold the write
+    lock; only the final state change is written atomically.
+    """
+    # RUNNING too: a worker that died mid-render gets its job requeued
+    claimed = Report.objects.filter(pk=report_id, state__in=Report.ACTIVE).update(state=Report.RUNNING)
+    if not claimed:  # deleted, or already rendered by an earlier run
+        return
+    report = Report.objects.get(pk=report_id)
+    fmt = report.format
+    stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+    name = "events" if report.kind == Report.EVENTS else "volunteer_history"
+    for part in ("volunteer", "status"):
+        if report.filters.get(part):
+            name += f"_{report.filters[part]}"
+    headers, rows = export_rows(report.kind, fmt, report.filters)
+    try:
+        with tempfile.TemporaryFile() as out:
+            if fmt == "xlsx":
+                n = write_xlsx(out, headers, rows, "Volunteer History" if report.kind == Report.HISTORY else "Events")
+            elif fmt == "pdf":
+                n = write_pdf_table(out, headers, rows)
+            else:
+                n = write_csv(out, headers, rows)
+            out.seek(0)
+            report.filename = f"{name}_{stamp}.{fmt}"
+            report.file.save(f"{report.key[:16]}-{report.filename}", File(out), save=False)
+    except Exception as exc:
+        # rendering is deterministic: record the failure instead of retrying
+        report.state, report.error = Report.FAILED, f"{type(exc).__name__}: {exc}"
+        title, url = f"Report failed: {report.get_kind_display()} ({fmt.upper()})", ""
+    else:
+        report.state, report.rows = Report.READY, n
+        title = f"Report ready: {report.get_kind_display()} ({fmt.upper()})"
+        url = reverse("report_download", args=[report.pk])
+    report.finished_at = timezone.now()
+    with transaction.atomic():
+        report.save()
+        if report.state == Report.READY:
+            _prune(report)
+        subscribers = list(report.subscribers.values_list("pk", flat=True))
+        Notification.objects.bulk_create([
+            Notification(user_id=uid, title=title, body=report.error or f"{report.rows} row(s)", url=url)
+            for uid in subscribers
+        ])
+        add_unread(subscribers)
+        touch(subscribers)
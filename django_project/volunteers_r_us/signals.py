@@ -1,13 +1,19 @@
 # volunteers_r_us/signals.py
-from django.db.models.signals import post_save, m2m_changed
+from django.core.signals import request_finished
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from .models import Event, Match  # ensure Match is in this app's models
+from .models import Event, Match, Profile, Skill, VolunteerProfile  # ensure Match is in this app's models
+
+def _queue_event_fanout(event_id):
+    # runs in `manage.py run_jobs`, once per event per transaction: every
+    # save/M2M signal before the commit folds into the same job
+    from .jobs import enqueue_on_commit
+    enqueue_on_commit("notify_event", f"notify_event:{event_id}", event_id=event_id)
 
 @receiver(post_save, sender=Event)
 def on_event_saved(sender, instance, created, **kwargs):
     if created:                      # <- guard
-        from .matching.notifications import notify_candidates_for_event
-        notify_candidates_for_event(instance)
+        _queue_event_fanout(instance.pk)
 
 @receiver(post_save, sender=Match)
 def on_match_created(sender, instance, created, **kwargs):
@@ -16,7 +22,52 @@ def on_match_created(sender, instance, created, **kwargs):
         create_match_notification(instance.volunteer, instance.event)
 
 @receiver(m2m_changed, sender=Event.required_skills.through)
-def on_event_skills_set(sender, instance, action, **kwargs):
+def on_event_skills_set(sender, instance, action, reverse, pk_set, **kwargs):
     if action in {"post_add", "post_set", "post_remove"}:
-        from .matching.notifications import notify_candidates_for_event
-        notify_candidates_for_event(instance)
+        if not reverse:
+            _queue_event_fanout(instance.pk)
+        else:                        # skill.events.add(...): pk_set holds event ids
+            for event_id in sorted(pk_set or ()):
+                _queue_event_fanout(event_id)
+
+
+# ---------- compiled matching features ----------
+# Keep matching.store in step with the rows it was compiled from.
+
+@receiver(post_save, sender=Profile)
+def on_profile_saved(sender, instance, created, using, **kwargs):
+    from .matching.store import get_store
+    get_store().invalidate_on_commit([instance.pk], membership=created, using=using)
+
+@receiver(post_delete, sender=Profile)
+def on_profile_deleted(sender, instance, using, **kwargs):
+    from .matching.store import get_store
+    get_store().invalidate_on_commit([instance.pk], membership=True, using=using)
+
+@receiver(m2m_changed, sender=VolunteerProfile.skills.through)
+def on_volunteer_skills_changed(sender, instance, action, reverse, pk_set, using, **kwargs):
+    if action not in {"post_add", "post_remove", "post_clear"}:
+        return
+    from .matching.store import get_store
+    store = get_store()
+    if not reverse:
+        user_ids = [instance.user_id]
+    elif pk_set is None:             # skill.volunteers.clear(): don't know who
+        store.clear_on_commit(using=using)
+        return
+    else:
+        user_ids = VolunteerProfile.objects.filter(pk__in=pk_set).values("user_id")
+    profile_ids = Profile.objects.filter(user_id__in=user_ids).values_list("pk", flat=True)
+    store.invalidate_on_commit(list(profile_ids), using=using)
+
+@receiver(post_save, sender=Skill)
+def on_skill_saved(sender, instance, created, using, **kwargs):
+    if not created:                  # a rename changes the codes profiles map to
+        from .matching.store import get_store
+        get_store().clear_on_commit(using=using)
+
+@receiver(request_finished)
+def settle_feature_store(sender, **kwargs):
+    # the request's transactions are over; redo what a rollback left behind
+    from .matching.store import get_store
+    get_store().settle()
@@ -0,0 +1,94 @@
+import json
+from datetime import date
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from notify.models import Notification, OutboxEmail, UnreadCounter
+from ..models import Assignment, Job
+from .test_match_api import _profile, _event
+
+
+class BulkAssignTests(TestCase):
+    def setUp(self):
+        self.staff = get_user_model().objects.create(email="staff@example.com", is_staff=True)
+        self.client.force_login(self.staff)
+        self.day = date(2025, 11, 2)
+        self.vols = [_profile(f"v{i}@example.com", ["first_aid"], [self.day.isoformat()]) for i in range(25)]
+        with self.captureOnCommitCallbacks(execute=True):  # flush the event's fan-out batch
+            self.event = _event("Clinic", self.day, "First Aid / CPR")
+
+    def _api(self, payload):
+        return self.client.post("/api/assign/bulk/", data=json.dumps(payload), content_type="application/json")
+
+    def test_api_assigns_with_constant_queries(self):
+        ids = [p.id for p in self.vols]
+        # session, user, event, profiles, then savepoint / upsert /
+        # notifications / unread counters (4) / outbox / release, whatever
+        # the number of volunteers
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(13):
+            r = self._api({"event_id": self.event.id, "volunteer_ids": ids})
+        assert r.status_code == 200 and r.json()["assigned"] == 25
+        assert Assignment.objects.filter(event=self.event, status=Assignment.ASSIGNED).count() == 25
+        assert Notification.objects.count() == 25 and OutboxEmail.objects.count() == 25
+        assert Job.objects.filter(kind="send_outbox").count() == 1
+        assert set(UnreadCounter.objects.values_list("unread", flat=True)) == {1}
+
+    def test_existing_rows_are_reactivated_not_duplicated(self):
+        p = self.vols[0]
+        Assignment.objects.create(volunteer=p.user, event=self.event, status=Assignment.CANCELLED)
+        r = self._api({"event_id": self.event.id, "volunteer_ids": [p.id, self.vols[1].id], "notify": False})
+        assert r.json()["assigned"] == 2
+        assert Assignment.objects.get(volunteer=p.user, event=self.event).status == Assignment.ASSIGNED
+        assert Assignment.objects.count() == 2 and not OutboxEmail.objects.exists()
+
+    def test_api_validation(self):
+        assert self._api({"event_id": self.event.id, "volunteer_ids": "1,2"}).status_code == 400
+        assert self._api({"event_id": 999, "volunteer_ids": [self.vols[0].id]}).status_code == 404
+        r = self._api({"event_id": self.event.id, "volunteer_ids": [self.vols[0].id, 999]})
+        assert r.status_code == 400 and r.json()["unknown_volunteer_ids"] == [999]
+        assert not Assignment.objects.exists()
+        self.client.logout()
+        assert self._api({"event_id": self.event.id, "volunteer_ids": []}).status_code == 401
+
+    def test_api_requires_staff_and_csrf_token(self):
+        volunteer = self.vols[0].user
+        self.client.force_login(volunteer)
+        r = self._api({"event_id": self.event.id, "volunteer_ids": [self.vols[1].id]})
+        assert r.status_code == 403 and r.json()["error"] == "staff only"
+
+        csrf_client = Client(enforce_csrf_checks=True)
+        csrf_client.force_login(self.staff)
+        body = json.dumps({"event_id": self.event.id, "volunteer_ids": [self.vols[1].id]})
+        r = csrf_client.post("/api/assign/bulk/", data=body, content_type="application/json")
+        assert r.status_code == 403 and not Assignment.objects.exists()
+        csrf_client.get(reverse("match_volunteer"))  # sets the csrftoken cookie
+        token = csrf_client.cookies["csrftoken"].value
+        r = csrf_client.post("/api/assign/bulk/", data=body, content_type="application/json",
+                             HTTP_X_CSRFTOKEN=token)
+        assert r.status_code == 200 and Assignment.objects.count() == 1
+
+    def test_html_form_is_staff_only(self):
+        self.client.force_login(self.vols[0].user)
+        r = self.client.post(reverse("assign_volunteers_bulk"),
+                             {"event_id": self.event.id, "volunteer_ids": [str(self.vols[1].id)]})
+        assert r.status_code == 302 and "admin/login" in r["Location"]
+        assert not Assignment.objects.exists()
+
+    def test_html_form(self):
+        ids = [str(p.id) for p in self.vols[:3]]
+        r = self.client.post(reverse("assign_volunteers_bulk"),
+                             {"event_id": self.event.id, "volunteer_ids": ids, "action": "assign_notify"},
+                             follow=True)
+        assert [str(m) for m in r.context["messages"]] == ["3 volunteer(s) assigned to Clinic."]
+        assert Assignment.objects.count() == 3 and OutboxEmail.objects.count() == 3
+
+    def test_single_assign_queues_the_outbox_job(self):
+        from django.core import mail
+        from ..jobs import run_pending
+        p = self.vols[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("assign_volunteer"), {"event_id": self.event.id, "volunteer_id": p.id})
+        assert list(Job.objects.filter(kind="send_outbox").values_list("state", flat=True)) == [Job.PENDING]
+        run_pending()
+        assert [m.to for m in mail.outbox] == [["v0@example.com"]]
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.template import engines
+from django.test import RequestFactory, TestCase
+
+from notify.models import Notification
+from ..context_processors import notifications
+
+
+class NotificationsContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create(email="ctx@example.com")
+        Notification.objects.create(user=self.user, title="seen", is_read=True)
+        Notification.objects.create(user=self.user, title="new")
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+
+    def _render(self, source):
+        ctx = notifications(self.request)
+        return engines["django"].from_string(source).render(ctx)
+
+    def test_untouched_variables_cost_nothing(self):
+        with self.assertNumQueries(0):
+            assert self._render("hello") == "hello"
+
+    def test_count_is_unread_only_and_cached(self):
+        source = "{{ notif_unread_count }}/{{ notif_items|length }}"
+        assert self._render(source) == "1/2"
+        with self.assertNumQueries(0):
+            assert self._render(source) == "1/2"
+
+    def test_new_notification_invalidates(self):
+        self._render("{{ notif_unread_count }}{{ notif_items|length }}")
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(user=self.user, title="another")
+        assert self._render("{{ notif_unread_count }}/{{ notif_items.0.title }}") == "2/another"
+
+    def test_anonymous(self):
+        self.request.user = AnonymousUser()
+        with self.assertNumQueries(0):
+            assert self._render("{{ notif_unread_count }}") == "0"
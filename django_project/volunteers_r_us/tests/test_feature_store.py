@@ -0,0 +1,132 @@
+from datetime import date
+from django.core.signals import request_finished
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from volunteers_r_us.matching.db import events_by_id
+from volunteers_r_us.matching.store import FeatureStore, get_store
+from volunteers_r_us.models import Skill, VolunteerProfile
+from volunteers_r_us.tests.test_match_api import _profile, _event
+
+LOCMEM = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "matching": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "matching"},
+}
+
+
+def _ids(store, event):
+    return [v["id"] for v, _ in store.index().match(event)]
+
+
+class FeatureStoreTests(TestCase):
+    def setUp(self):
+        self.store = get_store()
+        self.day = date(2025, 11, 2)
+        self.cpr = _profile("cpr@example.com", ["first_aid"], [self.day.isoformat()])
+        self.driver = _profile("drive@example.com", ["driving"], [self.day.isoformat()])
+        self.event = _event("Clinic", self.day, "First Aid / CPR")
+
+    def _ev(self):
+        return events_by_id([self.event.id])[self.event.id]
+
+    def test_warm_index_runs_no_queries(self):
+        self.store.index()
+        ev = self._ev()
+        with self.assertNumQueries(0):
+            assert _ids(self.store, ev) == [self.cpr.id]
+
+    def test_profile_save_recompiles_only_that_volunteer(self):
+        self.store.index()
+        self.driver.skills = ["driving", "first_aid"]
+        self.driver.save()
+        with self.assertNumQueries(2):  # the one profile + its VolunteerProfile skills
+            idx = self.store.index()
+        assert sorted(v["id"] for v, _ in idx.match(self._ev())) == [self.cpr.id, self.driver.id]
+
+    def test_created_and_deleted_profiles(self):
+        self.store.index()
+        new = _profile("new@example.com", ["first_aid"], [self.day.isoformat()])
+        assert new.id in _ids(self.store, self._ev())
+        self.cpr.delete()
+        assert _ids(self.store, self._ev()) == [new.id]
+
+    def test_volunteer_profile_skills_invalidate(self):
+        self.store.index()
+        vp = VolunteerProfile.objects.create(user=self.driver.user)
+        vp.skills.add(Skill.objects.get(name="First Aid / CPR"))
+        assert self.driver.id in _ids(self.store, self._ev())
+        vp.skills.clear()
+        assert _ids(self.store, self._ev()) == [self.cpr.id]
+
+    def test_reverse_skill_side_invalidates(self):
+        self.store.index()
+        vp = VolunteerProfile.objects.create(user=self.driver.user)
+        Skill.objects.get(name="First Aid / CPR").volunteers.add(vp)
+        assert self.driver.id in _ids(self.store, self._ev())
+
+    @override_settings(CACHES=LOCMEM)
+    def test_shared_cache_between_workers(self):
+        a, b = FeatureStore("matching"), FeatureStore("matching")
+        assert [v["id"] for v in a.roster()] == [self.cpr.id, self.driver.id]
+        with self.assertNumQueries(0):  # second worker reads the shared copy
+            assert [v["id"] for v in b.roster()] == [self.cpr.id, self.driver.id]
+        self.driver.full_name = "Renamed"
+        self.driver.save(update_fields=["full_name"])
+        a.invalidate(self.driver.id)     # what the signal does on worker a
+        assert b.roster()[1]["full_name"] == "Renamed"
+
+
+class FeatureStoreTransactionTests(TransactionTestCase):
+    def setUp(self):
+        self.store = get_store()
+        self.profile = _profile("cpr@example.com", ["first_aid"], [])
+
+    def tearDown(self):
+        self.store.clear()  # the flush between tests bypasses signals
+
+    def _skills(self):
+        return {v["id"]: set(v["skills"]) for v in self.store.roster()}[self.profile.id]
+
+    def test_rollback_drops_uncommitted_features(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.profile.skills = ["cooking"]
+            self.profile.save()
+            assert self._skills() == {"cooking"}  # the writer sees its own change
+            raise RuntimeError
+        assert self._skills() == {"first_aid"}
+
+    def test_savepoint_rollback_drops_uncommitted_features(self):
+        with transaction.atomic():
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.profile.skills = ["cooking"]
+                self.profile.save()
+                assert self._skills() == {"cooking"}
+                raise RuntimeError
+            assert self._skills() == {"first_aid"}
+
+    def test_commit_keeps_the_new_features(self):
+        assert self._skills() == {"first_aid"}
+        with transaction.atomic():
+            self.profile.skills = ["cooking"]
+            self.profile.save()
+        assert self._skills() == {"cooking"}
+
+    def test_released_savepoint_then_outer_rollback(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            with transaction.atomic():
+                self.profile.skills = ["cooking"]
+                self.profile.save()
+            assert self._skills() == {"cooking"}
+            raise RuntimeError
+        assert self._skills() == {"first_aid"}
+
+    def test_request_end_settles_a_rollback(self):
+        self.store.roster()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.profile.skills = ["cooking"]
+            self.profile.save()
+            self.store.roster()      # caches the uncommitted row
+            raise RuntimeError
+        request_finished.send(sender=None)
+        with transaction.atomic():   # a fresh transaction can't tell on its own
+            assert self._skills() == {"first_aid"}
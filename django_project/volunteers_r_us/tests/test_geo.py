@@ -0,0 +1,58 @@
+import random
+from django.test import SimpleTestCase
+from ..matching.geo import haversine_miles, GridIndex
+
+
+class TestGeo(SimpleTestCase):
+    def test_haversine_known_distances(self):
+        # Houston -> Austin is roughly 146 miles as the crow flies
+        d = haversine_miles(29.7604, -95.3698, 30.2672, -97.7431)
+        assert 140 < d < 150
+        assert haversine_miles(10.0, 20.0, 10.0, 20.0) == 0.0
+        # one degree of latitude is ~69 miles, not 1
+        assert 68 < haversine_miles(0, 0, 1, 0) < 70
+
+    def _brute(self, pts, lat, lng, r):
+        return {k for k, plat, plng in pts if haversine_miles(plat, plng, lat, lng) < r}
+
+    def test_grid_within_matches_brute_force(self):
+        rng = random.Random(1)
+        pts = [(i, 29.5 + rng.uniform(0, 1), -95.8 + rng.uniform(0, 1)) for i in range(2000)]
+        grid = GridIndex(pts)
+        for _ in range(50):
+            lat, lng = 29.5 + rng.uniform(0, 1), -95.8 + rng.uniform(0, 1)
+            r = rng.choice([0.5, 3, 10, 40, 500])
+            assert grid.within(lat, lng, r) == self._brute(pts, lat, lng, r)
+
+    def test_grid_dateline_and_pole(self):
+        pts = [(1, 10.0, 179.95), (2, 10.0, -179.95), (3, 89.9, 0.0), (4, 89.9, 180.0)]
+        grid = GridIndex(pts)
+        assert grid.within(10.0, 179.99, 20) == {1, 2}
+        assert grid.within(89.95, 90.0, 50) == self._brute(pts, 89.95, 90.0, 50) == {3, 4}
+
+    def test_grid_cell_size_wraps_dateline(self):
+        # 0.7 does not divide 360; the grid rounds it so columns still wrap
+        pts = [(1, 0.0, 179.9), (2, 0.0, -179.9), (3, 0.0, 170.0)]
+        grid = GridIndex(pts, cell_deg=0.7)
+        assert 360 % grid.cell_deg < 1e-9 or grid.cell_deg - 360 % grid.cell_deg < 1e-9
+        for lng in (179.95, -179.95, 180.0, -180.0):
+            assert grid.within(0.0, lng, 30) == self._brute(pts, 0.0, lng, 30) == {1, 2}
+
+    def test_non_numeric_location_is_not_compiled(self):
+        from ..matching.features import compile_volunteer
+        from ..matching.index import build_index
+        from ..matching.logic import match_volunteers
+        ok = {"id": 1, "skills": [], "location": {"lat": 29.7, "lng": -95}}
+        assert (compile_volunteer(ok).lat, compile_volunteer(ok).lng) == (29.7, -95.0)
+        for lat in ("29.7", float("nan"), float("inf"), None):
+            bad = {"id": 2, "skills": [], "location": {"lat": lat, "lng": -95}}
+            assert compile_volunteer(bad) is None
+            index = build_index([ok, bad])  # one bad record must not break the roster
+            assert [v["id"] for v, _ in index.match({})] == [1, 2]
+        # string coordinates: both paths agree that the radius check can't run
+        bad = {"id": 2, "skills": [], "location": {"lat": "29.7", "lng": -95}}
+        ev = {"max_radius_miles": 10, "location": {"lat": 29.7, "lng": -95}}
+        with self.assertRaises(TypeError):
+            match_volunteers([ok, bad], ev)
+        with self.assertRaises(TypeError):
+            build_index([ok, bad]).match(ev)
@@ -0,0 +1,157 @@
+import importlib.util
+import json
+from base64 import urlsafe_b64encode
+from datetime import date
+from io import BytesIO
+from unittest import skipUnless
+from unittest.mock import patch
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from ..models import Assignment, Event, Profile, Skill
+from ..pagination import count_up_to
+
+User = get_user_model()
+
+
+class VolunteerHistoryQueryTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create(email="staff@example.com", is_staff=True)
+        self.client.force_login(self.staff)
+        self.skills = [Skill.objects.create(name=n) for n in ("cpr", "driving")]
+        self.n = 0
+
+    def _add(self, count):
+        for _ in range(count):
+            self.n += 1
+            user = User.objects.create(email=f"v{self.n}@example.com")
+            if self.n % 2:
+                Profile.objects.create(user=user, full_name=f"Volunteer {self.n}")
+            event = Event.objects.create(name=f"E{self.n}", description="d", location="L",
+                                         urgency="low", event_date=date(2025, 11, 2))
+            event.required_skills.set(self.skills)
+            Assignment.objects.create(volunteer=user, event=event, status=Assignment.ASSIGNED)
+
+    def _queries(self, query=""):
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.get(reverse("volunteer_history") + query)
+            if r.streaming:  # exports run their queries while streaming
+                b"".join(r.streaming_content)
+        assert r.status_code == 200
+        return len(ctx.captured_queries), r
+
+    def test_query_count_does_not_grow_with_rows(self):
+        for query in ("", "?export=1", "?export_pdf=1"):
+            with self.subTest(query=query):
+                self._add(3)
+                small, _ = self._queries(query)
+                self._add(30)
+                large, _ = self._queries(query)
+                assert small == large
+
+    def test_rows_still_carry_names_and_skills(self):
+        self._add(2)
+        _, r = self._queries()
+        rows = sorted(r.context["rows"], key=lambda row: row["id"])
+        assert [row["volunteer_name"] for row in rows] == ["Volunteer 1", "v2@example.com"]
+        assert sorted(rows[0]["required_skills"]) == ["cpr", "driving"]
+
+
+class StreamingExportTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create(email="staff@example.com", is_staff=True)
+        self.client.force_login(self.staff)
+        cpr = Skill.objects.create(name="cpr")
+        for i in range(5):
+            user = User.objects.create(email=f"v{i}@example.com")
+            event = Event.objects.create(name=f"E{i}", description="d", location="L",
+                                         urgency="low", event_date=date(2025, 11, 2))
+            event.required_skills.add(cpr)
+            Assignment.objects.create(volunteer=user, event=event, status=Assignment.ASSIGNED)
+
+    def _lines(self, url):
+        r = self.client.get(url)
+        assert r.streaming and r["Content-Type"] == "text/csv"
+        return b"".join(r.streaming_content).decode().splitlines()
+
+    def test_event_csv_streams_in_chunks(self):
+        with patch("volunteers_r_us.reports.EXPORT_CHUNK_SIZE", 2):
+            lines = self._lines(reverse("event_form") + "?export=1")
+        assert len(lines) == 6 and lines[1] == "E0,d,L,cpr,low,2025-11-02"
+
+    def test_history_csv_fallback_streams(self):
+        with patch.dict("sys.modules", {"openpyxl": None}):  # force the CSV branch
+            lines = self._lines(reverse("volunteer_history") + "?export=1")
+        assert lines[0].startswith("Volunteer,Event Name") and len(lines) == 6
+        assert lines[1] == "v0@example.com,E0,d,L,cpr,low,2025-11-02,0 / 0,,Assigned"
+
+    @skipUnless(importlib.util.find_spec("openpyxl"), "openpyxl not installed")
+    def test_history_xlsx_is_write_only_with_measured_widths(self):
+        from openpyxl import load_workbook
+
+        r = self.client.get(reverse("volunteer_history") + "?export=1")
+        assert r["Content-Type"].startswith("application/vnd.openxmlformats")
+        assert 'attachment; filename="volunteer_history_' in r["Content-Disposition"]
+        ws = load_workbook(BytesIO(b"".join(r.streaming_content))).active
+        rows = list(ws.iter_rows(values_only=True))
+        assert len(rows) == 6 and rows[1][:2] == ("v0@example.com", "E0")
+        assert ws["A1"].font.bold
+        # "Capacity (current / total)" is the widest value in column H
+        assert ws.column_dimensions["H"].width == len("Capacity (current / total)") + 2
+        assert ws.column_dimensions["B"].width == 12
+
+
+class HistoryPaginationTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create(email="staff@example.com", is_staff=True)
+        self.client.force_login(self.staff)
+        # two events on the same day so the sort needs its tie-breakers
+        events = [Event.objects.create(name=f"E{d}", description="d", location="L", urgency="low",
+                                       event_date=date(2025, 11, d)) for d in (1, 2, 2)]
+        for i in range(7):
+            user = User.objects.create(email=f"v{i}@example.com")
+            Assignment.objects.create(volunteer=user, event=events[i % 3], status=Assignment.ASSIGNED)
+        self.url = reverse("volunteer_history")
+
+    def _walk(self, query, step):
+        """Follow `step` ("next_url" / "prev_url") from `query`; returns (rows, last url)."""
+        seen, url = [], query
+        while url:
+            r = self.client.get(self.url + url)
+            page = [(row["event_date_iso"], row["volunteer_id"]) for row in r.context["rows"]]
+            seen = seen + page if step == "next_url" else page + seen
+            last, url = url, r.context[step]
+        return seen, last
+
+    def test_pages_cover_every_row_once_in_order(self):
+        expected = sorted((f"2025-11-0{1 if i % 3 == 0 else 2}", f"v{i}@example.com") for i in range(7))
+        seen, last = self._walk("?page_size=3", "next_url")
+        assert seen == expected
+        assert self.client.get(self.url + last).context["count"] == 7
+        # and backwards from the last page
+        back, _ = self._walk(last, "prev_url")
+        assert back == expected
+
+    def test_sort_by_volunteer_desc_and_filters_kept(self):
+        r = self.client.get(self.url + "?sort=-volunteer&page_size=2&status=assigned")
+        assert [row["volunteer_id"] for row in r.context["rows"]] == ["v6@example.com", "v5@example.com"]
+        assert "status=assigned" in r.context["next_url"] and "sort=-volunteer" in r.context["next_url"]
+        assert "sort=volunteer&" in r.context["sort_links"]["volunteer"]
+
+    def test_count_is_capped_and_bad_cursor_is_first_page(self):
+        assert count_up_to(Assignment.objects.all(), cap=5) == (5, True)
+        assert count_up_to(Assignment.objects.all(), cap=10) == (7, False)
+        r = self.client.get(self.url + "?after=garbage&page_size=2")
+        assert r.status_code == 200 and r.context["prev_url"] is None and len(r.context["rows"]) == 2
+
+    def test_tampered_cursor_is_first_page(self):
+        for values in (["notadate", "x", 1], ["2025-11-02", "v1@example.com", "one"],
+                       [None, "v1@example.com", 1], [[1], {}, 1]):
+            token = urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+            for param in ("after", "before"):
+                r = self.client.get(self.url + f"?{param}={token}&page_size=2")
+                assert r.status_code == 200 and r.context["prev_url"] is None
+                assert [row["volunteer_id"] for row in r.context["rows"]] == ["v0@example.com", "v3@example.com"]
@@ -0,0 +1,98 @@
+import random
+from datetime import datetime, timedelta
+from django.test import SimpleTestCase
+from ..matching.logic import match_volunteers, match_many, top_matches
+from ..matching.index import VolunteerIndex
+
+SKILLS = ["cpr", "driving", "lifting", "cooking", "first_aid"]
+LANGS = ["english", "spanish", "vietnamese"]
+BASE = datetime(2025, 11, 1, 8, 0)
+
+
+def _window(rng):
+    start = BASE + timedelta(hours=rng.randrange(0, 24 * 14))
+    return {"start": start, "end": start + timedelta(hours=rng.randrange(1, 30))}
+
+
+def _roster(rng, n):
+    return [
+        {
+            "id": i, "full_name": f"V{i}",
+            "skills": set(rng.sample(SKILLS, rng.randrange(0, 4))),
+            "languages": set(rng.sample(LANGS, rng.randrange(0, 3))),
+            "availability": [_window(rng) for _ in range(rng.randrange(0, 3))],
+            "location": {"lat": 29.7 + rng.uniform(0, 0.3), "lng": -95.5 + rng.uniform(0, 0.3)},
+        }
+        for i in range(n)
+    ]
+
+
+def _event(rng):
+    return {
+        "required_skills": set(rng.sample(SKILLS, rng.randrange(0, 3))),
+        "languages": set(rng.sample(LANGS, rng.randrange(0, 2))),
+        "slots": rng.choice([0, 1, 5]),
+        "time_blocks": [_window(rng) for _ in range(rng.randrange(0, 3))],
+        "max_radius_miles": rng.choice([None, 5, 10]),
+        "location": {"lat": 29.85, "lng": -95.35},
+    }
+
+
+class TestVolunteerIndex(SimpleTestCase):
+    def test_index_ranking_matches_full_scan(self):
+        rng = random.Random(7)
+        vols = _roster(rng, 300)
+        idx = VolunteerIndex(vols)
+        for _ in range(100):
+            ev = _event(rng)
+            expected = match_volunteers(vols, ev)
+            assert idx.match(ev) == expected
+            assert match_volunteers(vols, ev, index=idx) == expected
+
+    def test_candidates_pruned_by_postings(self):
+        vols = [
+            {"id": 1, "skills": {"cpr"}, "languages": {"english"}, "availability": []},
+            {"id": 2, "skills": {"cpr", "driving"}, "languages": {"spanish"}, "availability": []},
+            {"id": 3, "skills": {"driving"}, "languages": {"english"}, "availability": []},
+        ]
+        idx = VolunteerIndex(vols)
+        ev = {"required_skills": {"cpr"}, "languages": {"english"}, "time_blocks": []}
+        assert [v["id"] for v in idx.candidates(ev)] == [1]
+        assert len(idx.candidates({"required_skills": set(), "languages": []})) == 3
+
+    def test_unparsed_availability_is_kept_as_candidate(self):
+        vols = [{"id": 1, "skills": set(), "languages": set(), "availability": ["sat_am"]}]
+        idx = VolunteerIndex(vols)
+        tb = {"start": BASE, "end": BASE + timedelta(hours=2)}
+        assert idx.candidate_ids({"time_blocks": [tb]}) == {0}
+
+    def test_match_many_matches_per_event_scan(self):
+        rng = random.Random(11)
+        vols = _roster(rng, 200)
+        events = [dict(_event(rng), id=100 + i) for i in range(40)]
+        results = match_many(vols, events)
+        assert list(results) == [e["id"] for e in events]
+        for e in events:
+            assert results[e["id"]] == match_volunteers(vols, e)
+
+    def test_match_many_falls_back_for_uncompilable_records(self):
+        vols = [{"id": 1, "skills": {"cpr"}, "languages": set(), "availability": ["sat_am"]},
+                {"id": 2, "skills": {"cpr"}, "languages": set(), "availability": []}]
+        ev = {"id": 9, "required_skills": {"cpr"}, "languages": set(), "slots": 1,
+              "time_blocks": [], "max_radius_miles": None}
+        assert match_many(vols, [ev]) == {9: match_volunteers(vols, ev)}
+
+    def test_top_matches_pages_through_full_ranking(self):
+        rng = random.Random(13)
+        vols = _roster(rng, 300)
+        for v in vols:
+            v["skills"].add("cpr")  # plenty of ties to exercise stable ordering
+        idx = VolunteerIndex(vols)
+        ev = {"required_skills": {"cpr"}, "languages": set(), "slots": 1,
+              "time_blocks": [], "max_radius_miles": None}
+        full = match_volunteers(vols, ev)
+        for limit, offset in [(20, 0), (20, 40), (7, 295), (50, 1000)]:
+            page, total = top_matches(vols, ev, limit, offset, index=idx)
+            assert total == len(full)
+            assert page == full[offset:offset + limit]
+            assert top_matches(vols, ev, limit, offset) == (page, total)
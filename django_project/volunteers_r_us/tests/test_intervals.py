@@ -0,0 +1,87 @@
+import random
+from datetime import datetime, timedelta, timezone
+from django.test import SimpleTestCase
+from ..matching.intervals import Availability, IntervalTree
+from ..matching.index import VolunteerIndex
+from ..matching.logic import matches_event
+
+T0 = datetime(2025, 11, 1)
+
+
+def _pair(rng, zero_ok=True):
+    a0 = T0 + timedelta(hours=rng.randrange(0, 500))
+    return a0, a0 + timedelta(hours=rng.randrange(0 if zero_ok else 1, 12))
+
+
+def _brute(pairs, b0, b1):
+    return any(a0 < b1 and b0 < a1 for a0, a1 in pairs)
+
+
+class TestAvailability(SimpleTestCase):
+    def test_merges_and_sorts(self):
+        h = lambda n: T0 + timedelta(hours=n)
+        av = Availability([(h(5), h(8)), (h(0), h(2)), (h(1), h(3)), (h(3), h(4))])
+        # touching windows stay separate so zero-length blocks behave as before
+        assert list(av) == [(h(0), h(3)), (h(3), h(4)), (h(5), h(8))]
+        assert av.overlaps(h(2), h(6)) and not av.overlaps(h(4), h(5))
+
+    def test_overlaps_matches_pairwise_check(self):
+        rng = random.Random(2)
+        for _ in range(300):
+            pairs = [_pair(rng) for _ in range(rng.randrange(0, 8))]
+            av = Availability(pairs)
+            b0, b1 = _pair(rng)
+            assert av.overlaps(b0, b1) == _brute(pairs, b0, b1)
+
+    def test_inverted_windows_are_dropped(self):
+        from ..matching.logic import parse_windows
+        h = lambda n: (T0 + timedelta(hours=n)).isoformat()
+        av = parse_windows([{"start": h(0), "end": h(3)}, {"start": h(4), "end": h(1)}])
+        assert list(av) == [(T0, T0 + timedelta(hours=3))]
+        assert av.overlaps(T0 + timedelta(hours=2), T0 + timedelta(hours=5))
+        rng = random.Random(3)
+        for _ in range(300):
+            pairs = [_pair(rng) for _ in range(rng.randrange(0, 8))]
+            pairs += [(a1, a0) for a0, a1 in (_pair(rng, zero_ok=False) for _ in range(rng.randrange(0, 3)))]
+            av = parse_windows([{"start": a0.isoformat(), "end": a1.isoformat()} for a0, a1 in pairs])
+            b0, b1 = _pair(rng)
+            assert av.overlaps(b0, b1) == _brute([p for p in pairs if p[0] <= p[1]], b0, b1)
+
+
+class TestIntervalTree(SimpleTestCase):
+    def test_overlapping_matches_brute_force(self):
+        rng = random.Random(4)
+        triples = [(*_pair(rng), rng.randrange(300)) for _ in range(2000)]
+        tree = IntervalTree(triples)
+        for _ in range(200):
+            b0, b1 = _pair(rng)
+            expected = {o for a0, a1, o in triples if a0 < b1 and b0 < a1}
+            assert tree.overlapping(b0, b1) == expected
+
+    def test_degenerate_identical_points(self):
+        triples = [(T0, T0, i) for i in range(50)]
+        tree = IntervalTree(triples)
+        assert tree.overlapping(T0 - timedelta(hours=1), T0 + timedelta(hours=1)) == set(range(50))
+        assert tree.overlapping(T0, T0 + timedelta(hours=1)) == set()
+
+    def test_index_free_during(self):
+        rng = random.Random(8)
+        vols = [{"id": i, "availability": [{"start": a0, "end": a1} for a0, a1 in
+                                           (_pair(rng, False) for _ in range(3))]}
+                for i in range(200)]
+        idx = VolunteerIndex(vols)
+        b0, b1 = T0 + timedelta(hours=100), T0 + timedelta(hours=104)
+        tb = {"start": b0, "end": b1}
+        expected = {i for i, v in enumerate(vols)
+                    if matches_event(v, {"time_blocks": [tb], "slots": 1})}
+        assert idx.free_during(b0, b1) == expected
+
+    def test_aware_and_naive_windows_kept_apart(self):
+        aware = T0.replace(tzinfo=timezone.utc)
+        vols = [{"id": 1, "availability": [{"start": T0, "end": T0 + timedelta(hours=2)}]},
+                {"id": 2, "availability": [{"start": aware, "end": aware + timedelta(hours=2)}]}]
+        idx = VolunteerIndex(vols)
+        tb = {"start": aware, "end": aware + timedelta(hours=1)}
+        # the naive window can't be compared, so it stays a candidate for matches_event
+        assert idx.candidate_ids({"time_blocks": [tb]}) == {0, 1}
+        assert idx.free_during(aware, aware + timedelta(hours=1)) == {1}
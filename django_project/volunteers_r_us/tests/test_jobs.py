@@ -0,0 +1,156 @@
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from notify.models import Notification
+from .. import jobs
+from ..models import Event, Job, Skill, VolunteerProfile
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.cpr = Skill.objects.create(name="First Aid / CPR")
+        vp = VolunteerProfile.objects.create(user=get_user_model().objects.create(email="v@example.com"))
+        vp.skills.add(self.cpr)
+
+    def _event(self):
+        return Event.objects.create(name="Clinic", description="d", location="City Hall",
+                                    urgency="high", event_date=date(2025, 11, 2))
+
+    def test_signals_enqueue_one_job_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ev = self._event()
+            ev.required_skills.add(self.cpr)
+            ev.required_skills.remove(self.cpr)
+            ev.required_skills.add(self.cpr)
+        assert list(Job.objects.values_list("key", "state")) == [(f"notify_event:{ev.pk}", Job.PENDING)]
+        assert not Notification.objects.exists()  # nothing ran inside the request
+
+    def test_signals_in_one_transaction_coalesce(self):
+        jobs.coalesce_stats(reset=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            ev = self._event()                          # post_save
+            drive = Skill.objects.create(name="Driving / Transport")
+            ev.required_skills.add(self.cpr)            # post_add
+            ev.required_skills.set([drive])             # post_remove + post_add
+            drive.events.add(self._event())             # reverse side, second event
+        assert Job.objects.count() == 2
+        stats = jobs.coalesce_stats()
+        assert stats["requested"] == 6 and stats["enqueued"] == 2
+        assert stats["coalesced"] == 4 and stats["saved"] == 4  # no INSERT attempted for them
+
+    def test_rolled_back_savepoint_drops_its_batch(self):
+        from django.db import transaction
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self._event()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            ev = self._event()
+        assert list(Job.objects.values_list("key", flat=True)) == [f"notify_event:{ev.pk}"]
+
+    def test_keys_from_a_rolled_back_savepoint_are_dropped(self):
+        from django.db import transaction
+        with self.captureOnCommitCallbacks(execute=True):
+            jobs.enqueue_on_commit("notify_event", "k:a", event_id=1)
+            try:
+                with transaction.atomic():
+                    jobs.enqueue_on_commit("notify_event", "k:b", event_id=2)
+                    jobs.enqueue_on_commit("notify_event", "k:a", event_id=1)  # coalesced
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            with transaction.atomic():
+                jobs.enqueue_on_commit("notify_event", "k:c", event_id=3)  # savepoint released
+            jobs.enqueue_on_commit("notify_event", "k:c", event_id=3)
+        assert sorted(Job.objects.values_list("key", flat=True)) == ["k:a", "k:c"]
+
+    def test_key_rerequested_after_savepoint_rollback_is_kept(self):
+        from django.db import transaction
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    jobs.enqueue_on_commit("notify_event", "k:b", event_id=2)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            jobs.enqueue_on_commit("notify_event", "k:b", event_id=2)
+        assert list(Job.objects.values_list("key", flat=True)) == ["k:b"]
+
+    def test_nothing_enqueued_before_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self._event().required_skills.add(self.cpr)
+        assert callbacks and not Job.objects.exists()
+
+    def test_worker_runs_fanout(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ev = self._event()
+            ev.required_skills.add(self.cpr)
+        call_command("run_jobs", "--once", stdout=StringIO())
+        assert Job.objects.get().state == Job.DONE
+        assert Notification.objects.filter(title="New event: Clinic").count() == 1
+        # a later change queues a fresh job even though the old one is done
+        assert jobs.enqueue("notify_event", f"notify_event:{ev.pk}", event_id=ev.pk)
+
+    def test_failures_back_off_then_fail(self):
+        calls = []
+
+        @jobs.handler("test_boom")
+        def boom():
+            calls.append(1)
+            raise RuntimeError("smtp down")
+
+        self.addCleanup(jobs.HANDLERS.pop, "test_boom")
+        jobs.enqueue("test_boom", "boom")
+        with self.settings(JOB_MAX_ATTEMPTS=2):
+            assert jobs.run_pending() == 1
+            job = Job.objects.get()
+            assert job.state == Job.PENDING and job.run_after > timezone.now()
+            assert "smtp down" in job.last_error
+            assert jobs.run_pending() == 0  # not due yet
+            Job.objects.update(run_after=timezone.now())
+            with self.assertLogs("volunteers_r_us.jobs", "ERROR"):
+                jobs.run_pending()
+        assert Job.objects.get().state == Job.FAILED and len(calls) == 2
+
+    def test_stale_running_jobs_are_requeued(self):
+        jobs.enqueue("notify_event", "notify_event:0", event_id=0)
+        Job.objects.update(state=Job.RUNNING, locked_at=timezone.now() - timedelta(hours=1))
+        assert jobs.run_pending() == 1
+        assert Job.objects.get().state == Job.DONE
+
+
+class EnqueueTransactionTests(TransactionTestCase):
+    def test_key_requested_again_after_a_rollback_is_kept(self):
+        from django.db import transaction
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            jobs.enqueue_on_commit("notify_event", "k:a", event_id=1)
+            raise RuntimeError
+        with transaction.atomic():  # straight into the next transaction
+            jobs.enqueue_on_commit("notify_event", "k:a", event_id=1)
+        with transaction.atomic():
+            jobs.enqueue_on_commit("notify_event", "k:b", event_id=2)
+            jobs.enqueue_on_commit("notify_event", "k:b", event_id=2)
+        assert sorted(Job.objects.values_list("key", flat=True)) == ["k:a", "k:b"]
+
+
+class OutboxJobTests(TransactionTestCase):
+    def test_sent_marks_survive_a_later_handler_failure(self):
+        from notify.models import OutboxEmail
+        from notify.outbox import queue_emails
+        queue_emails([("Hi", "body", ["a@example.com"]), ("Hi", "body", ["b@example.com"])])
+        jobs.enqueue("send_outbox", "send_outbox")
+        # the messages go out, then closing the connection blows up
+        with mock.patch.object(EmailBackend, "close", side_effect=OSError("connection reset")):
+            assert jobs.run_pending() == 1
+        assert Job.objects.get().state == Job.PENDING  # retried later
+        assert set(OutboxEmail.objects.values_list("state", flat=True)) == {OutboxEmail.SENT}
+        assert len(mail.outbox) == 2
@@ -1,7 +1,25 @@
 import json
+from datetime import date
 from django.test import TestCase, RequestFactory
+from django.contrib.auth import get_user_model
 from ..matching import views
-from ..matching.data import EVENTS
+from ..models import Event, Profile, Skill
+
+
+def _profile(email, skills, availability):
+    user = get_user_model().objects.create(email=email)
+    return Profile.objects.create(
+        user=user, full_name=email.split("@")[0], address1="1 Main St", city="Houston",
+        state="TX", zipcode="77001", skills=skills, availability=availability,
+    )
+
+
+def _event(name, day, *skill_labels):
+    e = Event.objects.create(name=name, description="d", location="City Hall",
+                             urgency="high", event_date=day)
+    for label in skill_labels:
+        e.required_skills.add(Skill.objects.get_or_create(name=label)[0])
+    return e
 
 class TestMatchAPI(TestCase):
     def setUp(self):
@@ -12,14 +30,20 @@ class TestMatchAPI(TestCase):
         r = views.match_api(req)
         assert r.status_code == 400
 
+    def test_non_object_json(self):
+        for body in ("[]", "3", '"x"', "null"):
+            req = self.rf.post("/matching/match/", data=body, content_type="application/json")
+            assert views.match_api(req).status_code == 400
+            req = self.rf.post("/matching/match/batch/", data=body, content_type="application/json")
+            assert views.match_batch_api(req).status_code == 400
+
     def test_unknown_event_id(self):
         req = self.rf.post("/matching/match/", data=json.dumps({"event_id": 999999}), content_type="application/json")
         r = views.match_api(req)
         assert r.status_code == 400
 
     def test_existing_event_id(self):
-        e0 = EVENTS[0]
-        eid = e0["id"] if isinstance(e0, dict) else e0.id
+        eid = _event("Clinic", date(2025, 11, 2), "First Aid / CPR").id
         req = self.rf.post("/matching/match/", data=json.dumps({"event_id": eid}), content_type="application/json")
         r = views.match_api(req)
         assert r.status_code == 200
@@ -35,3 +59,83 @@ class TestMatchAPI(TestCase):
         req = self.rf.post("/matching/match/", data=json.dumps(payload), content_type="application/json")
         r = views.match_api(req)
         assert r.status_code == 200
+
+
+class TestMatchBatchAPI(TestCase):
+    def setUp(self):
+        self.rf = RequestFactory()
+        d = date(2025, 11, 2)
+        self.a = _profile("a@example.com", ["first_aid"], [d.isoformat()])
+        self.b = _profile("b@example.com", ["driving"], [d.isoformat()])
+        self.clinic = _event("Clinic", d, "First Aid / CPR")
+        self.pantry = _event("Pantry", d, "Driving / Transport")
+
+    def _post(self, payload):
+        req = self.rf.post("/api/match/batch/", data=json.dumps(payload), content_type="application/json")
+        r = views.match_batch_api(req)
+        body = b"".join(r.streaming_content) if r.streaming else r.content
+        return r, body
+
+    def test_batch_results_keyed_by_event_id(self):
+        r, body = self._post({"event_ids": [self.clinic.id, self.pantry.id]})
+        assert r.status_code == 200
+        results = json.loads(body)["results"]
+        assert [m["volunteer"]["id"] for m in results[str(self.clinic.id)]["matches"]] == [self.a.id]
+        assert [m["volunteer"]["id"] for m in results[str(self.pantry.id)]["matches"]] == [self.b.id]
+
+    def test_batch_defaults_to_all_events(self):
+        r, body = self._post({})
+        assert set(json.loads(body)["results"]) == {str(self.clinic.id), str(self.pantry.id)}
+
+    def test_batch_unknown_event_ids(self):
+        r, body = self._post({"event_ids": [self.clinic.id, 999]})
+        assert r.status_code == 400
+        assert json.loads(body)["unknown_event_ids"] == [999]
+
+    def test_batch_bad_json(self):
+        req = self.rf.post("/api/match/batch/", data="{bad", content_type="application/json")
+        assert views.match_batch_api(req).status_code == 400
+
+    def test_batch_is_paged_per_event(self):
+        r, body = self._post({"event_ids": [self.clinic.id], "limit": 1, "offset": 1})
+        res = json.loads(body)["results"][str(self.clinic.id)]
+        assert res["total"] == 1 and res["matches"] == [] and res["next_offset"] is None
+
+    def test_query_count_is_constant(self):
+        for i in range(10):
+            _profile(f"extra{i}@example.com", ["first_aid"], ["2025-11-02"])
+        self._post({})  # warms the feature store (profiles + VolunteerProfile skills)
+        with self.assertNumQueries(2):  # events, prefetched skills
+            self._post({})
+
+
+class TestMatchAPIPaging(TestCase):
+    def setUp(self):
+        self.rf = RequestFactory()
+        d = date(2025, 11, 2)
+        for i in range(30):
+            _profile(f"v{i}@example.com", ["first_aid"], [d.isoformat()])
+        self.event = _event("Clinic", d, "First Aid / CPR")
+
+    def _post(self, payload, qs=""):
+        payload = dict(payload, event_id=self.event.id)
+        req = self.rf.post("/api/match/" + qs, data=json.dumps(payload), content_type="application/json")
+        return views.match_api(req)
+
+    def test_limit_offset_and_total(self):
+        r = self._post({"limit": 5, "offset": 10})
+        assert r.status_code == 200
+        data = json.loads(r.content)
+        assert data["total"] == 30 and len(data["matches"]) == 5
+        assert data["next_offset"] == 15
+
+    def test_query_string_paging_and_default_limit(self):
+        data = json.loads(self._post({}, "?limit=25&offset=25").content)
+        assert len(data["matches"]) == 5 and data["next_offset"] is None
+        data = json.loads(self._post({}).content)
+        assert data["limit"] == views.DEFAULT_MATCH_LIMIT and len(data["matches"]) == 30
+
+    def test_bad_paging_params(self):
+        assert self._post({"limit": 0}).status_code == 400
+        assert self._post({"offset": -1}).status_code == 400
+        assert self._post({"limit": "abc"}).status_code == 400
@@ -8,6 +8,7 @@ from django.core import mail
 
 from volunteers_r_us.models import VolunteerProfile, Assignment, Event, Skill
 from notify.models import Notification
+from notify.outbox import send_pending
 
 
 class MatchingFlowTests(TestCase):
@@ -81,7 +82,9 @@ class MatchingFlowTests(TestCase):
         note = Notification.objects.filter(user=self.vol).latest("id")
         self.assertIn(self.event.name, note.title)
 
-        # Email sent (locmem backend in tests)
+        # Email queued in the outbox, delivered by the sender (locmem backend in tests)
+        self.assertEqual(len(mail.outbox), 0)
+        send_pending()
         self.assertEqual(len(mail.outbox), 1)
         self.assertIn(self.event.name, mail.outbox[0].subject)
         self.assertIn("vol@example.com", mail.outbox[0].to)
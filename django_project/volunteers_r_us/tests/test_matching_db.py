@@ -0,0 +1,46 @@
+from datetime import date
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from volunteers_r_us.matching.db import load_volunteers, load_events, skill_code
+from volunteers_r_us.matching.logic import match_volunteers
+from volunteers_r_us.tests.test_match_api import _profile, _event
+
+User = get_user_model()
+
+
+class MatchingDbEngineTests(TestCase):
+    def setUp(self):
+        self.day = date(2025, 11, 2)
+        self.cpr = _profile("cpr@example.com", ["first_aid", "driving"], [self.day.isoformat()])
+        self.busy = _profile("busy@example.com", ["first_aid"], ["2025-12-01", "not-a-date"])
+        self.driver = _profile("drive@example.com", ["driving"], [self.day.isoformat()])
+        self.event = _event("Clinic Day", self.day, "First Aid / CPR")
+
+    def test_loaders_use_constant_queries(self):
+        for i in range(15):
+            _profile(f"x{i}@example.com", ["cooking"], [])
+        with self.assertNumQueries(2):
+            vols = load_volunteers()
+        with self.assertNumQueries(2):
+            events = load_events()
+        assert len(vols) == 18 and len(events) == 1
+
+    def test_event_skills_mapped_to_profile_codes(self):
+        ev = load_events()[0]
+        assert ev["required_skills"] == {"first_aid"}
+        assert skill_code("unknown label") == "unknown label"
+
+    def test_match_uses_skills_and_available_dates(self):
+        ranked = match_volunteers(load_volunteers(), load_events()[0])
+        assert [v["id"] for v, _ in ranked] == [self.cpr.id]
+
+    def test_staff_matching_page_suggests_ranked_volunteers(self):
+        staff = User.objects.create_user(email="staff@example.com", password="pass12345", is_staff=True)
+        self.client.force_login(staff)
+        r = self.client.get(reverse("match_volunteer"), {"event_id": self.event.id})
+        assert r.status_code == 200
+        assert [s["id"] for s in r.context["suggested"]] == [self.cpr.id]
+        assert r.context["suggested_total"] == 1
+        self.assertContains(r, "Suggested Volunteers")
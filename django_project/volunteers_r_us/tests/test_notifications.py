@@ -0,0 +1,45 @@
+from datetime import date
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from notify.models import Notification
+from ..matching.notifications import notify_candidates_for_event
+from ..models import Event, Skill, VolunteerProfile
+
+
+class NotifyFanOutTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.cpr = Skill.objects.create(name="First Aid / CPR")
+        self.drive = Skill.objects.create(name="Driving / Transport")
+        self.both = []
+        for i in range(7):
+            vp = VolunteerProfile.objects.create(user=User.objects.create(email=f"v{i}@example.com"))
+            vp.skills.add(self.cpr, *([self.drive] if i % 2 == 0 else []))
+            if i % 2 == 0:
+                self.both.append(vp.user_id)
+        self.event = Event.objects.create(name="Clinic", description="d", location="City Hall",
+                                          urgency="high", event_date=date(2025, 11, 2))
+        # set skills without the m2m signal doing the fan-out for us
+        through = Event.required_skills.through
+        through.objects.bulk_create([through(event_id=self.event.pk, skill_id=s.pk)
+                                     for s in (self.cpr, self.drive)])
+
+    def test_only_volunteers_with_every_skill(self):
+        assert notify_candidates_for_event(self.event) == len(self.both)
+        assert sorted(Notification.objects.values_list("user_id", flat=True)) == sorted(self.both)
+
+    def test_batches_and_constant_queries(self):
+        # required skills, candidates, then per batch of 2: dedup lookup, INSERT,
+        # counter UPDATE + lookup, and seeding (COUNT, INSERT) for new counters
+        with self.assertNumQueries(2 + 2 * 6) as ctx:
+            assert notify_candidates_for_event(self.event, batch_size=2) == 4
+        dedup = [q["sql"] for q in ctx.captured_queries
+                 if q["sql"].startswith("SELECT") and '"notify_notification"."title" =' in q["sql"]]
+        assert len(dedup) == 2 and all('"user_id" IN' in sql for sql in dedup)
+
+    def test_rerun_skips_existing(self):
+        Notification.objects.create(user_id=self.both[0], title="New event: Clinic",
+                                    body=f"City Hall on {self.event.event_date}", url="/volunteers_r_us/events/")
+        assert notify_candidates_for_event(self.event) == len(self.both) - 1
+        assert notify_candidates_for_event(self.event) == 0
@@ -0,0 +1,149 @@
+import itertools
+import random
+from unittest import mock
+from datetime import date, datetime, timedelta
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from ..matching.logic import matches_event, score
+from ..matching.optimizer import (
+    conflict_cliques, overlapping_events, solve_assignment, assign_upcoming,
+)
+from ..models import Assignment
+from .test_match_api import _profile, _event
+
+DAY = datetime(2025, 11, 2, 9, 0)
+
+
+def _block(hours_from, length=2):
+    start = DAY + timedelta(hours=hours_from)
+    return {"start": start, "end": start + timedelta(hours=length)}
+
+
+def _ev(eid, skills=(), slots=1, blocks=()):
+    return {"id": eid, "required_skills": set(skills), "slots": slots, "time_blocks": list(blocks)}
+
+
+def _vol(vid, skills, avail=(_block(0, 24),)):
+    return {"id": vid, "skills": set(skills), "availability": list(avail)}
+
+
+def _brute_force(volunteers, events):
+    """(filled, total score) of the best assignment, by enumeration."""
+    overlaps = overlapping_events(events)
+    options = []
+    for e in events:
+        elig = [v["id"] for v in volunteers if matches_event(v, e)]
+        opts = [()]
+        for k in range(1, min(e["slots"], len(elig)) + 1):
+            opts += list(itertools.combinations(elig, k))
+        options.append(opts)
+    scores = {(v["id"], e["id"]): score(v, e) for v in volunteers for e in events}
+    best = (0, 0.0)
+    for combo in itertools.product(*options):
+        booked = [(vid, i) for i, chosen in enumerate(combo) for vid in chosen]
+        if any(a == b and j in overlaps[i] for a, i in booked for b, j in booked):
+            continue
+        filled = sum(len(c) for c in combo)
+        total = sum(scores[(vid, events[i]["id"])] for i, c in enumerate(combo) for vid in c)
+        best = max(best, (filled, total))
+    return best
+
+
+class SolverTests(SimpleTestCase):
+    def test_overlaps_and_cliques(self):
+        evs = [_ev(1, blocks=[_block(0)]), _ev(2, blocks=[_block(1)]),
+               _ev(3, blocks=[_block(2.5)]), _ev(4, blocks=[_block(10)]), _ev(5)]
+        assert overlapping_events(evs) == [{1}, {0, 2}, {1}, set(), set()]
+        c = conflict_cliques(evs)
+        assert c[0] == c[1] and len({c[1], c[2], c[3], c[4]}) == 4
+
+    def test_chained_events_share_a_volunteer(self):
+        # A overlaps B and B overlaps C, but A and C don't: one volunteer covers both
+        evs = [_ev(1, {"cpr"}, blocks=[_block(0)]), _ev(2, {"driving"}, blocks=[_block(1)]),
+               _ev(3, {"cpr"}, blocks=[_block(2.5)])]
+        got = {(p.volunteer["id"], p.event["id"]) for p in solve_assignment([_vol(1, {"cpr"})], evs)}
+        assert got == {(1, 1), (1, 3)}
+
+    def test_popular_volunteer_not_double_booked(self):
+        star = _vol(1, {"cpr", "driving"})
+        other = _vol(2, {"driving"})
+        evs = [_ev(10, {"cpr"}, blocks=[_block(0)]), _ev(11, {"driving"}, blocks=[_block(1)])]
+        got = {(p.volunteer["id"], p.event["id"]) for p in solve_assignment([star, other], evs)}
+        assert got == {(1, 10), (2, 11)}
+
+    def test_slots_are_filled_and_respected(self):
+        vols = [_vol(i, {"cpr"}) for i in range(5)]
+        got = solve_assignment(vols, [_ev(1, {"cpr"}, slots=3, blocks=[_block(0)])])
+        assert len(got) == 3 and len({p.volunteer["id"] for p in got}) == 3
+
+    def test_held_seats_count(self):
+        vols = [_vol(i, {"cpr"}) for i in range(3)]
+        evs = [_ev(1, {"cpr"}, slots=2, blocks=[_block(0)]), _ev(2, {"cpr"}, blocks=[_block(1)])]
+        got = solve_assignment(vols, evs, held={(0, 1)}, skip={(1, 1)})
+        pairs = {(p.volunteer["id"], p.event["id"]) for p in got}
+        assert pairs == {(2, 1), (1, 2)}
+
+    def test_optimal_against_brute_force(self):
+        rng = random.Random(3)
+        skills = ["cpr", "driving", "cooking"]
+        for _ in range(25):
+            vols = [_vol(i, set(rng.sample(skills, rng.randrange(0, 3))),
+                         [_block(rng.randrange(0, 6), rng.randrange(1, 6))]) for i in range(5)]
+            evs = [_ev(100 + j, set(rng.sample(skills, rng.randrange(0, 2))), rng.randrange(1, 3),
+                       [_block(rng.randrange(0, 8), rng.choice([1, 2, 3]))]) for j in range(4)]
+            got = solve_assignment(vols, evs)
+            filled, total = _brute_force(vols, evs)
+            assert len(got) == filled and abs(sum(p.score for p in got) - total) < 1e-9
+
+
+class AssignUpcomingTests(TestCase):
+    def setUp(self):
+        self.day = date.today() + timedelta(days=3)
+        self.star = _profile("star@example.com", ["first_aid", "driving"], [self.day.isoformat()])
+        self.driver = _profile("drive@example.com", ["driving"], [self.day.isoformat()])
+        self.clinic = _event("Clinic", self.day, "First Aid / CPR")
+        self.pantry = _event("Pantry", self.day, "Driving / Transport")
+        self.past = _event("Old", date.today() - timedelta(days=3), "Driving / Transport")
+
+    def test_writes_one_assignment_per_slot(self):
+        plan = assign_upcoming()
+        rows = set(Assignment.objects.values_list("volunteer_id", "event_id"))
+        assert rows == {(self.star.user_id, self.clinic.id), (self.driver.user_id, self.pantry.id)}
+        assert len(plan) == 2
+        assert assign_upcoming() == []  # every slot is now held
+
+    def test_assigned_volunteers_are_notified(self):
+        from notify.models import Notification, OutboxEmail
+        with self.captureOnCommitCallbacks() as callbacks:
+            assign_upcoming()
+        got = set(Notification.objects.values_list("user_id", "title"))
+        assert got == {(self.star.user_id, "Matched: Clinic"), (self.driver.user_id, "Matched: Pantry")}
+        assert sorted(OutboxEmail.objects.values_list("to", flat=True)) == \
+            [["drive@example.com"], ["star@example.com"]]
+        assert callbacks  # send_outbox queued for after the commit
+        assert Assignment.objects.filter(notify=True).count() == 2
+
+    def test_concurrent_manual_assignment_is_kept(self):
+        from ..matching import optimizer
+        real = optimizer.plan_upcoming
+
+        def plan_then_coordinator_assigns(today=None):
+            plan = real(today)
+            Assignment.objects.create(volunteer_id=self.star.user_id, event_id=self.clinic.id,
+                                      status=Assignment.ASSIGNED, match_reason="manual")
+            return plan
+
+        with mock.patch.object(optimizer, "plan_upcoming", plan_then_coordinator_assigns):
+            plan = assign_upcoming()
+        assert [(p.volunteer["id"], p.event["id"]) for p in plan] == [(self.driver.id, self.pantry.id)]
+        assert Assignment.objects.get(event=self.clinic).match_reason == "manual"
+        assert Assignment.objects.count() == 2
+
+    def test_staff_view(self):
+        staff = get_user_model().objects.create(email="staff@example.com", is_staff=True)
+        self.client.force_login(staff)
+        r = self.client.post(reverse("auto_assign"), follow=True)
+        assert [str(m) for m in r.context["messages"]] == ["Auto-assigned 2 volunteer(s) across 2 event(s)."]
+        assert Assignment.objects.filter(created_by=staff).count() == 2
@@ -0,0 +1,83 @@
+import random
+from datetime import date
+from django.test import SimpleTestCase, TestCase, override_settings
+from ..matching import parallel
+from ..matching.db import events_by_id
+from ..matching.logic import match_volunteers, top_matches
+from ..matching.store import get_store
+from .test_index import _roster, _event
+from .test_match_api import _profile, _event as _db_event
+
+
+@override_settings(MATCHING_PARALLEL_THRESHOLD=10, MATCHING_WORKERS=2)
+class ShardedMatchingTests(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        parallel.shutdown()
+        super().tearDownClass()
+
+    def _serial(self, fn, *args, **kw):
+        with self.settings(MATCHING_PARALLEL_THRESHOLD=None):
+            return fn(*args, **kw)
+
+    def test_sharded_ranking_matches_serial(self):
+        rng = random.Random(9)
+        roster = _roster(rng, 300)
+        for _ in range(15):
+            ev = _event(rng)
+            assert parallel.should_shard(roster)
+            assert match_volunteers(roster, ev) == self._serial(match_volunteers, roster, ev)
+            for limit, offset in [(5, 0), (7, 3), (None, 2)]:
+                got = top_matches(roster, ev, limit, offset)
+                assert got == self._serial(top_matches, roster, ev, limit, offset)
+
+    def test_results_are_the_callers_objects(self):
+        roster = [{"id": i, "skills": {"cpr"}} for i in range(20)]
+        page, total = top_matches(roster, {"required_skills": {"cpr"}}, limit=3)
+        assert total == 20 and all(v is roster[i] for i, (v, _) in enumerate(page))
+
+    def test_spill_file_reused_for_same_version(self):
+        roster = _roster(random.Random(1), 50)
+        match_volunteers(roster, {}, version=1)
+        path = parallel._roster.path
+        match_volunteers(list(roster), {"required_skills": {"cpr"}}, version=1)
+        assert parallel._roster.path == path
+        # same list and length, edited in place: a new version rebuilds
+        roster[0] = {"id": 0, "skills": {"cpr"}}
+        assert match_volunteers(roster, {"required_skills": {"cpr"}}, version=2)[0][0] is roster[0]
+        assert parallel._roster.path != path
+
+    def test_unversioned_roster_is_rebuilt(self):
+        roster = [{"id": i, "skills": set()} for i in range(20)]
+        assert match_volunteers(roster, {"required_skills": {"cpr"}}) == []
+        roster[3] = {"id": 3, "skills": {"cpr"}}
+        assert [v["id"] for v, _ in match_volunteers(roster, {"required_skills": {"cpr"}})] == [3]
+
+    def test_below_threshold_stays_in_process(self):
+        assert not parallel.should_shard([{}] * 9)
+        with self.settings(MATCHING_WORKERS=1):
+            assert not parallel.should_shard([{}] * 100)
+
+
+@override_settings(MATCHING_PARALLEL_THRESHOLD=3, MATCHING_WORKERS=2)
+class StoreShardingTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        parallel.shutdown()
+        super().tearDownClass()
+
+    def test_store_shards_large_rosters_and_tracks_edits(self):
+        day = date(2025, 11, 2)
+        people = [_profile(f"v{i}@example.com", ["driving"], [day.isoformat()]) for i in range(4)]
+        ev = _db_event("Clinic", day, "First Aid / CPR")
+        ev = events_by_id([ev.id])[ev.id]
+        store = get_store()
+        assert store.top_matches(ev) == ([], 0)
+        path = parallel._roster.path
+        assert store.top_matches(ev) == ([], 0) and parallel._roster.path == path
+        people[2].skills = ["first_aid"]
+        people[2].save()
+        page, total = store.top_matches(ev)
+        assert total == 1 and page[0][0]["id"] == people[2].id
+        with self.settings(MATCHING_PARALLEL_THRESHOLD=None):
+            assert store.top_matches(ev) == (page, total)
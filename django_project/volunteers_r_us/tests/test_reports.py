@@ -0,0 +1,152 @@
+import shutil
+import tempfile
+from datetime import date
+from unittest.mock import patch
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from notify.models import Notification
+from ..jobs import run_pending
+from ..reports import request_report
+from ..models import Assignment, Event, Job, Report
+
+User = get_user_model()
+
+
+class ReportJobTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.staff = User.objects.create(email="staff@example.com", is_staff=True)
+        self.client.force_login(self.staff)
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                user = User.objects.create(email=f"v{i}@example.com")
+                event = Event.objects.create(name=f"E{i}", description="d", location="L",
+                                             urgency="low", event_date=date(2025, 11, 2))
+                Assignment.objects.create(volunteer=user, event=event, status=Assignment.ASSIGNED)
+
+    def _submit(self, json=False, **data):
+        data = {"kind": "history", "format": "csv", **data}
+        headers = {"Accept": "application/json"} if json else {}
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse("report_create"), data, headers=headers)
+
+    def _download(self, report):
+        r = self.client.get(reverse("report_download", args=[report.pk]))
+        return b"".join(r.streaming_content).decode()
+
+    def test_submit_queues_job_and_worker_renders_file(self):
+        r = self._submit(status=Assignment.ASSIGNED, next="/volunteers_r_us/volunteer_history/")
+        assert r.status_code == 302 and r["Location"] == "/volunteers_r_us/volunteer_history/"
+        report = Report.objects.get()
+        assert report.state == Report.PENDING and report.filters == {"status": "assigned"}
+        assert Job.objects.filter(kind="render_report", state=Job.PENDING).count() == 1
+
+        run_pending()
+        report.refresh_from_db()
+        assert report.state == Report.READY and report.rows == 3
+        lines = self._download(report).splitlines()
+        assert lines[0].startswith("Volunteer,Event Name") and len(lines) == 4
+        n = Notification.objects.get(user=self.staff)
+        assert n.title == "Report ready: Volunteer history (CSV)"
+        assert n.url == reverse("report_download", args=[report.pk])
+
+    def test_same_filters_reuse_the_cached_file(self):
+        self._submit(volunteer=" v1@example.com ")
+        run_pending()
+        r = self._submit(volunteer="v1@example.com")
+        report = Report.objects.get()
+        assert r.status_code == 302 and r["Location"] == reverse("report_download", args=[report.pk])
+        assert not Job.objects.filter(state=Job.PENDING).exists()
+        with override_settings(REPORT_CACHE_SECONDS=0):
+            self._submit(volunteer="v1@example.com")
+        assert Report.objects.count() == 2
+
+    def test_superseded_report_links_follow_the_new_file(self):
+        self._submit()
+        run_pending()
+        first = Report.objects.get()
+        with override_settings(REPORT_CACHE_SECONDS=0):
+            self._submit()
+        run_pending()
+        latest = Report.objects.get()  # the first render was pruned
+        assert latest.pk != first.pk
+        urls = set(Notification.objects.filter(user=self.staff).values_list("url", flat=True))
+        assert urls == {reverse("report_download", args=[latest.pk])}
+        assert len(self._download(latest).splitlines()) == 4
+
+    def test_json_polling_and_shared_pending_report(self):
+        other = User.objects.create(email="staff2@example.com", is_staff=True)
+        r = self._submit(json=True, kind="events", format="pdf")
+        assert r.status_code == 202 and r.json()["state"] == "pending"
+        self.client.force_login(other)
+        assert self._submit(json=True, kind="events", format="pdf").json()["id"] == r.json()["id"]
+
+        run_pending()
+        status = self.client.get(r.json()["status_url"]).json()
+        assert status["state"] == "ready" and status["rows"] == 3
+        resp = self.client.get(status["download_url"])
+        assert resp["Content-Type"] == "application/pdf"
+        assert b"".join(resp.streaming_content).startswith(b"%PDF")
+        assert sorted(Notification.objects.values_list("user__email", flat=True)) == \
+            ["staff2@example.com", "staff@example.com"]
+
+    def test_render_failure_is_recorded_and_reported(self):
+        self._submit(format="pdf")
+        with patch("volunteers_r_us.reports.write_pdf_table", side_effect=RuntimeError("boom")):
+            run_pending()
+        report = Report.objects.get()
+        assert report.state == Report.FAILED and report.error == "RuntimeError: boom"
+        assert Notification.objects.get().title.startswith("Report failed")
+        assert self.client.get(reverse("report_download", args=[report.pk])).status_code == 404
+
+    def test_one_active_render_per_key(self):
+        # a concurrent click created the report after our lookup missed it
+        with self.captureOnCommitCallbacks(execute=True):
+            other, _ = request_report("history", "csv", {}, self.staff)
+        real_first, calls = QuerySet.first, []
+
+        def first(qs):
+            calls.append(1)
+            return None if len(calls) == 1 else real_first(qs)
+
+        with patch.object(QuerySet, "first", autospec=True, side_effect=first):
+            report, cached = request_report("history", "csv", {}, self.staff)
+        assert report == other and not cached and Report.objects.count() == 1
+        assert Job.objects.filter(kind="render_report").count() == 1
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Report.objects.create(kind="history", format="csv", key=report.key, state=Report.RUNNING)
+
+    def test_validation_and_staff_only(self):
+        assert self._submit(kind="nope").status_code == 400
+        self.client.force_login(User.objects.create(email="vol@example.com"))
+        assert self._submit().status_code == 302 and not Report.objects.exists()
+
+
+class ReportRenderTransactionTests(TransactionTestCase):
+    def test_render_runs_outside_a_transaction(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        staff = User.objects.create(email="staff@example.com", is_staff=True)
+        seen = []
+
+        def write_csv(out, headers, rows):
+            seen.append(transaction.get_connection().in_atomic_block)
+            seen.append(Report.objects.get().state)
+            return 0
+
+        with override_settings(MEDIA_ROOT=media), \
+                patch("volunteers_r_us.reports.write_csv", side_effect=write_csv):
+            request_report("history", "csv", {}, staff)
+            run_pending()
+        assert seen == [False, Report.RUNNING]
+        assert Report.objects.get().state == Report.READY
+        assert Notification.objects.filter(user=staff).count() == 1
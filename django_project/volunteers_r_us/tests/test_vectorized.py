@@ -0,0 +1,48 @@
+import random
+from unittest import skipUnless
+from django.test import SimpleTestCase
+from ..matching.logic import matches_event, score, match_volunteers, match_many
+from ..matching.index import build_index, VolunteerIndex
+from ..matching.vectorized import HAS_NUMPY, VectorIndex
+from .test_index import _roster, _event
+
+
+@skipUnless(HAS_NUMPY, "numpy not installed")
+class TestVectorEngineParity(SimpleTestCase):
+    def test_eligibility_and_score_match_logic(self):
+        rng = random.Random(3)
+        vols = _roster(rng, 400)
+        vi = VectorIndex(vols)
+        for _ in range(150):
+            ev = _event(rng)
+            expected = [(v["id"], score(v, ev)) for v in vols if matches_event(v, ev)]
+            got = [(vols[i]["id"], s) for i, s in vi._eligible(ev)]
+            assert got == expected
+            assert vi.match(ev) == match_volunteers(vols, ev)
+
+    def test_match_many_engine_switch(self):
+        rng = random.Random(5)
+        vols = _roster(rng, 150)
+        events = [dict(_event(rng), id=i) for i in range(30)]
+        assert match_many(vols, events, engine="numpy") == match_many(vols, events, engine="python")
+
+    def test_unknown_skill_and_uncompilable_volunteer(self):
+        vols = [
+            {"id": 1, "skills": {"cpr"}, "languages": {"english"}, "availability": ["sat_am"]},
+            {"id": 2, "skills": {"cpr"}, "languages": {"english"}, "availability": []},
+        ]
+        vi = VectorIndex(vols)
+        assert vi.fallback == [0]
+        ev = {"required_skills": {"cpr"}, "languages": {"english"}, "slots": 1,
+              "time_blocks": [], "max_radius_miles": None}
+        assert vi.match(ev) == match_volunteers(vols, ev)
+        assert vi.match(dict(ev, required_skills={"welding"})) == []
+
+
+class TestBuildIndex(SimpleTestCase):
+    def test_engine_selection(self):
+        assert isinstance(build_index([], "python"), VolunteerIndex)
+        if HAS_NUMPY:
+            assert isinstance(build_index([], "numpy"), VectorIndex)
+        with self.assertRaises(ValueError):
+            build_index([], "gpu")
@@ -229,7 +229,7 @@ class EventFormExportTests(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertTrue(resp["Content-Type"].startswith("text/csv"))
         self.assertIn("attachment; filename=", resp["Content-Disposition"])
-        self.assertIn("Health Fair", resp.content.decode())
+        self.assertIn("Health Fair", b"".join(resp.streaming_content).decode())
 
 
 class EventFormPdfBranchTest(TestCase):
@@ -1,6 +1,7 @@
 from django.urls import path
 from . import views
-from .views_matching import matching_page, assign_volunteer
+from .views_matching import matching_page, assign_volunteer, assign_volunteers_bulk, auto_assign
+from .views_reports import report_create, report_status, report_download
 
 urlpatterns = [
     path('', views.home, name='home'),
@@ -13,4 +14,9 @@ urlpatterns = [
     path("volunteer_history/<int:volunteer_id>/", views.volunteer_history, name="volunteer_history_by_id"),
     path("matching/", matching_page, name="match_volunteer"),
     path("matching/assign/", assign_volunteer, name="assign_volunteer"),
+    path("matching/assign/bulk/", assign_volunteers_bulk, name="assign_volunteers_bulk"),
+    path("matching/auto-assign/", auto_assign, name="auto_assign"),
+    path("reports/", report_create, name="report_create"),
+    path("reports/<int:pk>/", report_status, name="report_status"),
+    path("reports/<int:pk>/download/", report_download, name="report_download"),
 ]
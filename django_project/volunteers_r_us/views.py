@@ -1,12 +1,15 @@
 from django.shortcuts import render, redirect
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 from types import SimpleNamespace
 from django.contrib.auth import get_user_model
 from .models import Skill, Event
 from datetime import datetime, date
 from datetime import date
 from django.shortcuts import render
-from .models import Assignment
+from .models import Assignment, Report
+from . import reports
+from .reports import _csv_from_list, _parse_date, _skills_list
+from .pagination import count_up_to, keyset_page
 from notify.models import Notification
 from django.contrib.auth import authenticate, login as auth_login, logout as auth_logout, get_user_model
 from django.contrib.auth.password_validation import validate_password
@@ -15,7 +18,6 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from io import BytesIO
-from datetime import datetime as _dt
 from .models import Profile
 from .forms import ProfileForm, EventForm, STATE_CHOICES, SKILL_CHOICES
 import logging
@@ -102,26 +104,50 @@ def logout_view(request):
 # volunteers_r_us/views.py
 from django.shortcuts import render
 
-def _parse_date(s: str):
-    if not s:
-        return None
-    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%Y/%m/%d"):
-        try:
-            return _dt.strptime(s, fmt).date()
-        except ValueError:
-            pass
-    return None
+class _Echo:
+    """File-like object whose write() hands the line back, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_stream_response(headers, rows, filename):
+    """
+    Stream `rows` (any iterable, ideally lazy) as a CSV attachment. Only one
+    row is held at a time, so memory doesn't grow with the export.
+    """
+    import csv
+
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow(headers)
+        for row in rows:
+            yield writer.writerow(row)
+
+    resp = StreamingHttpResponse(lines(), content_type="text/csv")
+    resp["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return resp
+
 
+# generated workbooks up to this size stay in memory, bigger ones go to disk
+XLSX_SPOOL_BYTES = 8 * 1024 * 1024
 
-def _skills_list(event):
-    """Return list of skill names from Event.required_skills (ManyToManyField)."""
-    if not event:
-        return []
-    return [str(skill).strip() for skill in event.required_skills.all()]
 
+def _xlsx_file_response(headers, rows, filename, sheet_title):
+    """XLSX download built by reports.write_xlsx; raises ImportError without openpyxl."""
+    import tempfile
+
+    out = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_BYTES)
+    try:
+        reports.write_xlsx(out, headers, rows, sheet_title)
+    except BaseException:
+        out.close()
+        raise
+    out.seek(0)
+    return FileResponse(out, as_attachment=True, filename=filename,
+                        content_type=reports.CONTENT_TYPES["xlsx"])
 
-def _csv_from_list(values):
-    return ", ".join(v for v in values if v)
 
 from io import BytesIO  
 
@@ -129,126 +155,41 @@ from io import BytesIO
 
 def _pdf_table_response(columns, rows, filename_base="report", filename_prefix=None):
     """
-    Generic PDF table helper used by:
-      - volunteer_history (10 columns)
-      - event_form (6 columns)
-
-    It:
-      * Fits the table to the page width
-      * Gives more room to text-heavy columns (Description, Required Skills, Capacity)
-      * Wraps long text inside cells so headers/values stay inside their cells
+    PDF table download for volunteer_history and event_form (see
+    reports.write_pdf_table for the layout).
     """
     if filename_prefix is None:
         filename_prefix = filename_base
 
-    from reportlab.lib.pagesizes import landscape, letter
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet
-
     buffer = BytesIO()
-    page_size = landscape(letter)
-    page_width, page_height = page_size
-
-    # Margins and usable width
-    left_margin = right_margin = 30
-    top_margin = bottom_margin = 30
-    usable_width = page_width - (left_margin + right_margin)
-
-    # Build raw data: header row + data rows
-    data = [columns] + rows
-    num_cols = len(columns)
-
-    # --------- Column width weights (relative, not pixels) ----------
-    if num_cols == 10:
-        # volunteer_history: [Volunteer, Event, Description, Location, Required Skills,
-        #                     Urgency, Event Date, Capacity, Languages, Status]
-        weights = [
-            1.1,  # Volunteer
-            1.0,  # Event Name
-            1.5,  # Description
-            0.8,  # Location
-            2.3,  # Required Skills  (wide)
-            0.7,  # Urgency
-            1.0,  # Event Date
-            2.0,  # Capacity (current / total)
-            0.8,  # Languages
-            0.6,  # Status
-        ]
-    elif num_cols == 6:
-        # events: [Event Name, Description, Location, Required Skills, Urgency, Event Date]
-        weights = [
-            1.3,  # Event Name
-            1.7,  # Description
-            1.0,  # Location
-            2.4,  # Required Skills (wide)
-            0.7,  # Urgency
-            0.9,  # Event Date
-        ]
-    else:
-        # Fallback: equal widths
-        weights = [1.0] * num_cols
-
-    total_weight = sum(weights)
-    col_widths = [usable_width * (w / total_weight) for w in weights]
-
-    # --------- Convert all cells to Paragraphs so they wrap ---------
-    styles = getSampleStyleSheet()
-    body_style = styles["BodyText"]
-    body_style.fontSize = 8
-    body_style.leading = 10
-    body_style.wordWrap = "CJK"
-
-    header_style = styles["BodyText"]
-    header_style.fontSize = 8
-    header_style.leading = 10
-    header_style.wordWrap = "CJK"
-    header_style.fontName = "Helvetica-Bold"
-
-    para_data = []
-    for row_idx, row in enumerate(data):
-        new_row = []
-        for cell in row:
-            text = "" if cell is None else str(cell)
-            if row_idx == 0:
-                new_row.append(Paragraph(text, header_style))
-            else:
-                new_row.append(Paragraph(text, body_style))
-        para_data.append(new_row)
-
-    # --------- Create document & table ----------
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=page_size,
-        leftMargin=left_margin,
-        rightMargin=right_margin,
-        topMargin=top_margin,
-        bottomMargin=bottom_margin,
-    )
-
-    table = Table(para_data, colWidths=col_widths, repeatRows=1)
-
-    # --------- Styling (grid, alignment, etc.) ----------
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-        ("FONTSIZE", (0, 0), (-1, -1), 8),
-        ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
-        ("TOPPADDING", (0, 0), (-1, 0), 4),
-        ("TOPPADDING", (0, 1), (-1, -1), 3),
-        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-    ]))
-
-    doc.build([table])
-
+    reports.write_pdf_table(buffer, columns, rows)
     buffer.seek(0)
     response = HttpResponse(buffer, content_type="application/pdf")
     response["Content-Disposition"] = f'attachment; filename="{filename_prefix}.pdf"'
     return response
 
 
+# volunteer_history table: keyset orderings over indexed columns, each
+# ending in the primary key so the cursor is unique
+HISTORY_SORTS = {
+    "date":       ["event__event_date", "volunteer__email", "id"],
+    "-date":      ["-event__event_date", "-volunteer__email", "-id"],
+    "volunteer":  ["volunteer__email", "event__event_date", "id"],
+    "-volunteer": ["-volunteer__email", "-event__event_date", "-id"],
+}
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
+STATUS_CLASSES = {
+    "assigned": "bg-secondary",
+    "registered": "bg-secondary",
+    "attended": "text-bg-success",
+    "no-show": "text-bg-danger",
+    "no show": "text-bg-danger",
+    "cancelled": "text-bg-warning",
+    "canceled": "text-bg-warning",
+}
+
+
 @login_required
 @staff_member_required
 def volunteer_history(request):
@@ -260,27 +201,11 @@ def volunteer_history(request):
     status    = (request.GET.get("status") or "").strip()
     from_str  = (request.GET.get("from_date") or "").strip()
 
-    d_from = _parse_date(from_str)
-
-    # Base queryset: assignments with volunteer and event joined
-    qs = Assignment.objects.select_related("volunteer", "event").all()
-
-    if volunteer:
-        qs = qs.filter(volunteer__email=volunteer)
-    if status:
-        qs = qs.filter(status=status)
-    if d_from:
-        qs = qs.filter(event__event_date=d_from)
-
-    qs = qs.order_by("event__event_date", "volunteer__email")
+    filters = reports.history_filters(volunteer, status, from_str)
+    qs = reports.history_queryset(filters)
 
     # ------------------------------- export branch -------------------------------
     if request.GET.get("export") == "1":
-        headers = [
-            "Volunteer", "Event Name", "Description", "Location",
-            "Required Skills", "Urgency", "Event Date",
-            "Capacity (current / total)", "Languages", "Status",
-        ]
         filename = "volunteer_history"
         if volunteer:
             filename += f"_{volunteer}"
@@ -289,159 +214,23 @@ def volunteer_history(request):
         stamp = now().strftime("%Y%m%d-%H%M%S")
 
         try:
-            from openpyxl import Workbook
-            from openpyxl.utils import get_column_letter
-            from openpyxl.styles import Font, Alignment
-
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Volunteer History"
-            ws.append(headers)
-
-            # header style
-            for cell in ws[1]:
-                cell.font = Font(bold=True)
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-
-            for rec in qs:
-                evt = rec.event
-                user = rec.volunteer
-
-                # Full name if available, otherwise email
-                if hasattr(user, "profile") and getattr(user.profile, "full_name", "").strip():
-                    volunteer_name = user.profile.full_name.strip()
-                else:
-                    volunteer_name = getattr(user, "email", str(user))
-
-                skills_csv = _csv_from_list(_skills_list(evt))
-
-                # No capacity/languages fields in Event yet: use placeholders
-                cap_current = 0
-                cap_total   = 0
-                languages_csv = ""
-
-                # Use display label for status if choices are defined
-                if hasattr(rec, "get_status_display"):
-                    status_display = rec.get_status_display()
-                else:
-                    status_display = rec.status or ""
-
-                ws.append([
-                    volunteer_name,
-                    getattr(evt, "name", "") if evt else "",
-                    getattr(evt, "description", "") if evt else "",
-                    getattr(evt, "location", "") if evt else "",
-                    skills_csv,
-                    getattr(evt, "urgency", "") if evt else "",
-                    evt.event_date.strftime("%Y-%m-%d") if (evt and evt.event_date) else "",
-                    f"{cap_current} / {cap_total}",
-                    languages_csv,
-                    status_display,
-                ])
-
-            # rough autofit
-            for col_idx in range(1, ws.max_column + 1):
-                col_letter = get_column_letter(col_idx)
-                max_len = max(len(str(c.value or "")) for c in ws[col_letter])
-                ws.column_dimensions[col_letter].width = min(50, max(12, max_len + 2))
-
-            bio = BytesIO()
-            wb.save(bio)
-            bio.seek(0)
-            resp = HttpResponse(
-                bio.read(),
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
-            resp["Content-Disposition"] = f'attachment; filename="{filename}_{stamp}.xlsx"'
-            return resp
-
+            headers, rows = reports.export_rows(Report.HISTORY, "xlsx", filters)
+            return _xlsx_file_response(headers, rows, f"{filename}_{stamp}.xlsx", "Volunteer History")
         except ImportError:
-            # CSV fallback
-            import csv
-            from io import StringIO
-
-            sio = StringIO()
-            writer = csv.writer(sio)
-            writer.writerow(headers)
-
-            for rec in qs:
-                evt = rec.event
-                user = rec.volunteer
-
-                if hasattr(user, "profile") and getattr(user.profile, "full_name", "").strip():
-                    volunteer_name = user.profile.full_name.strip()
-                else:
-                    volunteer_name = getattr(user, "email", str(user))
-
-                skills_csv = _csv_from_list(_skills_list(evt))
-
-                cap_current = 0
-                cap_total   = 0
-                languages_csv = ""
-
-                if hasattr(rec, "get_status_display"):
-                    status_display = rec.get_status_display()
-                else:
-                    status_display = rec.status or ""
-
-                writer.writerow([
-                    volunteer_name,
-                    getattr(evt, "name", "") if evt else "",
-                    getattr(evt, "description", "") if evt else "",
-                    getattr(evt, "location", "") if evt else "",
-                    skills_csv,
-                    getattr(evt, "urgency", "") if evt else "",
-                    evt.event_date.strftime("%Y-%m-%d") if (evt and evt.event_date) else "",
-                    f"{cap_current} / {cap_total}",
-                    languages_csv,
-                    status_display,
-                ])
-
-            resp = HttpResponse(
-                sio.getvalue(),
-                content_type="text/csv",
-            )
-            resp["Content-Disposition"] = f'attachment; filename="{filename}_{stamp}.csv"'
-            return resp
+            # CSV fallback, streamed in chunks
+            headers, rows = reports.export_rows(Report.HISTORY, "csv", filters)
+            return _csv_stream_response(headers, rows, f"{filename}_{stamp}.csv")
 
     # --------------------------- PDF export branch ---------------------------
     if request.GET.get("export_pdf") == "1":
-        headers = [
-            "Volunteer", "Event Name", "Description", "Location",
-            "Required Skills", "Urgency", "Event Date",
-            "Capacity (current / total)", "Languages", "Status",
-        ]
         filename = "volunteer_history"
         if volunteer:
             filename += f"_{volunteer}"
         if status:
             filename += f"_{status}"
 
-        rows = []
-        for rec in qs:
-            evt = rec.event
-            volunteer_email = getattr(rec.volunteer, "email", str(rec.volunteer))
-            skills_csv = _csv_from_list(_skills_list(evt))
-
-            # still placeholders for capacity/languages
-            cap_current = 0
-            cap_total   = 0
-            languages_csv = ""
-
-            rows.append([
-                volunteer_email,
-                getattr(evt, "name", "") if evt else "",
-                getattr(evt, "description", "") if evt else "",
-                getattr(evt, "location", "") if evt else "",
-                skills_csv,
-                getattr(evt, "urgency", "") if evt else "",
-                evt.event_date.strftime("%Y-%m-%d") if (evt and evt.event_date) else "",
-                f"{cap_current} / {cap_total}",
-                languages_csv,
-                rec.status,
-            ])
-
-        return _pdf_table_response(headers, rows, filename_base=filename)
+        rows = [reports.history_pdf_row(rec) for rec in qs]
+        return _pdf_table_response(reports.HISTORY_HEADERS, rows, filename_base=filename)
 
     # --------------------------- filters for dropdowns ---------------------------
     volunteer_users = (
@@ -467,21 +256,33 @@ def volunteer_history(request):
             )
         )
 
-    # status list stays like before, based on Assignment.status
-    statuses = list(
-        Assignment.objects.order_by().values_list("status", flat=True).distinct()
-    )
-    statuses = sorted([s for s in statuses if s]) or [
-        Assignment.ASSIGNED,
-        Assignment.ATTENDED,
-        Assignment.NO_SHOW,
-        Assignment.CANCELLED,
-    ]
-
-    # ---------------------------- build rows for HTML ----------------------------
+    # status choices, not a DISTINCT over the whole history on every render
+    statuses = [code for code, _ in Assignment.STATUS_CHOICES]
+
+    # ------------------------ one keyset page for HTML ------------------------
+    sort = request.GET.get("sort") or "date"
+    if sort not in HISTORY_SORTS:
+        sort = "date"
+    try:
+        size = max(1, min(int(request.GET.get("page_size") or HISTORY_PAGE_SIZE), HISTORY_MAX_PAGE_SIZE))
+    except ValueError:
+        size = HISTORY_PAGE_SIZE
+    listed = qs.filter(event__isnull=False, volunteer__isnull=False)
+    page = keyset_page(listed, HISTORY_SORTS[sort], after=request.GET.get("after"),
+                       before=request.GET.get("before"), size=size)
+    total, total_capped = count_up_to(listed)
+
+    def link(**params):
+        q = request.GET.copy()
+        for key in ("after", "before", "reset", "export", "export_pdf"):
+            q.pop(key, None)
+        for key, value in params.items():
+            q[key] = value
+        return f"?{q.urlencode()}"
+
     rows = []
     today = now().date()
-    for r in qs:
+    for r in page.rows:
         evt = r.event
         user = r.volunteer
         volunteer_email = getattr(user, "email", str(user))
@@ -492,32 +293,8 @@ def volunteer_history(request):
         else:
             volunteer_display_name = volunteer_email
 
-        skills = _skills_list(evt)
         event_date = evt.event_date if (evt and evt.event_date) else None
-        is_completed = bool(event_date and event_date < today)
-
-        cap_current = 0
-        cap_total = 0
-        languages_list = []
-
-        # Normalize status for display + styling
         raw_status = r.status or ""
-        if hasattr(r, "get_status_display"):
-            status_display = r.get_status_display() or raw_status
-        else:
-            status_display = raw_status
-
-        s_lower = raw_status.replace("_", "-").lower()
-        if s_lower in ("assigned", "registered"):
-            status_class = "bg-secondary"
-        elif s_lower == "attended":
-            status_class = "text-bg-success"
-        elif s_lower in ("no-show", "no show", "no_show"):
-            status_class = "text-bg-danger"
-        elif s_lower in ("cancelled", "canceled"):
-            status_class = "text-bg-warning"
-        else:
-            status_class = "text-bg-dark"
 
         rows.append({
             "id": r.id,
@@ -526,19 +303,18 @@ def volunteer_history(request):
             "event_name": getattr(evt, "name", "") if evt else "",
             "description": getattr(evt, "description", "") if evt else "",
             "location": getattr(evt, "location", "") if evt else "",
-            "required_skills": skills,
+            "required_skills": _skills_list(evt),
             "urgency": getattr(evt, "urgency", "") if evt else "",
             "event_date": event_date,
             "event_date_iso": event_date.isoformat() if event_date else "",
-            "capacity": f"{cap_current} / {cap_total}",
-            "languages": languages_list,
+            "capacity": "0 / 0",  # no capacity/languages fields in Event yet
+            "languages": [],
             "status": raw_status,
-            "status_display": status_display,
-            "status_class": status_class,
-            "is_completed": is_completed,
+            "status_display": r.get_status_display() or raw_status,
+            "status_class": STATUS_CLASSES.get(raw_status.replace("_", "-").lower(), "text-bg-dark"),
+            "is_completed": bool(event_date and event_date < today),
         })
 
-
     return render(
         request,
         "volunteer_history.html",
@@ -546,11 +322,19 @@ def volunteer_history(request):
             "rows": rows,
             "volunteers": volunteers,
             "statuses": statuses,
-            "count": len(rows),
+            "count": total,
+            "count_capped": total_capped,
+            "sort": sort,
+            "sort_links": {
+                key: link(sort=f"-{key}" if sort == key else key) for key in ("date", "volunteer")
+            },
+            "next_url": link(after=page.next_cursor) if page.next_cursor else None,
+            "prev_url": link(before=page.prev_cursor) if page.prev_cursor else None,
+            "first_url": link() if page.prev_cursor else None,
             "filter": {
                 "volunteer": volunteer,
                 "status": status,
-                "from_date": d_from.isoformat() if d_from else "",
+                "from_date": filters.get("from_date", ""),
             },
         },
     )
@@ -608,72 +392,14 @@ def profile_form(request):
 def event_form(request):
     # --- CSV EXPORT BRANCH (GET ?export=1) ---
     if request.GET.get("export") == "1":
-        import csv
-        from io import StringIO
-
-        # All events, ordered by date then name
-        qs = Event.objects.all().order_by("event_date", "name")
-
-        headers = [
-            "Event Name",
-            "Description",
-            "Location",
-            "Required Skills",
-            "Urgency",
-            "Event Date",
-        ]
-
-        sio = StringIO()
-        writer = csv.writer(sio)
-        writer.writerow(headers)
-
-        for evt in qs:
-            skills_csv = _csv_from_list(_skills_list(evt))
-
-            writer.writerow([
-                getattr(evt, "name", "") or "",
-                getattr(evt, "description", "") or "",
-                getattr(evt, "location", "") or "",
-                skills_csv,
-                getattr(evt, "urgency", "") or "",
-                evt.event_date.strftime("%Y-%m-%d") if getattr(evt, "event_date", None) else "",
-            ])
-
+        headers, rows = reports.export_rows(Report.EVENTS, "csv", {})
         stamp = now().strftime("%Y%m%d-%H%M%S")
-        resp = HttpResponse(
-            sio.getvalue(),
-            content_type="text/csv",
-        )
-        resp["Content-Disposition"] = f'attachment; filename="events_{stamp}.csv"'
-        return resp
+        return _csv_stream_response(headers, rows, f"events_{stamp}.csv")
 
-        # --- PDF EXPORT BRANCH (GET ?export_pdf=1) ---
+    # --- PDF EXPORT BRANCH (GET ?export_pdf=1) ---
     if request.GET.get("export_pdf") == "1":
-        # All events, ordered by date then name
-        qs = Event.objects.all().order_by("event_date", "name")
-
-        headers = [
-            "Event Name",
-            "Description",
-            "Location",
-            "Required Skills",
-            "Urgency",
-            "Event Date",
-        ]
-
-        rows = []
-        for evt in qs:
-            skills_csv = _csv_from_list(_skills_list(evt))
-            rows.append([
-                evt.name,
-                evt.description,
-                evt.location,
-                skills_csv,
-                evt.urgency,
-                evt.event_date.strftime("%Y-%m-%d") if evt.event_date else "",
-            ])
-
-        return _pdf_table_response(headers, rows, filename_base="events")
+        rows = [reports.event_row(evt) for evt in reports.events_queryset()]
+        return _pdf_table_response(reports.EVENT_HEADERS, rows, filename_base="events")
 
     # --- NORMAL FORM HANDLING (EXISTING BEHAVIOR) ---
     form = EventForm(request.POST or None)
@@ -2,7 +2,6 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.shortcuts import render, redirect, get_object_or_404
 from django.db import transaction
-from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.admin.views.decorators import staff_member_required
 
@@ -10,6 +9,15 @@ from django.contrib.admin.views.decorators import staff_member_required
 from .models import Event, Profile, Skill, Assignment
 from .choices import SKILL_CHOICES
 from notify.models import Notification
+from notify.outbox import queue_email
+from .jobs import enqueue_on_commit
+from .matching.db import events_by_id
+from .matching.store import get_store
+from .matching.optimizer import assign_upcoming
+from .matching.assign import MAX_BULK_ASSIGN, bulk_assign, load_profiles
+
+# how many ranked suggestions the staff page shows for the selected event
+SUGGESTION_LIMIT = 20
 
 _LABEL_TO_CODE = {label: code for code, label in SKILL_CHOICES}
 _CODE_TO_LABEL = {code: label for code, label in SKILL_CHOICES}
@@ -45,11 +53,26 @@ def matching_page(request):
     selected_volunteer_id = request.GET.get("volunteer_id")
     selected_event_id = request.GET.get("event_id")
 
+    selected_event_id = int(selected_event_id) if selected_event_id else None
+
+    # Ranked suggestions for the selected event, scored from the cached roster
+    suggested, suggested_total = [], 0
+    if selected_event_id:
+        ev = events_by_id([selected_event_id]).get(selected_event_id)
+        if ev is not None:
+            page, suggested_total = get_store().top_matches(ev, limit=SUGGESTION_LIMIT)
+            suggested = [
+                {"id": v["id"], "full_name": v["full_name"], "email": v["email"], "score": s}
+                for v, s in page
+            ]
+
     ctx = {
         "volunteers": volunteers,
         "events": events,
         "selected_volunteer_id": int(selected_volunteer_id) if selected_volunteer_id else None,
-        "selected_event_id": int(selected_event_id) if selected_event_id else None,
+        "selected_event_id": selected_event_id,
+        "suggested": suggested,
+        "suggested_total": suggested_total,
     }
     return render(request, "matching/match_form.html", ctx)   # or matching/matching_page.html
 
@@ -88,15 +111,53 @@ def assign_volunteer(request):
         url="",   # optional deep link
     )
 
-    # Email (console backend in dev)
-    send_mail(
+    # Email goes through the outbox: written in this transaction, delivered
+    # by the send_outbox job queued for after the commit (or by
+    # `manage.py send_outbox`), so SMTP never holds the request open
+    queue_email(
         subject=f"[Volunteer Match] {event.name}",
         message=f"Hi {profile.full_name or profile.user.email},\n\n{msg}\n\nThank you for volunteering!",
         from_email=getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@example.com"),
         recipient_list=[profile.user.email],
-        fail_silently=True,
     )
+    enqueue_on_commit("send_outbox", "send_outbox")
 
     messages.success(request, f"{profile.full_name or profile.user.email} assigned and notified.")
     # Redirect back with selections preserved
-    return redirect(f"/volunteers_r_us/matching/?volunteer_id={profile.id}&event_id={event.id}")
\ No newline at end of file
+    return redirect(f"/volunteers_r_us/matching/?volunteer_id={profile.id}&event_id={event.id}")
+
+
+@login_required
+@staff_member_required
+def auto_assign(request):
+    """Fill every upcoming event's slots at once (see matching.optimizer)."""
+    if request.method != "POST":
+        return redirect("match_volunteer")
+    plan = assign_upcoming(created_by=request.user)
+    events = {p.event["id"] for p in plan}
+    messages.success(request, f"Auto-assigned {len(plan)} volunteer(s) across {len(events)} event(s).")
+    return redirect("match_volunteer")
+
+
+@login_required
+@staff_member_required
+def assign_volunteers_bulk(request):
+    """Assign every checked volunteer to the event in one request."""
+    if request.method != "POST":
+        return redirect("match_volunteer")
+    event = get_object_or_404(Event, pk=request.POST.get("event_id"))
+    try:
+        ids = [int(v) for v in request.POST.getlist("volunteer_ids")]
+    except ValueError:
+        ids = None
+    if not ids or len(ids) > MAX_BULK_ASSIGN:
+        messages.error(request, f"Select between 1 and {MAX_BULK_ASSIGN} volunteers.")
+        return redirect(f"/volunteers_r_us/matching/?event_id={event.id}")
+    profiles, unknown = load_profiles(ids)
+    if unknown:
+        messages.error(request, f"Unknown volunteer id(s): {', '.join(map(str, unknown))}")
+        return redirect(f"/volunteers_r_us/matching/?event_id={event.id}")
+    n = bulk_assign(event, profiles.values(), created_by=request.user,
+                    notify=request.POST.get("action") != "assign")
+    messages.success(request, f"{n} volunteer(s) assigned to {event.name}.")
+    return redirect(f"/volunteers_r_us/matching/?event_id={event.id}")
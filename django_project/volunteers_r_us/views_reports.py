@@ -0,0 +1,69 @@
+from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_GET, require_POST
+
+from .models import Report
+from .reports import CONTENT_TYPES, history_filters, request_report
+
+
+def _status(report):
+    data = {"id": report.pk, "state": report.state, "rows": report.rows, "error": report.error,
+            "status_url": reverse("report_status", args=[report.pk])}
+    if report.state == Report.READY:
+        data["download_url"] = reverse("report_download", args=[report.pk])
+    return data
+
+
+@login_required
+@staff_member_required
+@require_POST
+def report_create(request):
+    """
+    Queue an export (kind=history|events, format=csv|xlsx|pdf, plus the
+    history filters). JSON callers get the report status to poll; form posts
+    are redirected back with a message, and a notification follows when the
+    file is ready.
+    """
+    kind = request.POST.get("kind")
+    fmt = request.POST.get("format")
+    if kind not in dict(Report.KIND_CHOICES) or fmt not in dict(Report.FORMAT_CHOICES):
+        return JsonResponse({"detail": "kind must be history|events and format csv|xlsx|pdf"}, status=400)
+    filters = {}
+    if kind == Report.HISTORY:
+        filters = history_filters(request.POST.get("volunteer"), request.POST.get("status"),
+                                  request.POST.get("from_date"))
+    report, cached = request_report(kind, fmt, filters, request.user)
+
+    if request.accepts("application/json") and not request.accepts("text/html"):
+        return JsonResponse(_status(report), status=200 if cached else 202)
+    if cached:
+        messages.success(request, "That report was generated recently; your download is ready.")
+        return redirect("report_download", report.pk)
+    messages.info(request, "Report queued. You'll get a notification when it's ready to download.")
+    back = request.POST.get("next") or ""
+    if not url_has_allowed_host_and_scheme(back, {request.get_host()}, request.is_secure()):
+        back = reverse("home")
+    return redirect(back)
+
+
+@login_required
+@staff_member_required
+@require_GET
+def report_status(request, pk):
+    return JsonResponse(_status(get_object_or_404(Report, pk=pk)))
+
+
+@login_required
+@staff_member_required
+@require_GET
+def report_download(request, pk):
+    report = get_object_or_404(Report, pk=pk)
+    if report.state != Report.READY or not report.file:
+        raise Http404("Report is not ready")
+    return FileResponse(report.file.open("rb"), as_attachment=True, filename=report.filename,
+                        content_type=CONTENT_TYPES[report.format])